@@ -4,6 +4,7 @@ VoxMaster AI Configuration
 Environment-based configuration management.
 """
 
+import os
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 from functools import lru_cache
@@ -30,7 +31,69 @@ class Settings(BaseSettings):
     
     # Environment
     environment: str = "development"
-    
+
+    # Analysis executor (process pool for CPU-bound DSP)
+    # None = one worker per CPU (capped at 4), 0 = run in a thread in-process
+    analysis_workers: Optional[int] = None
+    analysis_max_tasks_per_child: int = 50
+    analysis_prewarm: bool = True
+    # Print every analysis's per-stage timings (debugging; /api/metrics
+    # aggregates them either way)
+    analysis_log_timings: bool = False
+
+    # Warm up the API process (DSP stack, extractors, report styles) in the
+    # background at startup; ANALYSIS_PREWARM does the same for the workers
+    startup_warmup: bool = True
+    # Persistent numba JIT cache shared by the API process and the workers
+    # (None = numba's default, next to the installed packages)
+    numba_cache_dir: Optional[str] = "storage/numba"
+
+    # Asynchronous analysis jobs (in-memory registry)
+    analysis_jobs_max: int = 500
+    analysis_jobs_ttl_seconds: int = 3600
+
+    # Spectral-gating noise reduction, profiled on the non-voiced frames
+    analysis_denoise: bool = True
+
+    # F0 tracker: "praat" (most accurate), "pyin" or "yin" (fastest)
+    analysis_pitch_backend: str = "praat"
+
+    # Extract features from VAD voiced segments only (skips silence and pauses)
+    analysis_voiced_only: bool = False
+
+    # Files at least this long (seconds) are analyzed in bounded-memory blocks
+    analysis_chunk_threshold_seconds: float = 600.0
+    analysis_chunk_seconds: float = 30.0
+
+    # Live WebSocket analysis: per-connection ring buffer and update cadence,
+    # and the worker processes hosting the sessions (0 = API process threads)
+    live_ring_seconds: float = 10.0
+    live_update_ms: int = 100
+    live_workers: int = 1
+
+    # Reference norms for z-score normalization in scoring (<path>.npy/.json,
+    # built with python -m app.services.norms; fixed ranges are used for any
+    # feature without at least min_count reference analyses)
+    scoring_norms_path: Optional[str] = "storage/norms/reference"
+    scoring_norms_min_count: int = 30
+    scoring_norms_by_voice_class: bool = True
+
+    # Content-hash result cache (in-process LRU tier size; 0 disables it)
+    analysis_cache_entries: int = 1024
+
+    # Upload ingestion chunk size in bytes (bounds per-upload memory)
+    ingest_chunk_size: int = 1024 * 1024
+    # Single uploads up to this size are decoded from memory; larger ones
+    # (and every batch upload) spill to disk
+    ingest_spool_max_bytes: int = 4 * 1024 * 1024
+
+    @property
+    def analysis_worker_count(self) -> int:
+        """Number of analysis worker processes to start."""
+        if self.analysis_workers is not None:
+            return max(0, self.analysis_workers)
+        return min(os.cpu_count() or 1, 4)
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
@@ -6,13 +6,17 @@ Automated Vocal Technique Analysis Pipeline
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from app.config import settings
 from app.services.database import db
 from app.services.storage import storage
+from app.services.executor import analysis_executor, live_executor
+from app.services.metrics import pipeline_metrics
+from app.services.norms import get_reference_norms
+from app.services.warmup import configure_numba_cache, startup_warmup
 from app.routers import analyze, biometrics, generate, reports, settings as settings_router
 
 
@@ -21,11 +25,21 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print("🎤 VoxMaster AI Backend Starting...")
+    # Before any worker spawns, so they inherit the cache location
+    configure_numba_cache(settings.numba_cache_dir)
     await db.connect()
+    norms = get_reference_norms()
+    print(f"📐 Reference norms: {norms.version if norms else 'not built (fixed ranges)'}")
+    await analysis_executor.start()
+    await live_executor.start()
     print(f"📊 Environment: {settings.environment}")
     print(f"🔗 Railway Storage: {'Enabled' if storage.use_railway else 'Local fallback'}")
+    startup_warmup.start(analysis_executor, live_executor)
     yield
     # Shutdown
+    await startup_warmup.stop()
+    await analysis_executor.shutdown()
+    await live_executor.shutdown()
     await db.disconnect()
     print("👋 VoxMaster AI Backend Shutting Down...")
 
@@ -105,9 +119,20 @@ async def health_check():
         "demo_mode": db.demo_mode,
         "services": {
             "database": db_status,
-            "analysis": "ready",
+            "analysis": analysis_executor.status,
+            "live": live_executor.status,
+            "warmup": startup_warmup.status,
             "biometrics": "ready",
             "generation": "ready" if settings.elevenlabs_api_key else "not_configured",
             "storage": "railway" if storage.use_railway else "local",
         },
     }
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline stage latency histograms and error/fallback counters (Prometheus text format)."""
+    return PlainTextResponse(
+        pipeline_metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
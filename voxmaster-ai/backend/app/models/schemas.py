@@ -64,14 +64,17 @@ class SweetSpotScore(BaseModel):
 
 
 class AcousticFeatures(BaseModel):
-    spectral_centroid: float = Field(..., description="Hz")
+    # Fields of feature groups left out of a `features=` subset are None
+    spectral_centroid: Optional[float] = Field(None, description="Hz")
     spectral_rolloff: Optional[float] = None
-    hnr: float = Field(..., description="Harmonics-to-Noise Ratio in dB")
-    cpp: float = Field(..., description="Cepstral Peak Prominence in dB")
-    h1_h2: float = Field(..., description="H1-H2 ratio in dB")
-    f0_mean: float = Field(..., description="Mean fundamental frequency in Hz")
-    f0_range: List[float] = Field(..., description="[min, max] F0 in Hz")
-    formants: Dict[str, float] = Field(..., description="F1-F4 frequencies in Hz")
+    hnr: Optional[float] = Field(None, description="Harmonics-to-Noise Ratio in dB")
+    cpp: Optional[float] = Field(None, description="Cepstral Peak Prominence in dB")
+    h1_h2: Optional[float] = Field(None, description="H1-H2 ratio in dB")
+    h1_a2: Optional[float] = Field(None, description="H1-A2 (harmonic nearest F2) in dB")
+    h1_a3: Optional[float] = Field(None, description="H1-A3 (harmonic nearest F3) in dB")
+    f0_mean: Optional[float] = Field(None, description="Mean fundamental frequency in Hz")
+    f0_range: Optional[List[float]] = Field(None, description="[min, max] F0 in Hz")
+    formants: Optional[Dict[str, float]] = Field(None, description="F1-F4 frequencies in Hz")
     mfccs: Optional[List[float]] = Field(None, description="13 MFCC coefficients")
     jitter: Optional[float] = None
     shimmer: Optional[float] = None
@@ -86,10 +89,10 @@ class AnalysisResponse(BaseModel):
     filename: str
     audio_type: str
     prompt_type: str
-    timbre: TimbreScores
-    weight: WeightScores
-    placement: PlacementScores
-    sweet_spot: SweetSpotScore
+    timbre: Optional[TimbreScores] = None
+    weight: Optional[WeightScores] = None
+    placement: Optional[PlacementScores] = None
+    sweet_spot: Optional[SweetSpotScore] = None
     features: AcousticFeatures
     analyzed_at: datetime = Field(default_factory=datetime.now)
 
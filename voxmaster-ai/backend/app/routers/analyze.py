@@ -2,27 +2,116 @@
 Analysis Router - Vocal Technique Analysis Endpoints
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import JSONResponse
-from typing import Optional, List
-import tempfile
-import os
-
-from app.services.preprocessing import preprocess_audio
-from app.services.feature_extraction import extract_features
-from app.services.scoring import calculate_scores
-from app.services.database import db
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, List, Tuple
+import asyncio
+import functools
+import json
+
+from app.services.pipeline import AnalysisStageError, run_analysis, result_to_record
+from app.services.executor import analysis_executor, live_executor
+from app.services.metrics import pipeline_metrics
+from app.services.norms import get_reference_norms
+from app.services.feature_graph import FEATURES, FULL_PLAN, SCORES, FeaturePlan, parse_features
+from app.services.jobs import job_registry, JobRegistryFull
+from app.services.cache import analysis_cache
+from app.services.ingest import ingest_upload, IngestedUpload
+from app.services.live import PCM_ENCODINGS
+from app.services.database import SCORE_GROUPS, db
+from app.services.rescoring import rescore_batch
 from app.services.storage import storage
+from app.services.tracks import TRACK_NAMES, load_tracks
 from app.models.schemas import AnalysisRequest, AnalysisResponse, AudioType
+from app.config import settings
 
 router = APIRouter()
 
+ALLOWED_AUDIO_TYPES = ["audio/wav", "audio/mpeg", "audio/mp3", "audio/m4a", "audio/x-wav", "audio/x-m4a"]
+
+
+async def _analyze_cached(
+    upload: IngestedUpload,
+    audio_type_enum: AudioType,
+    cache_key: str,
+    progress=None,
+    plan: FeaturePlan = FULL_PLAN,
+) -> Tuple[dict, bool]:
+    """
+    Return the analysis record for an upload, from the result cache if
+    possible, otherwise by running the pipeline (restricted to plan) on an
+    analysis worker.
+    Cached features are re-scored with the current scoring and reference
+    norms, so the cache survives norms rebuilds.
+    Fresh feature tracks are stored under the cache key, so cached
+    records keep pointing at them. Stage timings and fallbacks of fresh
+    analyses go to the pipeline metrics.
+    
+    Returns (record, cache_hit).
+    """
+    with pipeline_metrics.timed("cache_lookup"):
+        record = await analysis_cache.get(cache_key)
+    if record is not None:
+        with pipeline_metrics.timed("scoring.cached"):
+            record = _rescore_record(record, audio_type_enum)
+        return record, True
+    
+    try:
+        result = await analysis_executor.run(
+            functools.partial(run_analysis, plan=plan),
+            upload.source,
+            audio_type_enum,
+            upload.suffix,
+            progress=progress,
+        )
+    except AnalysisStageError as e:
+        pipeline_metrics.error(e.stage)
+        raise
+    except Exception:
+        # The worker itself failed (e.g. a broken process pool)
+        pipeline_metrics.error("analysis")
+        raise
+    pipeline_metrics.record_analysis(result.timings, result.fallbacks)
+    record = result_to_record(result)
+    record["tracks_url"] = None
+    if result.tracks is not None:
+        try:
+            with pipeline_metrics.timed("storage_upload.tracks"):
+                _, record["tracks_url"] = await storage.upload_tracks(result.tracks, cache_key[:32])
+        except Exception as storage_error:
+            print(f"Warning: Could not store feature tracks: {storage_error}")
+    analysis_cache.put(cache_key, record)
+    return record, False
+
+
+def _rescore_record(record: dict, audio_type_enum: AudioType) -> dict:
+    """A copy of a cached record with its score groups recomputed from its features."""
+    scores = [group for group in SCORE_GROUPS if record.get(group)]
+    updates = rescore_batch([{
+        "id": None,
+        "audio_type": audio_type_enum.value,
+        "features": record.get("features"),
+        "scores": scores,
+    }])
+    if not updates:
+        return record
+    return {**record, **{group: value for group, value in updates[0].items() if group != "id"}}
+
+
+def _parse_plan(features: Optional[str]) -> FeaturePlan:
+    """Feature plan for a `features` form field, as a 400 on unknown names."""
+    try:
+        return parse_features(features)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.post("/")
 async def analyze_audio(
     file: UploadFile = File(...),
     audio_type: str = Form("spoken"),
     prompt_type: str = Form("sustained"),
+    features: Optional[str] = Form(None),
 ):
     """
     Analyze uploaded audio file for vocal technique characteristics.
@@ -30,6 +119,9 @@ async def analyze_audio(
     - **file**: Audio file (WAV, MP3, M4A)
     - **audio_type**: Either 'spoken' or 'sung'
     - **prompt_type**: 'sustained', 'passage', or 'verse'
+    - **features**: Optional comma-separated feature/score groups to compute
+      (e.g. 'placement' or 'sweet_spot'); their dependencies are included
+      and everything else is skipped and returned as null
     
     Returns comprehensive vocal analysis including:
     - Timbre scores (brightness, breathiness, warmth, roughness)
@@ -40,96 +132,39 @@ async def analyze_audio(
     """
     
     # Validate file type
-    allowed_types = ["audio/wav", "audio/mpeg", "audio/mp3", "audio/m4a", "audio/x-wav", "audio/x-m4a"]
-    if file.content_type and file.content_type not in allowed_types:
+    if file.content_type and file.content_type not in ALLOWED_AUDIO_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file type. Allowed: WAV, MP3, M4A"
         )
+    plan = _parse_plan(features)
     
+    upload = None
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Save uploaded file temporarily for processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Upload to storage
-        audio_url = None
-        try:
-            _, audio_url = await storage.upload_audio(content, file.filename or "audio.wav")
-        except Exception as storage_error:
-            print(f"Warning: Could not upload to storage: {storage_error}")
+        # Stream the upload once to a decode buffer and storage, hashing as we go
+        upload = await ingest_upload(file)
+        cache_key = analysis_cache.make_key(upload.sha256, audio_type, prompt_type, plan)
         
         # Process audio
         audio_type_enum = AudioType.SUNG if audio_type == "sung" else AudioType.SPOKEN
         
-        # Step 1: Preprocess audio
-        preprocessed = await preprocess_audio(tmp_path, audio_type_enum)
+        # Preprocess, extract features and score on an analysis worker
+        # (skipped entirely when the same upload was analyzed before)
+        record, cache_hit = await _analyze_cached(upload, audio_type_enum, cache_key, plan=plan)
         
-        # Step 2: Extract features
-        features = await extract_features(preprocessed, audio_type_enum)
-        
-        # Step 3: Calculate scores
-        scores = await calculate_scores(features, audio_type_enum)
-        
-        # Cleanup temp file
-        os.unlink(tmp_path)
-        
-        # Convert features to dict for storage
-        features_dict = {
-            "spectral_centroid": features.spectral_centroid,
-            "spectral_rolloff": features.spectral_rolloff,
-            "hnr": features.hnr,
-            "cpp": features.cpp,
-            "h1_h2": features.h1_h2,
-            "f0_mean": features.f0_mean,
-            "f0_range": features.f0_range,
-            "formants": features.formants,
-            "mfccs": features.mfccs,
-            "jitter": features.jitter,
-            "shimmer": features.shimmer,
-        }
-        
-        # Convert scores to dicts
-        timbre_dict = {
-            "brightness": scores["timbre"].brightness,
-            "breathiness": scores["timbre"].breathiness,
-            "warmth": scores["timbre"].warmth,
-            "roughness": scores["timbre"].roughness,
-        }
-        weight_dict = {
-            "weight": scores["weight"].weight,
-            "pressed": scores["weight"].pressed,
-        }
-        placement_dict = {
-            "forwardness": scores["placement"].forwardness,
-            "ring_index": scores["placement"].ring_index,
-            "nasality": scores["placement"].nasality,
-        }
-        sweet_spot_dict = {
-            "clarity": scores["sweet_spot"].clarity,
-            "warmth": scores["sweet_spot"].warmth,
-            "presence": scores["sweet_spot"].presence,
-            "smoothness": scores["sweet_spot"].smoothness,
-            "harshness_penalty": scores["sweet_spot"].harshness_penalty,
-            "total": scores["sweet_spot"].total,
-        }
+        # Release the decode buffer
+        upload.cleanup()
         
         # Save to database
-        analysis = await db.create_analysis(
-            filename=file.filename or "audio.wav",
-            audio_url=audio_url,
-            audio_type=audio_type,
-            prompt_type=prompt_type,
-            timbre=timbre_dict,
-            weight=weight_dict,
-            placement=placement_dict,
-            sweet_spot=sweet_spot_dict,
-            features=features_dict,
-        )
+        with pipeline_metrics.timed("db_write"):
+            analysis = await db.create_analysis(
+                filename=upload.filename,
+                audio_url=upload.audio_url,
+                audio_type=audio_type,
+                prompt_type=prompt_type,
+                cache_key=cache_key,
+                **record,
+            )
         
         return {
             "id": str(analysis['id']),
@@ -142,15 +177,392 @@ async def analyze_audio(
             "placement": analysis['placement'],
             "sweet_spot": analysis['sweet_spot'],
             "features": analysis['features'],
+            "tracks_url": analysis.get('tracks_url'),
+            "cached": cache_hit,
             "analyzed_at": analysis['created_at'].isoformat(),
         }
         
     except Exception as e:
         # Cleanup on error
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+        if upload is not None:
+            upload.cleanup()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    audio_type: str = Form("spoken"),
+    prompt_type: str = Form("sustained"),
+    features: Optional[str] = Form(None),
+):
+    """
+    Analyze many audio files in one request.
+
+    Files are fanned out across the analysis workers and each result is
+    streamed back as one NDJSON line as soon as it finishes (in completion
+    order, tagged with its upload `index`). All successful analyses are
+    persisted with a single bulk write, after which a final summary line
+    maps each `index` to its stored analysis `id`. `features` restricts
+    every analysis as in `POST /`.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    plan = _parse_plan(features)
+
+    for file in files:
+        if file.content_type and file.content_type not in ALLOWED_AUDIO_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type for {file.filename}. Allowed: WAV, MP3, M4A"
+            )
+
+    audio_type_enum = AudioType.SUNG if audio_type == "sung" else AudioType.SPOKEN
+
+    # Ingest every upload before streaming starts; the UploadFile objects
+    # are closed once the endpoint returns. All of them are held until
+    # their analyses finish, so they spill to temp files rather than
+    # staying in memory, and workers receive paths instead of pickled bytes.
+    uploads = []
+    try:
+        for index, file in enumerate(files):
+            ingested = await ingest_upload(file, spool_max_bytes=0)
+            uploads.append({
+                "index": index,
+                "upload": ingested,
+                "cache_key": analysis_cache.make_key(ingested.sha256, audio_type, prompt_type, plan),
+            })
+    except Exception as e:
+        for item in uploads:
+            item["upload"].cleanup()
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def run_one(item: dict):
+        try:
+            record, cache_hit = await _analyze_cached(
+                item["upload"], audio_type_enum, item["cache_key"], plan=plan
+            )
+            return item, (record, cache_hit), None
+        except Exception as e:
+            return item, None, e
+        finally:
+            item["upload"].cleanup()
+
+    async def stream_results():
+        pending = []
+        tasks = [asyncio.create_task(run_one(item)) for item in uploads]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item, result, error = await next_done
+                upload = item["upload"]
+                line = {"index": item["index"], "filename": upload.filename}
+
+                if error is not None:
+                    line.update({"status": "error", "error": str(error)})
+                else:
+                    record, cache_hit = result
+                    pending.append({
+                        "index": item["index"],
+                        "filename": upload.filename,
+                        "audio_url": upload.audio_url,
+                        "audio_type": audio_type,
+                        "prompt_type": prompt_type,
+                        "cache_key": item["cache_key"],
+                        **record,
+                    })
+                    line.update({
+                        "status": "ok",
+                        "audio_url": upload.audio_url,
+                        "cached": cache_hit,
+                        **record,
+                    })
+
+                yield json.dumps(line) + "\n"
+
+            # Persist all analyses in one bulk write
+            with pipeline_metrics.timed("db_write.bulk"):
+                created = await db.create_analyses(pending)
+            yield json.dumps({
+                "status": "complete",
+                "total": len(uploads),
+                "succeeded": len(created),
+                "failed": len(uploads) - len(created),
+                "analyses": [
+                    {"index": item["index"], "id": str(row["id"])}
+                    for item, row in zip(pending, created)
+                ],
+            }) + "\n"
+        finally:
+            # Client disconnected early: stop outstanding jobs, drop temp files
+            for task in tasks:
+                task.cancel()
+            for item in uploads:
+                item["upload"].cleanup()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    audio_type: str = Form("spoken"),
+    prompt_type: str = Form("sustained"),
+    features: Optional[str] = Form(None),
+):
+    """
+    Submit an audio file for background analysis.
+
+    Returns a job id immediately. Poll `GET /jobs/{job_id}` or subscribe to
+    `GET /jobs/{job_id}/events` (server-sent events) for per-stage progress:
+    decoded, preprocessed, features, scored, stored. `features` restricts
+    the analysis as in `POST /`.
+    """
+    if file.content_type and file.content_type not in ALLOWED_AUDIO_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: WAV, MP3, M4A"
+        )
+    plan = _parse_plan(features)
+
+    filename = file.filename or "audio.wav"
+    try:
+        job = job_registry.create(filename, audio_type, prompt_type)
+    except JobRegistryFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    try:
+        upload = await ingest_upload(file)
+        cache_key = analysis_cache.make_key(upload.sha256, audio_type, prompt_type, plan)
+    except Exception as e:
+        job_registry.fail(job, str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+    audio_type_enum = AudioType.SUNG if audio_type == "sung" else AudioType.SPOKEN
+    job.task = asyncio.create_task(
+        _run_analysis_job(job, upload, audio_type_enum, cache_key, plan)
+    )
+
+    return {"job_id": job.id, "status": job.status}
+
+
+async def _run_analysis_job(
+    job,
+    upload: IngestedUpload,
+    audio_type_enum: AudioType,
+    cache_key: str,
+    plan: FeaturePlan = FULL_PLAN,
+):
+    """Background task: run the pipeline for a job and store the analysis."""
+    try:
+        record, cache_hit = await _analyze_cached(
+            upload,
+            audio_type_enum,
+            cache_key,
+            progress=lambda stage: job_registry.advance(job, stage),
+            plan=plan,
+        )
+        job_registry.advance(job, "scored")
+
+        with pipeline_metrics.timed("db_write"):
+            analysis = await db.create_analysis(
+                filename=job.filename,
+                audio_url=upload.audio_url,
+                audio_type=job.audio_type,
+                prompt_type=job.prompt_type,
+                cache_key=cache_key,
+                **record,
+            )
+        job_registry.complete(job, {
+            "id": str(analysis['id']),
+            "filename": job.filename,
+            "audio_url": upload.audio_url,
+            "audio_type": job.audio_type,
+            "prompt_type": job.prompt_type,
+            "cached": cache_hit,
+            **record,
+        })
+    except Exception as e:
+        job_registry.fail(job, str(e))
+    finally:
+        upload.cleanup()
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Get the status (and result, once stored) of an analysis job."""
+    job = job_registry.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job_events(job_id: str):
+    """Stream an analysis job's progress as server-sent events."""
+    job = job_registry.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        queue = job_registry.subscribe(job)
+        try:
+            # Replay what already happened, then follow live events
+            for event in list(job.events):
+                yield _format_sse(event)
+            if job.is_finished:
+                return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse(event)
+                if event["status"] in ("completed", "failed"):
+                    return
+        finally:
+            job_registry.unsubscribe(job, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_sse(event: dict) -> str:
+    return f"event: {event['status']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.websocket("/live")
+async def live_analysis(
+    websocket: WebSocket,
+    sample_rate: int = 44100,
+    audio_type: str = "sung",
+    encoding: str = "f32",
+):
+    """
+    Analyze live microphone audio over a WebSocket.
+
+    Connect with `?sample_rate=48000&audio_type=sung&encoding=f32` and send
+    mono little-endian PCM (`f32` or `s16`) as binary messages. Roughly every
+    LIVE_UPDATE_MS of audio the server replies with a JSON update holding the
+    latest F0, centroid, HNR and input level, their running values and the
+    running Sweet Spot. Text commands: `reset` clears the running values,
+    `stop` returns a final summary (features and all scores) and closes.
+    """
+    await websocket.accept()
+    if not 8000 <= sample_rate <= 96000 or encoding not in PCM_ENCODINGS:
+        await websocket.close(code=1003, reason="Unsupported sample_rate or encoding")
+        return
+
+    audio_type_enum = AudioType.SUNG if audio_type == "sung" else AudioType.SPOKEN
+    session_id = await live_executor.open(
+        sample_rate,
+        audio_type_enum,
+        settings.live_ring_seconds,
+        settings.live_update_ms / 1000,
+    )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is not None:
+                try:
+                    # Audio that arrives meanwhile is analyzed by the next update
+                    update = await live_executor.feed(session_id, message["bytes"], encoding)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                if update is not None:
+                    await websocket.send_json(update)
+
+            elif message.get("text") is not None:
+                command = message["text"].strip().lower()
+                if command == "reset":
+                    await live_executor.reset(session_id)
+                elif command == "stop":
+                    summary = await live_executor.close(session_id, summary=True)
+                    await websocket.send_json(summary)
+                    await websocket.close()
+                    return
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"Unknown command: {command}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await live_executor.close(session_id)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Result-cache hit/miss counters."""
+    return analysis_cache.stats()
+
+
+# Fixed paths go before the /{analysis_id} routes, which would match them
+@router.get("/features")
+async def list_features():
+    """List all extractable acoustic features."""
+    return {
+        "spectral": [
+            "spectral_centroid",
+            "spectral_rolloff",
+            "spectral_contrast",
+            "spectral_flatness",
+        ],
+        "harmonic": [
+            "hnr",
+            "cpp",
+            "h1_h2",
+            "h1_a2",
+            "h1_a3",
+        ],
+        "formants": ["f1", "f2", "f3", "f4"],
+        "cepstral": ["mfcc_1", "mfcc_2", "...", "mfcc_13"],
+        "pitch": ["f0_mean", "f0_std", "f0_range", "jitter", "shimmer"],
+        # Names accepted by the `features` parameter of the analysis endpoints
+        "groups": {
+            "features": {name: list(node.fields) for name, node in FEATURES.items()},
+            "scores": {name: list(inputs) for name, inputs in SCORES.items()},
+        },
+    }
+
+
+@router.get("/scoring-info")
+async def scoring_info():
+    """Get information about the scoring methodology."""
+    norms = get_reference_norms()
+    return {
+        "timbre": {
+            "brightness": "Normalized spectral centroid + rolloff (0-100)",
+            "breathiness": "Inverse HNR + noise energy above 3.5kHz (0-100)",
+            "warmth": "Low harmonic strength + spectral slope (0-100)",
+            "roughness": "Inharmonicity + jitter/shimmer (0-100)",
+        },
+        "weight": {
+            "light_heavy": "CPP + spectral tilt + H1-H2 (0-100, 0=light, 100=heavy)",
+            "pressed_breathy": "HNR + open quotient proxy (0-100, 0=breathy, 100=pressed)",
+        },
+        "placement": {
+            "forwardness": "2.5-4kHz energy + ring peak + formant stability (0-100)",
+            "ring_index": "Singer's formant (2.5-3.5kHz) strength (0-100)",
+            "nasality": "Anti-resonance detection (0-100)",
+        },
+        "sweet_spot": {
+            "formula": "0.25×Clarity + 0.20×Warmth + 0.20×Presence + 0.15×Smoothness + 0.20×(100-Harshness)",
+            "range": "0-100",
+        },
+        "normalization": {
+            "method": "50 + 25×z against reference norms per audio type and voice class; fixed ranges where too few references",
+            "norms": norms.describe() if norms is not None else None,
+        },
+    }
+
 
 @router.get("/")
 async def list_analyses(
@@ -193,10 +605,53 @@ async def get_analysis(analysis_id: str):
         "placement": analysis['placement'],
         "sweet_spot": analysis['sweet_spot'],
         "features": analysis['features'],
+        "tracks_url": analysis.get('tracks_url'),
         "analyzed_at": analysis['created_at'].isoformat(),
     }
 
 
+@router.get("/{analysis_id}/tracks")
+async def get_analysis_tracks(
+    analysis_id: str,
+    resolution: int = Query(1000, ge=16, le=20000, description="Maximum points per track"),
+    start: float = Query(0.0, ge=0, description="Window start in seconds"),
+    end: Optional[float] = Query(None, gt=0, description="Window end in seconds"),
+    tracks: Optional[str] = Query(None, description="Comma-separated track names"),
+):
+    """
+    Get frame-level feature tracks for charting.
+    
+    Serves the finest precomputed min/max level with at most `resolution`
+    points in the requested window.
+    """
+    analysis = await db.get_analysis(analysis_id)
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    if not analysis.get('tracks_url'):
+        raise HTTPException(status_code=404, detail="No feature tracks stored for this analysis")
+    
+    names = None
+    if tracks:
+        names = [name.strip() for name in tracks.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(TRACK_NAMES))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown tracks: {', '.join(unknown)}. Available: {', '.join(TRACK_NAMES)}"
+            )
+    
+    data = await storage.get_file(analysis['tracks_url'])
+    if data is None:
+        raise HTTPException(status_code=404, detail="Feature tracks file not found")
+    
+    return {
+        "id": str(analysis['id']),
+        **load_tracks(data, resolution, start, end, names),
+    }
+
+
 @router.delete("/{analysis_id}")
 async def delete_analysis(analysis_id: str):
     """Delete an analysis."""
@@ -213,52 +668,3 @@ async def delete_analysis(analysis_id: str):
     await db.delete_analysis(analysis_id)
     
     return {"deleted": analysis_id, "status": "success"}
-
-
-@router.get("/features")
-async def list_features():
-    """List all extractable acoustic features."""
-    return {
-        "spectral": [
-            "spectral_centroid",
-            "spectral_rolloff",
-            "spectral_contrast",
-            "spectral_flatness",
-        ],
-        "harmonic": [
-            "hnr",
-            "cpp",
-            "h1_h2",
-            "h1_a2",
-            "h1_a3",
-        ],
-        "formants": ["f1", "f2", "f3", "f4"],
-        "cepstral": ["mfcc_1", "mfcc_2", "...", "mfcc_13"],
-        "pitch": ["f0_mean", "f0_std", "f0_range", "jitter", "shimmer"],
-    }
-
-
-@router.get("/scoring-info")
-async def scoring_info():
-    """Get information about the scoring methodology."""
-    return {
-        "timbre": {
-            "brightness": "Normalized spectral centroid + rolloff (0-100)",
-            "breathiness": "Inverse HNR + noise energy above 3.5kHz (0-100)",
-            "warmth": "Low harmonic strength + spectral slope (0-100)",
-            "roughness": "Inharmonicity + jitter/shimmer (0-100)",
-        },
-        "weight": {
-            "light_heavy": "CPP + spectral tilt + H1-H2 (0-100, 0=light, 100=heavy)",
-            "pressed_breathy": "HNR + open quotient proxy (0-100, 0=breathy, 100=pressed)",
-        },
-        "placement": {
-            "forwardness": "2.5-4kHz energy + ring peak + formant stability (0-100)",
-            "ring_index": "Singer's formant (2.5-3.5kHz) strength (0-100)",
-            "nasality": "Anti-resonance detection (0-100)",
-        },
-        "sweet_spot": {
-            "formula": "0.25×Clarity + 0.20×Warmth + 0.20×Presence + 0.15×Smoothness + 0.20×(100-Harshness)",
-            "range": "0-100",
-        },
-    }
@@ -4,8 +4,6 @@ Biometrics Router - Voice Signature and Verification Endpoints
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
 from typing import List, Optional
-import tempfile
-import os
 import numpy as np
 
 from app.models.schemas import (
@@ -15,7 +13,9 @@ from app.models.schemas import (
     VerificationResponse,
     VoiceSignature,
 )
-from app.services.embeddings import extract_embedding, compute_similarity, aggregate_embeddings
+from app.services.embeddings import extract_embedding_sync, compute_similarity, aggregate_embeddings
+from app.services.executor import analysis_executor
+from app.services.ingest import ingest_upload
 from app.services.database import db
 from app.services.storage import storage
 
@@ -52,20 +52,19 @@ async def enroll_voice(
         quality_scores = []
         
         for file in files:
-            # Save and process each file
-            content = await file.read()
+            # Stream each file to a temp file without buffering it in memory
+            upload = await ingest_upload(file, store=False)
             
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-                tmp.write(content)
-                tmp_path = tmp.name
-            
-            # Extract embedding
-            embedding, quality = await extract_embedding(tmp_path)
-            embeddings.append(embedding)
-            quality_scores.append(quality)
-            
-            # Cleanup
-            os.unlink(tmp_path)
+            try:
+                # Extract embedding
+                embedding, quality = await analysis_executor.run(
+                    extract_embedding_sync, upload.source, "ecapa_tdnn", upload.suffix
+                )
+                embeddings.append(embedding)
+                quality_scores.append(quality)
+            finally:
+                # Cleanup
+                upload.cleanup()
         
         # Compute centroid from embeddings
         centroid = aggregate_embeddings(embeddings, method="mean")
@@ -115,17 +114,17 @@ async def verify_identity(
     """
     
     try:
-        # Save uploaded file
-        content = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Stream uploaded file to a temp file
+        upload = await ingest_upload(file, store=False)
         
-        # Extract embedding from test sample
-        test_embedding, quality = await extract_embedding(tmp_path)
-        
-        # Cleanup
-        os.unlink(tmp_path)
+        try:
+            # Extract embedding from test sample
+            test_embedding, quality = await analysis_executor.run(
+                extract_embedding_sync, upload.source, "ecapa_tdnn", upload.suffix
+            )
+        finally:
+            # Cleanup
+            upload.cleanup()
         
         # Anti-spoofing checks (basic implementation)
         anti_spoofing = {
@@ -10,7 +10,6 @@ import io
 
 from app.services.database import db
 from app.services.storage import storage
-from app.services.pdf_generator import generate_analysis_pdf
 
 router = APIRouter()
 
@@ -47,7 +46,9 @@ async def create_report(request: ReportCreate):
     
     try:
         if request.format == "pdf":
-            # Generate PDF
+            # Generate PDF (reportlab is imported on first use, not at startup)
+            from app.services.pdf_generator import generate_analysis_pdf
+
             pdf_data = await generate_analysis_pdf(analysis)
             filename = f"voxmaster_analysis_{analysis['id'][:8]}.pdf"
             content_type = "application/pdf"
@@ -66,13 +67,13 @@ async def create_report(request: ReportCreate):
             # Export scores as CSV
             csv_lines = ["category,metric,value"]
             
-            for metric, value in analysis.get('timbre', {}).items():
+            for metric, value in (analysis.get('timbre') or {}).items():
                 csv_lines.append(f"timbre,{metric},{value}")
-            for metric, value in analysis.get('weight', {}).items():
+            for metric, value in (analysis.get('weight') or {}).items():
                 csv_lines.append(f"weight,{metric},{value}")
-            for metric, value in analysis.get('placement', {}).items():
+            for metric, value in (analysis.get('placement') or {}).items():
                 csv_lines.append(f"placement,{metric},{value}")
-            for metric, value in analysis.get('sweet_spot', {}).items():
+            for metric, value in (analysis.get('sweet_spot') or {}).items():
                 csv_lines.append(f"sweet_spot,{metric},{value}")
             
             pdf_data = "\n".join(csv_lines).encode('utf-8')
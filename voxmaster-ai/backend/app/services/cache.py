@@ -0,0 +1,111 @@
+"""
+Analysis Result Cache
+
+Content-addressed cache of analysis results (features and scores), keyed
+by the SHA-256 of the uploaded bytes plus audio type, prompt type and the
+feature-extractor version (plus the requested feature subset and the
+extraction settings, if not the defaults). Only extraction inputs are
+part of the key: callers re-score cached features on every hit, so a
+scoring or reference-norms change never invalidates the cache.
+Two tiers:
+
+- an in-process LRU of recent results
+- the analyses table itself, via the indexed cache_key column
+
+A hit skips decoding and the whole DSP pipeline.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services.database import db
+from app.services.feature_extraction import EXTRACTOR_VERSION
+from app.services.feature_graph import FULL_PLAN, FeaturePlan
+
+
+RECORD_FIELDS = ("timbre", "weight", "placement", "sweet_spot", "features", "tracks_url", "fallbacks")
+
+
+class AnalysisCache:
+    """Two-tier (LRU + database) cache of analysis records."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        content_sha256: str,
+        audio_type: str,
+        prompt_type: str,
+        plan: FeaturePlan = FULL_PLAN,
+    ) -> str:
+        """Cache key for an upload digest and analysis parameters."""
+        material = f"{content_sha256}:{audio_type}:{prompt_type}:{EXTRACTOR_VERSION}"
+        if not plan.is_full:
+            material += f":features={plan.key}"
+        if settings.analysis_voiced_only:
+            material += ":voiced"
+        if not settings.analysis_denoise:
+            material += ":raw"
+        if settings.analysis_pitch_backend != "praat":
+            material += f":pitch={settings.analysis_pitch_backend}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached record (timbre, weight, placement, sweet_spot, features)."""
+        record = self.entries.get(key)
+        if record is not None:
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return record
+
+        try:
+            row = await db.find_analysis_by_cache_key(key)
+        except Exception as e:
+            print(f"Warning: analysis cache lookup failed: {e}")
+            row = None
+
+        if row is not None:
+            record = {field: row.get(field) for field in RECORD_FIELDS}
+            self._remember(key, record)
+            self.persistent_hits += 1
+            return record
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, record: Dict[str, Any]):
+        """Store a freshly computed record in the in-process tier."""
+        self._remember(key, {field: record.get(field) for field in RECORD_FIELDS})
+
+    def _remember(self, key: str, record: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = record
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for sizing the cache."""
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "extractor_version": EXTRACTOR_VERSION,
+        }
+
+
+# Global analysis cache instance
+analysis_cache = AnalysisCache(max_entries=settings.analysis_cache_entries)
@@ -0,0 +1,233 @@
+"""
+Cepstral Analysis
+
+Source-strength measures for the Vocal Weight scores, computed for every
+voiced pitch frame at once:
+
+- CPPS: smoothed Cepstral Peak Prominence, the height of the cepstral peak
+  at the pitch period above the cepstrum's regression line (Hillenbrand;
+  smoothed over quefrency and adjacent frames as in Praat's CPPS)
+- H1-H2, H1-A2, H1-A3: level of the first harmonic relative to the second
+  harmonic and to the strongest harmonics near F2 and F3 (uncorrected)
+
+Frames are cut at the times of the existing Praat pitch track and the
+harmonics are located from its F0, so nothing is re-estimated: one windowed
+FFT of the frame matrix gives both the harmonic levels and, through a
+second FFT of the dB spectrum, the cepstra.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.tracks import nearest_frames
+
+
+# Shortest analysis frame; long enough for several periods at typical F0
+CEPSTRAL_MIN_FRAME_SECONDS = 0.04
+
+# Quefrency smoothing of the cepstrum (Praat CPPS default)
+CEPSTRAL_QUEFRENCY_SMOOTHING = 0.0005
+
+# Regression line for the prominence starts at this quefrency (seconds)
+CEPSTRAL_TREND_START = 0.001
+
+# The cepstral peak is searched within this factor of the pitch period
+CEPSTRAL_PEAK_TOLERANCE = 1.15
+
+# Harmonic peaks are searched within this fraction of F0 around k * F0
+HARMONIC_TOLERANCE = 0.1
+
+# Frames processed per FFT batch (bounds memory on long recordings)
+CEPSTRAL_BATCH_FRAMES = 256
+
+# Values reported when there is no voiced frame
+DEFAULT_CPP = 12.0
+DEFAULT_H1_H2 = 4.0
+
+
+@dataclass
+class CepstralFrames:
+    """Per-frame measures at the voiced pitch frames (NaN = undefined)."""
+    times: np.ndarray
+    cpp: np.ndarray
+    h1_h2: np.ndarray
+    h1_a2: np.ndarray
+    h1_a3: np.ndarray
+
+    def means(self) -> Dict[str, Optional[float]]:
+        """Mean of each measure over the frames where it is defined."""
+        def mean(values: np.ndarray) -> Optional[float]:
+            values = values[np.isfinite(values)]
+            return float(values.mean()) if len(values) else None
+
+        return {
+            "cpp": mean(self.cpp),
+            "h1_h2": mean(self.h1_h2),
+            "h1_a2": mean(self.h1_a2),
+            "h1_a3": mean(self.h1_a3),
+        }
+
+
+def cepstral_frames(
+    audio: np.ndarray,
+    sr: int,
+    times: np.ndarray,
+    f0: np.ndarray,
+    formants: Optional[Dict[int, np.ndarray]] = None,
+    min_pitch: float = 75.0,
+    max_pitch: float = 500.0,
+    frame_index: Optional[np.ndarray] = None,
+) -> CepstralFrames:
+    """
+    Cepstral and harmonic measures for voiced frames.
+
+    Args:
+        audio: Mono signal
+        sr: Sample rate
+        times: Frame centers in seconds (the voiced pitch frames)
+        f0: F0 of each frame in Hz
+        formants: Optional {2: F2, 3: F3} per frame in Hz (NaN = undefined)
+        min_pitch, max_pitch: Pitch range bounding the cepstral peak search
+        frame_index: Frame numbers on the pitch grid; adjacent frames
+            (consecutive numbers) are averaged for the smoothed cepstrum
+
+    Returns:
+        CepstralFrames aligned with `times`
+    """
+    times = np.asarray(times, dtype=np.float64)
+    f0 = np.asarray(f0, dtype=np.float64)
+    n = len(times)
+    formants = formants or {}
+    out = {name: np.full(n, np.nan) for name in ("cpp", "h1_h2", "h1_a2", "h1_a3")}
+    if n == 0:
+        return CepstralFrames(times=times, **out)
+
+    frame_length = int(round(max(CEPSTRAL_MIN_FRAME_SECONDS, 3.0 / min_pitch) * sr))
+    # Zero-padded to twice the next power of two for finer harmonic peaks
+    n_fft = 2 * (1 << (frame_length - 1).bit_length())
+    window = np.hanning(frame_length + 1)[:-1].astype(np.float32)
+    padded = np.pad(np.asarray(audio, dtype=np.float32), frame_length // 2)
+    bin_hz = sr / n_fft
+
+    # Quefrency bins used for the trend line and the peak search
+    quefrency = np.arange(n_fft // 2 + 1) / sr
+    q_first = int(np.ceil(CEPSTRAL_TREND_START * sr))
+    q_last = min(int(np.ceil(sr / min_pitch * CEPSTRAL_PEAK_TOLERANCE)), n_fft // 2)
+    q_axis = quefrency[q_first:q_last + 1]
+    trend = np.linalg.pinv(np.stack([q_axis, np.ones_like(q_axis)], axis=1))
+    smoothing = max(1, int(round(CEPSTRAL_QUEFRENCY_SMOOTHING * sr)))
+
+    if frame_index is None:
+        frame_index = np.arange(n)
+    frame_index = np.asarray(frame_index)
+
+    for start in range(0, n, CEPSTRAL_BATCH_FRAMES):
+        batch = slice(start, min(start + CEPSTRAL_BATCH_FRAMES, n))
+        centers = np.round(times[batch] * sr).astype(np.int64)
+        index = np.clip(centers, 0, len(padded) - frame_length)[:, None] + np.arange(frame_length)
+        frames = padded[index] * window
+
+        spectrum_db = 10.0 * np.log10(np.abs(np.fft.rfft(frames, n=n_fft, axis=1)) ** 2 + 1e-12)
+
+        # Power cepstrum of the dB spectrum, in dB
+        cepstrum = np.abs(np.fft.irfft(spectrum_db, n=n_fft, axis=1)[:, :q_last + smoothing + 1]) ** 2
+        cepstrum = 10.0 * np.log10(cepstrum + 1e-12)
+        cepstrum = _smooth_frames(cepstrum, frame_index[batch])
+        cepstrum = _moving_average(cepstrum, smoothing)[:, q_first:q_last + 1]
+
+        slope, intercept = trend @ cepstrum.T
+        period = 1.0 / f0[batch]
+        lo = np.maximum(period / CEPSTRAL_PEAK_TOLERANCE, 1.0 / max_pitch)
+        hi = np.minimum(period * CEPSTRAL_PEAK_TOLERANCE, 1.0 / min_pitch)
+        in_range = (q_axis >= lo[:, None]) & (q_axis <= hi[:, None])
+        peak = np.argmax(np.where(in_range, cepstrum, -np.inf), axis=1)
+        rows = np.arange(len(peak))
+        cpp = cepstrum[rows, peak] - (slope * q_axis[peak] + intercept)
+        out["cpp"][batch] = np.where(in_range.any(axis=1), cpp, np.nan)
+
+        f = f0[batch]
+        h1 = _band_peak(spectrum_db, bin_hz, f, HARMONIC_TOLERANCE * f)
+        h2 = _band_peak(spectrum_db, bin_hz, 2 * f, HARMONIC_TOLERANCE * f)
+        out["h1_h2"][batch] = h1 - h2
+        for k, name in ((2, "h1_a2"), (3, "h1_a3")):
+            if k in formants:
+                # The strongest harmonic within half a harmonic spacing of Fk
+                a = _band_peak(spectrum_db, bin_hz, np.asarray(formants[k])[batch], 0.5 * f)
+                out[name][batch] = h1 - a
+
+    return CepstralFrames(times=times, **out)
+
+
+def praat_cepstral_frames(praat) -> CepstralFrames:
+    """Cepstral measures at the voiced frames of a PraatContext's pitch track."""
+    from parselmouth.praat import call
+
+    track = praat.pitch_track
+    voiced = np.flatnonzero(track.voiced)
+    times = track.times[voiced]
+
+    formant = praat.formant
+    formants = {}
+    for k in (2, 3):
+        matrix = call(formant, "To Matrix", k)
+        values = matrix.values[0].astype(np.float64)
+        values[values <= 0] = np.nan
+        formants[k] = nearest_frames(matrix.xs(), values, times, formant.time_step)
+
+    return cepstral_frames(
+        praat.audio,
+        praat.sr,
+        times,
+        track.f0[voiced],
+        formants,
+        praat.min_pitch,
+        praat.max_pitch,
+        frame_index=voiced,
+    )
+
+
+def _smooth_frames(values: np.ndarray, frame_index: np.ndarray) -> np.ndarray:
+    """Average each row with its immediate neighbours on the pitch grid."""
+    if len(values) < 2:
+        return values
+    adjacent = np.diff(frame_index) == 1
+    total = values.copy()
+    count = np.ones(len(values))
+    total[1:][adjacent] += values[:-1][adjacent]
+    total[:-1][adjacent] += values[1:][adjacent]
+    count[1:] += adjacent
+    count[:-1] += adjacent
+    return total / count[:, None]
+
+
+def _moving_average(values: np.ndarray, width: int) -> np.ndarray:
+    """Centered moving average along the last axis (edges averaged over fewer bins)."""
+    if width <= 1:
+        return values
+    cumulative = np.cumsum(np.pad(values, ((0, 0), (1, 0))), axis=1)
+    n = values.shape[1]
+    half = width // 2
+    lo = np.clip(np.arange(n) - half, 0, n)
+    hi = np.clip(np.arange(n) + half + 1, 0, n)
+    return (cumulative[:, hi] - cumulative[:, lo]) / (hi - lo)
+
+
+def _band_peak(spectrum_db: np.ndarray, bin_hz: float, center: np.ndarray, half_width: np.ndarray) -> np.ndarray:
+    """Per-row maximum of the dB spectrum within center +/- half_width Hz."""
+    center = np.asarray(center, dtype=np.float64)
+    defined = np.isfinite(center) & np.isfinite(half_width)
+    safe_center = np.where(defined, center, 0.0)
+    safe_half = np.where(defined, half_width, 0.0)
+
+    n_bins = spectrum_db.shape[1]
+    lo = np.clip(np.floor((safe_center - safe_half) / bin_hz), 0, n_bins - 1).astype(np.int64)
+    hi = np.clip(np.ceil((safe_center + safe_half) / bin_hz), 0, n_bins - 1).astype(np.int64)
+    width = int((hi - lo).max()) + 1 if len(lo) else 1
+
+    index = lo[:, None] + np.arange(width)
+    inside = index <= hi[:, None]
+    values = np.take_along_axis(spectrum_db, np.minimum(index, n_bins - 1), axis=1)
+    peak = np.where(inside, values, -np.inf).max(axis=1)
+    return np.where(defined, peak, np.nan)
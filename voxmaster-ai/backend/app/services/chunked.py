@@ -0,0 +1,336 @@
+"""
+Chunked Analysis
+
+Bounded-memory analysis for very long recordings (lessons, rehearsals).
+Instead of decoding the whole take into one array, the file is read in
+fixed-size blocks padded with a little audio from each neighbour, and
+every extractor runs per block. Only the core of each block (the part
+not shared with a neighbour) contributes to the result, and per-block
+values are merged with running statistics, so peak memory depends on the
+block size and not on the recording length.
+
+Two passes over the file:
+1. loudness: global RMS for the normalization gain and a streaming
+   histogram of frame energy whose percentiles give the same adaptive VAD
+   threshold as detect_voiced_segments; for noise reduction, dB spectra
+   are also summed per energy bin so the profile of the frames below the
+   threshold is known once the threshold is; for sung audio, the
+   accompaniment detector's evidence is accumulated as well
+2. features: spectral, MFCC and Praat statistics per block (after noise
+   reduction and, when accompaniment was detected, vocal isolation), plus
+   each block core's slice of the frame-level feature tracks
+
+Files soundfile cannot seek in (M4A/AAC via ffmpeg) are analyzed in one
+buffer by the regular pipeline.
+"""
+
+import io
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import AudioType, AcousticFeatures
+from app.services.decoder import ANALYSIS_SAMPLE_RATE, AudioSource, _to_mono, resample
+from app.services.denoise import NoiseProfile, spectral_gate
+from app.services.feature_stats import FeatureStats
+from app.services.preprocessing import detect_voiced_segments, vad_threshold_db
+from app.services.praat import PraatContext
+from app.services.separation import AccompanimentStats, separate_vocals
+from app.services.spectral import SpectralContext
+from app.services.timing import StageTimings
+from app.services.tracks import TRACK_FRAME_PERIOD, FeatureTracks, sample_tracks
+
+
+# Context read on each side of a block; covers the longest Praat window
+# (3 periods at 50 Hz), half an STFT frame and the resampler's transient.
+BLOCK_PAD_SECONDS = 0.5
+
+
+class StreamingQuantiles:
+    """Approximate quantiles from a fixed-bin histogram (constant memory)."""
+
+    def __init__(self, low: float, high: float, bins: int):
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def update(self, values: np.ndarray):
+        clipped = np.clip(values, self.edges[0], self.edges[-1])
+        self.counts += np.histogram(clipped, bins=self.edges)[0]
+
+    def quantile(self, q: float) -> float:
+        """Value below which a fraction q of observations fall."""
+        cdf = np.cumsum(self.counts)
+        if cdf[-1] == 0:
+            return np.nan
+        target = q * cdf[-1]
+        i = int(np.searchsorted(cdf, target))
+        below = cdf[i - 1] if i > 0 else 0
+        fraction = (target - below) / max(self.counts[i], 1)
+        return float(self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i]))
+
+
+class NoiseSpectra:
+    """
+    Per-bin dB spectrum sums grouped by frame energy (1 dB bins).
+
+    Lets the noise profile of the frames below a threshold be computed
+    after a streaming pass, when the threshold is finally known.
+    """
+
+    def __init__(self, low: float = -200.0, high: float = 20.0):
+        self.low = low
+        self.n_bins = int(high - low)
+        self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        self.sums: Optional[np.ndarray] = None
+        self.squares: Optional[np.ndarray] = None
+
+    def update(self, rms_db: np.ndarray, magnitude: np.ndarray):
+        """Add (bins, frames) magnitudes with their frame energies."""
+        if self.sums is None:
+            self.sums = np.zeros((self.n_bins, magnitude.shape[0]))
+            self.squares = np.zeros_like(self.sums)
+        index = np.clip((rms_db - self.low).astype(np.int64), 0, self.n_bins - 1)
+        db = 20.0 * np.log10(np.maximum(magnitude.T, 1e-10)).astype(np.float64)
+        np.add.at(self.counts, index, 1)
+        np.add.at(self.sums, index, db)
+        np.add.at(self.squares, index, db ** 2)
+
+    def profile(self, threshold_db: float, shift_db: float = 0.0) -> Optional[NoiseProfile]:
+        """Noise profile of the frames below threshold_db, shifted by shift_db."""
+        if self.sums is None:
+            return None
+        below = slice(0, int(np.clip(threshold_db - self.low, 0, self.n_bins)))
+        n_frames = int(self.counts[below].sum())
+        total = self.sums[below].sum(axis=0)
+        squares = self.squares[below].sum(axis=0)
+        # A constant gain moves every dB value by shift_db; the spread is unchanged
+        squares = squares + 2 * shift_db * total + n_frames * shift_db ** 2
+        total = total + n_frames * shift_db
+        return NoiseProfile.from_sums(total, squares, n_frames)
+
+
+def probe_duration(source: AudioSource) -> Optional[float]:
+    """Duration in seconds without decoding, or None if blocks can't be read."""
+    if not isinstance(source, (str, bytes, bytearray, memoryview)):
+        return None
+    try:
+        import soundfile as sf
+
+        info = sf.info(_as_file(source))
+        return info.frames / info.samplerate
+    except Exception:
+        return None
+
+
+def iter_blocks(
+    source: AudioSource,
+    block_seconds: float,
+    sr: int = ANALYSIS_SAMPLE_RATE,
+    hop_length: int = 512,
+) -> Iterator[Tuple[np.ndarray, int, int, bool]]:
+    """
+    Read a file as padded mono blocks at rate sr.
+
+    Yields (block, core_start, core_end, is_last) with core bounds relative
+    to the block. Core starts are multiples of hop_length, so block STFT
+    frames line up with the frames of a whole-file STFT.
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(_as_file(source)) as f:
+        native_sr = f.samplerate
+        total = int(round(f.frames * sr / native_sr))
+        core = max(hop_length, int(block_seconds * sr) // hop_length * hop_length)
+        pad = int(BLOCK_PAD_SECONDS * sr) // hop_length * hop_length
+
+        for core_start in range(0, total, core):
+            core_end = min(core_start + core, total)
+            start = max(0, core_start - pad)
+            end = min(total, core_end + pad)
+
+            first = int(round(start * native_sr / sr))
+            f.seek(first)
+            data = f.read(int(round(end * native_sr / sr)) - first, dtype="float32", always_2d=True)
+            block = _to_mono(data)
+            if native_sr != sr:
+                block = resample(block, native_sr, sr)
+
+            yield block, core_start - start, core_end - start, core_end == total
+
+
+def extract_features_chunked(
+    source: AudioSource,
+    audio_type: AudioType,
+    block_seconds: float,
+    voiced_only: bool = False,
+    denoise: bool = True,
+    progress: Optional[Callable[[str], None]] = None,
+    target_db: float = -23.0,
+    with_tracks: bool = True,
+    timings: Optional[StageTimings] = None,
+) -> Tuple[AcousticFeatures, float, Optional[FeatureTracks]]:
+    """
+    Extract AcousticFeatures from a long file block by block.
+
+    Matches extract_features_sync on the whole buffer within tolerance
+    (F0 range uses frame extrema rather than Praat's parabolic peaks).
+    With voiced_only, each block is segmented by detect_voiced_segments
+    using a file-wide threshold, and frames outside the voiced segments
+    are left out of the spectral, MFCC, F0 and HNR statistics. With
+    denoise, every block is spectrally gated against one file-wide noise
+    profile, estimated from the frames below the VAD threshold. Sung
+    audio goes through vocal isolation block by block when the detector,
+    fed every block core, finds accompaniment anywhere in the file.
+
+    Time per stage is added to `timings` when given (decoding, the
+    preprocessing steps and feature extraction, summed over both passes),
+    with a "features.<group>.<field>" fallback for every feature that no
+    block measured. The innermost timed stage that raised is left in
+    timings.failed.
+
+    Returns (features, duration in seconds, feature tracks or None).
+    """
+    sr = ANALYSIS_SAMPLE_RATE
+    hop = 512
+    if timings is None:
+        timings = StageTimings()
+
+    # Pass 1: loudness (and frame-energy distribution for the VAD threshold,
+    # with dB spectra summed per energy bin for the noise profile)
+    sum_squares = 0.0
+    n_samples = 0
+    energy = StreamingQuantiles(-200.0, 20.0, 2200) if voiced_only or denoise else None
+    noise = NoiseSpectra() if denoise else None
+    accompaniment = AccompanimentStats() if audio_type == AudioType.SUNG else None
+    for block, core_start, core_end, is_last in _timed(iter_blocks(source, block_seconds, sr, hop), timings):
+        with timings.stage("preprocess.loudness"):
+            core = block[core_start:core_end].astype(np.float64)
+            sum_squares += float(np.dot(core, core))
+            n_samples += len(core)
+            if energy is not None:
+                frames = _core_frames(core_start, core_end, is_last, hop)
+                spectral = SpectralContext(block, sr)
+                rms_db = 20.0 * np.log10(np.maximum(spectral.rms()[frames], 1e-10))
+                energy.update(rms_db)
+                if noise is not None:
+                    noise.update(rms_db, spectral.magnitude()[:, frames])
+        if accompaniment is not None:
+            # Ratios only, so the normalization gain does not matter yet
+            with timings.stage("preprocess.accompaniment"):
+                accompaniment.update(block[core_start:core_end], sr)
+
+    if n_samples == 0:
+        raise ValueError("Empty audio file")
+
+    rms = np.sqrt(sum_squares / n_samples)
+    gain = (10 ** (target_db / 20)) / rms if rms > 0 else 1.0
+    threshold_db = None
+    profile = None
+    if energy is not None:
+        # Normalization shifts every frame by the same number of dB
+        shift = 20.0 * np.log10(gain)
+        file_threshold_db = vad_threshold_db(
+            energy.quantile(0.10) + shift, energy.quantile(0.95) + shift
+        )
+        if voiced_only:
+            threshold_db = file_threshold_db
+        if noise is not None:
+            profile = noise.profile(file_threshold_db - shift, shift)
+    isolate = accompaniment is not None and accompaniment.detected
+
+    if progress is not None:
+        progress("decoded")
+        progress("preprocessed")
+
+    # Pass 2: per-block features merged into running statistics
+    stats = FeatureStats()
+    track_parts = []
+    offset = 0  # samples of the file before the current block core
+
+    for block, core_start, core_end, is_last in _timed(iter_blocks(source, block_seconds, sr, hop), timings):
+        block = np.clip(block * gain, -1.0, 1.0)
+        spectral = SpectralContext(block, sr)
+        frames = _core_frames(core_start, core_end, is_last, hop)
+
+        voiced = None
+        segments = None
+        if threshold_db is not None:
+            with timings.stage("preprocess.vad"):
+                segments = detect_voiced_segments(block, sr, spectral=spectral, threshold_db=threshold_db)
+                centers = np.arange(frames.start, frames.stop) * hop / sr
+                inside = (centers[:, None] >= segments[:, 0]) & (centers[:, None] < segments[:, 1])
+                voiced = inside.any(axis=1)
+
+        if profile is not None:
+            # VAD runs on the signal before gating, as in preprocess_signal
+            with timings.stage("preprocess.denoise"):
+                block, gated = spectral_gate(block, sr, profile, spectral.n_fft, hop)
+                spectral = SpectralContext(block, sr, spectral.n_fft, hop, magnitude=gated)
+
+        if isolate:
+            with timings.stage("preprocess.separation"):
+                block, separated = separate_vocals(block, sr, spectral.n_fft, hop)
+                spectral = SpectralContext(block, sr, spectral.n_fft, hop, magnitude=separated)
+
+        feature_start = time.perf_counter()
+        stats.add_spectral(spectral, frames, voiced)
+
+        tmin, tmax = core_start / sr, core_end / sr
+
+        def in_core(times: np.ndarray) -> np.ndarray:
+            keep = (times >= tmin) & (times < tmax)
+            if voiced is not None:
+                index = np.clip(np.round(times * sr / hop).astype(np.int64) - frames.start, 0, len(voiced) - 1)
+                keep &= voiced[index]
+            return keep
+
+        praat = PraatContext(block, sr, audio_type)
+        stats.add_praat(praat, tmin, tmax, in_core)
+
+        if with_tracks:
+            # Track grid points (file time) that fall inside this core
+            core_length = core_end - core_start
+            first = int(np.ceil(offset / sr / TRACK_FRAME_PERIOD - 1e-9))
+            if is_last:
+                stop = int((offset + core_length) / sr / TRACK_FRAME_PERIOD) + 1
+            else:
+                stop = int(np.ceil((offset + core_length) / sr / TRACK_FRAME_PERIOD - 1e-9))
+            times = np.arange(first, stop) * TRACK_FRAME_PERIOD - (offset - core_start) / sr
+            valid = None
+            if segments is not None:
+                valid = ((times[:, None] >= segments[:, 0]) & (times[:, None] < segments[:, 1])).any(axis=1)
+            track_parts.append(sample_tracks(spectral, praat, times, valid=valid))
+
+        timings.add("features", time.perf_counter() - feature_start)
+        offset += core_end - core_start
+
+    tracks = FeatureTracks.concatenate(track_parts) if track_parts else None
+    feature_timings = StageTimings()
+    features = stats.to_features(feature_timings)
+    timings.merge(feature_timings, prefix="features.")
+    return features, n_samples / sr, tracks
+
+
+def _timed(blocks: Iterator, timings: StageTimings) -> Iterator:
+    """Pass blocks through, adding the time spent reading them to "decode"."""
+    while True:
+        with timings.stage("decode"):
+            block = next(blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+def _core_frames(core_start: int, core_end: int, is_last: bool, hop_length: int) -> slice:
+    """STFT frames (centered) whose centers fall inside the block core."""
+    last = -(-core_end // hop_length)
+    if is_last and core_end % hop_length == 0:
+        last += 1  # whole-file framing has a frame centered on the final sample
+    return slice(core_start // hop_length, last)
+
+
+def _as_file(source: AudioSource):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
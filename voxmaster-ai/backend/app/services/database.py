@@ -8,7 +8,7 @@ Supports demo mode when no database is configured.
 import asyncpg
 import json
 import pickle
-from typing import Optional, List, Dict, Any
+from typing import AsyncIterator, Optional, List, Dict, Any
 from datetime import datetime
 from contextlib import asynccontextmanager
 import numpy as np
@@ -17,6 +17,14 @@ import uuid
 from app.config import settings
 
 
+# Score columns of the analyses table (JSON; null for groups left out of a
+# `features=` subset)
+SCORE_GROUPS = ("timbre", "weight", "placement", "sweet_spot")
+_STORED_SCORES = ", ".join(
+    f"CASE WHEN {group}::text <> 'null' THEN '{group}' END" for group in SCORE_GROUPS
+)
+
+
 class DemoDataStore:
     """In-memory data store for demo mode when no database is available."""
     
@@ -73,12 +81,28 @@ class DatabaseService:
                     command_timeout=60,
                 )
                 print("✅ Connected to Neon PostgreSQL")
+                await self._ensure_schema()
             except Exception as e:
                 print(f"⚠️  Database connection failed: {e}")
                 print("   Running in DEMO MODE - data stored in memory")
                 self.demo_mode = True
                 self.demo_store = DemoDataStore()
     
+    async def _ensure_schema(self):
+        """Add columns introduced after the initial schema, if missing."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    ALTER TABLE analyses ADD COLUMN IF NOT EXISTS cache_key TEXT;
+                    CREATE INDEX IF NOT EXISTS idx_analyses_cache_key ON analyses (cache_key);
+                    ALTER TABLE analyses ADD COLUMN IF NOT EXISTS tracks_url TEXT;
+                    ALTER TABLE analyses ADD COLUMN IF NOT EXISTS fallbacks JSONB;
+                    """
+                )
+        except Exception as e:
+            print(f"⚠️  Could not update analyses schema: {e}")
+    
     async def disconnect(self):
         """Close connection pool."""
         if self.pool:
@@ -295,8 +319,16 @@ class DatabaseService:
         placement: Dict[str, Any],
         sweet_spot: Dict[str, Any],
         features: Dict[str, Any],
+        cache_key: Optional[str] = None,
+        tracks_url: Optional[str] = None,
+        fallbacks: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
-        """Create a new analysis record."""
+        """
+        Create a new analysis record.
+
+        fallbacks lists the pipeline stages and features that took default
+        values instead of measurements (see AnalysisResult.fallbacks).
+        """
         if self.demo_mode:
             analysis_id = str(uuid.uuid4())
             analysis = {
@@ -310,6 +342,9 @@ class DatabaseService:
                 "placement": placement,
                 "sweet_spot": sweet_spot,
                 "features": features,
+                "cache_key": cache_key,
+                "tracks_url": tracks_url,
+                "fallbacks": fallbacks,
                 "created_at": datetime.utcnow().isoformat(),
             }
             self.demo_store.analyses[analysis_id] = analysis
@@ -319,22 +354,86 @@ class DatabaseService:
             row = await conn.fetchrow(
                 """
                 INSERT INTO analyses 
-                (filename, audio_url, audio_type, prompt_type, timbre, weight, placement, sweet_spot, features)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                (filename, audio_url, audio_type, prompt_type, timbre, weight, placement, sweet_spot, features,
+                 cache_key, tracks_url, fallbacks)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
                 RETURNING id, filename, audio_url, audio_type, prompt_type, 
-                          timbre, weight, placement, sweet_spot, features, created_at
+                          timbre, weight, placement, sweet_spot, features, tracks_url, fallbacks, created_at
                 """,
                 filename, audio_url, audio_type, prompt_type,
                 json.dumps(timbre), json.dumps(weight), json.dumps(placement),
-                json.dumps(sweet_spot), json.dumps(features)
+                json.dumps(sweet_spot), json.dumps(features), cache_key, tracks_url,
+                json.dumps(fallbacks) if fallbacks is not None else None,
             )
             result = dict(row)
             # Parse JSON fields
-            for field in ['timbre', 'weight', 'placement', 'sweet_spot', 'features']:
+            for field in ['timbre', 'weight', 'placement', 'sweet_spot', 'features', 'fallbacks']:
                 if result.get(field):
                     result[field] = json.loads(result[field])
             return result
     
+    async def create_analyses(self, analyses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create many analysis records in one bulk write.
+
+        Each item takes the same keys as create_analysis. IDs and timestamps
+        are assigned client-side so the whole batch goes through a single
+        executemany in one transaction instead of one round trip per row.
+        """
+        created_at = datetime.utcnow()
+        records = []
+        for item in analyses:
+            records.append({
+                "id": str(uuid.uuid4()),
+                "filename": item["filename"],
+                "audio_url": item.get("audio_url"),
+                "audio_type": item["audio_type"],
+                "prompt_type": item["prompt_type"],
+                "timbre": item["timbre"],
+                "weight": item["weight"],
+                "placement": item["placement"],
+                "sweet_spot": item["sweet_spot"],
+                "features": item["features"],
+                "cache_key": item.get("cache_key"),
+                "tracks_url": item.get("tracks_url"),
+                "fallbacks": item.get("fallbacks"),
+                "created_at": created_at,
+            })
+
+        if not records:
+            return []
+
+        if self.demo_mode:
+            for record in records:
+                self.demo_store.analyses[record["id"]] = {
+                    **record,
+                    "created_at": created_at.isoformat(),
+                }
+            return records
+
+        async with self.connection() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    INSERT INTO analyses
+                    (id, filename, audio_url, audio_type, prompt_type, timbre, weight,
+                     placement, sweet_spot, features, cache_key, tracks_url, fallbacks, created_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+                    """,
+                    [
+                        (
+                            r["id"], r["filename"], r["audio_url"], r["audio_type"],
+                            r["prompt_type"], json.dumps(r["timbre"]), json.dumps(r["weight"]),
+                            json.dumps(r["placement"]), json.dumps(r["sweet_spot"]),
+                            json.dumps(r["features"]), r["cache_key"], r["tracks_url"],
+                            json.dumps(r["fallbacks"]) if r["fallbacks"] is not None else None,
+                            r["created_at"],
+                        )
+                        for r in records
+                    ],
+                )
+        return records
+
     async def get_analysis(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """Get an analysis by ID."""
         if self.demo_mode:
@@ -344,19 +443,173 @@ class DatabaseService:
             row = await conn.fetchrow(
                 """
                 SELECT id, filename, audio_url, audio_type, prompt_type,
-                       timbre, weight, placement, sweet_spot, features, created_at
+                       timbre, weight, placement, sweet_spot, features, tracks_url, fallbacks, created_at
                 FROM analyses WHERE id = $1
                 """,
                 analysis_id
             )
             if row:
                 result = dict(row)
-                for field in ['timbre', 'weight', 'placement', 'sweet_spot', 'features']:
+                for field in ['timbre', 'weight', 'placement', 'sweet_spot', 'features', 'fallbacks']:
+                    if result.get(field):
+                        result[field] = json.loads(result[field])
+                return result
+            return None
+    
+    async def find_analysis_by_cache_key(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent analysis stored under a result-cache key."""
+        if self.demo_mode:
+            matches = [
+                a for a in self.demo_store.analyses.values()
+                if a.get("cache_key") == cache_key
+            ]
+            if not matches:
+                return None
+            return max(matches, key=lambda a: a.get("created_at", ""))
+        
+        async with self.connection() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT id, timbre, weight, placement, sweet_spot, features, tracks_url, fallbacks
+                FROM analyses WHERE cache_key = $1
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                cache_key
+            )
+            if row:
+                result = dict(row)
+                for field in ['timbre', 'weight', 'placement', 'sweet_spot', 'features', 'fallbacks']:
                     if result.get(field):
                         result[field] = json.loads(result[field])
                 return result
             return None
     
+    async def iter_analysis_features(
+        self,
+        since: Optional[datetime] = None,
+        batch_size: int = 1000,
+        after_id: Optional[Any] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream id, audio_type, features, fallbacks, created_at and the
+        names of the stored score groups (`scores`) of stored analyses,
+        oldest first, in batches read through a server-side cursor
+        (constant memory however large the table). fallbacks is None for
+        analyses stored before it was recorded.
+
+        Rows start after `since`, or after the row (since, after_id) when
+        after_id is given, so a consumer can resume from the last row it
+        handled.
+        """
+        if self.demo_mode:
+            analyses = [
+                {
+                    "id": a["id"],
+                    "audio_type": a.get("audio_type"),
+                    "features": a.get("features"),
+                    "fallbacks": a.get("fallbacks"),
+                    "created_at": _as_datetime(a.get("created_at")),
+                    "scores": [group for group in SCORE_GROUPS if a.get(group)],
+                }
+                for a in self.demo_store.analyses.values()
+            ]
+            analyses.sort(key=lambda a: (a["created_at"] or datetime.min, a["id"]))
+            if since is not None:
+                analyses = [
+                    a for a in analyses
+                    if a["created_at"] and (
+                        a["created_at"] > since
+                        or (after_id is not None and a["created_at"] == since and a["id"] > after_id)
+                    )
+                ]
+            for start in range(0, len(analyses), batch_size):
+                yield analyses[start:start + batch_size]
+            return
+        
+        async with self.connection() as conn:
+            async with conn.transaction():
+                # (since, NULL) compares as unknown on equal created_at, so
+                # without after_id only strictly newer rows qualify
+                cursor = await conn.cursor(
+                    f"""
+                    SELECT id, audio_type, features, fallbacks, created_at,
+                           ARRAY_REMOVE(ARRAY[{_STORED_SCORES}], NULL) AS scores
+                    FROM analyses
+                    WHERE $1::timestamptz IS NULL OR (created_at, id) > ($1, $2)
+                    ORDER BY created_at, id
+                    """,
+                    since, after_id,
+                )
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        return
+                    batch = []
+                    for row in rows:
+                        result = dict(row)
+                        for field in ('features', 'fallbacks'):
+                            if result.get(field):
+                                result[field] = json.loads(result[field])
+                        batch.append(result)
+                    yield batch
+    
+    async def update_analysis_scores(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Overwrite the score columns of many analyses in one bulk write.
+
+        Each update holds the analysis "id" and the new score dicts of any
+        of SCORE_GROUPS; groups left out (or None) keep their stored value.
+        Rows are COPYed into a temporary table and applied with a single
+        UPDATE ... FROM, in one transaction. Returns the rows updated.
+        """
+        if not updates:
+            return 0
+
+        if self.demo_mode:
+            updated = 0
+            for update in updates:
+                analysis = self.demo_store.analyses.get(update["id"])
+                if analysis is None:
+                    continue
+                for group in SCORE_GROUPS:
+                    if update.get(group) is not None:
+                        analysis[group] = update[group]
+                updated += 1
+            return updated
+
+        async with self.connection() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"""
+                    CREATE TEMP TABLE rescored ON COMMIT DROP AS
+                    SELECT id, {", ".join(SCORE_GROUPS)} FROM analyses WITH NO DATA
+                    """
+                )
+                await conn.copy_records_to_table(
+                    "rescored",
+                    columns=["id", *SCORE_GROUPS],
+                    records=[
+                        (
+                            update["id"],
+                            *(
+                                json.dumps(update[group]) if update.get(group) is not None else None
+                                for group in SCORE_GROUPS
+                            ),
+                        )
+                        for update in updates
+                    ],
+                )
+                result = await conn.execute(
+                    f"""
+                    UPDATE analyses a SET
+                        {", ".join(f"{group} = COALESCE(r.{group}, a.{group})" for group in SCORE_GROUPS)}
+                    FROM rescored r
+                    WHERE a.id = r.id
+                    """
+                )
+        return int(result.split()[-1]) if result else 0
+    
     async def list_analyses(self, limit: int = 50) -> List[Dict[str, Any]]:
         """List recent analyses."""
         if self.demo_mode:
@@ -649,5 +902,12 @@ class DatabaseService:
             return count
 
 
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Demo-mode timestamps are ISO strings; database rows hold datetimes."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
 # Global database service instance
 db = DatabaseService()
@@ -0,0 +1,175 @@
+"""
+Audio Decoder Service
+
+Decodes uploads straight from memory (or a spooled temp file) to float32
+mono without a temp-file round trip:
+
+- containers libsndfile understands (WAV, FLAC, OGG, AIFF, MP3) are read
+  with soundfile directly from the buffer
+- compressed formats it cannot read (M4A/AAC, ...) are piped through ffmpeg
+
+Audio is decoded once at its native rate into a DecodedAudio; the rates the
+pipeline needs (44.1 kHz for analysis, 16 kHz for embeddings) are derived
+from it on demand with a polyphase resampler and cached.
+"""
+
+import io
+import os
+import subprocess
+import tempfile
+from math import gcd
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+
+# Analysis keeps the singer's formant band (2.5-3.5 kHz) and its upper
+# harmonics well below Nyquist; speaker embeddings are trained at 16 kHz.
+ANALYSIS_SAMPLE_RATE = 44100
+EMBEDDING_SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(Exception):
+    """Raised when no decoder could read the audio."""
+
+
+class DecodedAudio:
+    """
+    A mono signal decoded once at its native sample rate.
+
+    Resampled views are produced lazily by at() and cached, so callers that
+    need several rates share a single decode.
+    """
+
+    def __init__(self, audio: np.ndarray, sample_rate: int):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self._views: Dict[int, np.ndarray] = {sample_rate: audio}
+
+    @classmethod
+    def decode(cls, source: "AudioSource", suffix: str = "") -> "DecodedAudio":
+        """Decode a path, bytes or file object at its native rate."""
+        try:
+            audio, sr = _decode_soundfile(source)
+        except Exception:
+            audio, sr = _decode_ffmpeg(source, suffix)
+        return cls(audio, sr)
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    def at(self, sample_rate: int) -> np.ndarray:
+        """The signal at the given rate (cached after the first call)."""
+        view = self._views.get(sample_rate)
+        if view is None:
+            view = resample(self.audio, self.sample_rate, sample_rate)
+            self._views[sample_rate] = view
+        return view
+
+
+AudioSource = Union[str, bytes, BinaryIO, DecodedAudio]
+
+
+def decode_audio(
+    source: AudioSource,
+    target_sr: Optional[int] = None,
+    suffix: str = "",
+) -> Tuple[np.ndarray, int]:
+    """
+    Decode audio to a float32 mono signal.
+
+    Args:
+        source: File path, raw bytes, a readable binary file object, or an
+            already decoded DecodedAudio (its cached views are reused)
+        target_sr: Resample to this rate (None keeps the native rate)
+        suffix: Original file extension (e.g. ".m4a"), used as a format hint
+            when the ffmpeg fallback has to spill an in-memory buffer to disk
+
+    Returns:
+        Tuple of (audio, sample_rate)
+    """
+    decoded = source if isinstance(source, DecodedAudio) else DecodedAudio.decode(source, suffix)
+    if target_sr is None:
+        return decoded.audio, decoded.sample_rate
+    return decoded.at(target_sr), target_sr
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Polyphase resampling by the reduced integer ratio target_sr / orig_sr."""
+    from scipy.signal import resample_poly
+
+    factor = gcd(orig_sr, target_sr)
+    return resample_poly(audio, target_sr // factor, orig_sr // factor).astype(np.float32)
+
+
+def _decode_soundfile(source: AudioSource) -> Tuple[np.ndarray, int]:
+    import soundfile as sf
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+
+    data, sr = sf.read(source, dtype="float32", always_2d=True)
+    return _to_mono(data), sr
+
+
+def _decode_ffmpeg(source: AudioSource, suffix: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode via an ffmpeg pipe, emitting raw float32 mono PCM.
+
+    Raw PCM carries no header, so ffmpeg resamples to the analysis rate
+    rather than reporting the native one.
+    """
+    sr = ANALYSIS_SAMPLE_RATE
+    command = [
+        "ffmpeg", "-nostdin", "-v", "error",
+        "-i", "pipe:0",
+        "-f", "f32le", "-ac", "1", "-ar", str(sr),
+        "pipe:1",
+    ]
+
+    if isinstance(source, str):
+        command[command.index("pipe:0")] = source
+        return _run_ffmpeg(command, None), sr
+
+    data = _read_all(source)
+    try:
+        return _run_ffmpeg(command, data), sr
+    except AudioDecodeError:
+        # MP4/M4A keeps its index at the end of the file and cannot always
+        # be demuxed from a pipe; retry from a correctly suffixed temp file.
+        with tempfile.NamedTemporaryFile(suffix=suffix or ".bin", delete=False) as tmp:
+            tmp.write(data)
+        try:
+            command[command.index("pipe:0")] = tmp.name
+            return _run_ffmpeg(command, None), sr
+        finally:
+            os.unlink(tmp.name)
+
+
+def _run_ffmpeg(command: list, data: Optional[bytes]) -> np.ndarray:
+    try:
+        proc = subprocess.run(command, input=data, capture_output=True, check=False)
+    except FileNotFoundError:
+        raise AudioDecodeError("Unsupported audio format (ffmpeg is not installed)")
+
+    if proc.returncode != 0 or not proc.stdout:
+        message = proc.stderr.decode("utf-8", errors="replace").strip()
+        raise AudioDecodeError(f"Could not decode audio: {message or 'empty output'}")
+
+    return np.frombuffer(proc.stdout, dtype=np.float32).copy()
+
+
+def _read_all(source: Union[bytes, BinaryIO]) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def _to_mono(data: np.ndarray) -> np.ndarray:
+    if data.shape[1] == 1:
+        return data[:, 0]
+    return data.mean(axis=1, dtype=np.float32)
@@ -0,0 +1,119 @@
+"""
+Noise Reduction
+
+Stationary spectral gating. The noise profile (per-bin mean and spread of
+the dB magnitude) is estimated from the frames VAD marked as non-voiced;
+STFT bins that do not rise DENOISE_N_STD standard deviations above it are
+attenuated by a gain mask smoothed over frequency and time, so that gating
+does not leave musical-noise artefacts.
+
+The profile is read from the magnitude spectrogram preprocessing already
+holds for VAD, and the gated magnitude is handed to the extractors' spectral
+context, so they do not transform the denoised signal again. The signal is
+gated in blocks of DENOISE_BLOCK_SECONDS with overlap-add resynthesis, which
+keeps the complex STFT of only one block in memory at a time.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.spectral import filter_stft
+
+
+# Bins below mean + N std of the noise profile are treated as noise
+DENOISE_N_STD = 1.5
+
+# Fraction of the noise removed (1.0 = full gating); kept light so the
+# breathiness cues in the voice's own noise floor survive
+DENOISE_PROP_DECREASE = 0.8
+
+# Gain mask smoothing; the frequency span stays below the spacing of low
+# harmonics so H1 and H2 are not attenuated by different amounts
+DENOISE_FREQ_SMOOTH_HZ = 100.0
+DENOISE_TIME_SMOOTH_SECONDS = 0.05
+
+# Frames gated per block
+DENOISE_BLOCK_SECONDS = 30.0
+
+# Fewer non-voiced frames than this give no reliable profile (~0.25 s)
+DENOISE_MIN_NOISE_FRAMES = 20
+
+
+@dataclass
+class NoiseProfile:
+    """Per-bin statistics of the noise magnitude in dB."""
+    mean_db: np.ndarray
+    std_db: np.ndarray
+    n_frames: int
+
+    @property
+    def threshold_db(self) -> np.ndarray:
+        return self.mean_db + DENOISE_N_STD * self.std_db
+
+    @classmethod
+    def from_magnitude(cls, magnitude: np.ndarray) -> Optional["NoiseProfile"]:
+        """Profile of the given (bins, frames) noise magnitudes."""
+        if magnitude.shape[1] < DENOISE_MIN_NOISE_FRAMES:
+            return None
+        db = _to_db(magnitude)
+        return cls(mean_db=db.mean(axis=1), std_db=db.std(axis=1), n_frames=magnitude.shape[1])
+
+    @classmethod
+    def from_sums(cls, total: np.ndarray, total_squares: np.ndarray, n_frames: int) -> Optional["NoiseProfile"]:
+        """Profile from running sums of dB values (streaming estimation)."""
+        if n_frames < DENOISE_MIN_NOISE_FRAMES:
+            return None
+        mean = total / n_frames
+        std = np.sqrt(np.maximum(total_squares / n_frames - mean ** 2, 0.0))
+        return cls(mean_db=mean, std_db=std, n_frames=n_frames)
+
+
+def noise_frames(n_frames: int, hop_length: int, sr: int, voiced_segments: np.ndarray) -> np.ndarray:
+    """Boolean mask of (centered) STFT frames outside every voiced segment."""
+    centers = np.arange(n_frames) * hop_length / sr
+    segments = np.asarray(voiced_segments, dtype=np.float64).reshape(-1, 2)
+    inside = (centers[:, None] >= segments[:, 0]) & (centers[:, None] < segments[:, 1])
+    return ~inside.any(axis=1)
+
+
+def spectral_gate(
+    audio: np.ndarray,
+    sr: int,
+    profile: NoiseProfile,
+    n_fft: int = 2048,
+    hop_length: int = 512,
+    block_seconds: float = DENOISE_BLOCK_SECONDS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gate the signal against a noise profile.
+
+    Returns (denoised audio, gated magnitude spectrogram), the latter
+    aligned frame for frame with a SpectralContext over the same buffer.
+    """
+    from scipy.ndimage import uniform_filter
+
+    # Compare magnitudes against the threshold in the linear domain
+    linear_threshold = (10.0 ** (profile.threshold_db / 20.0))[:, None].astype(np.float32)
+    smooth_bins = max(1, int(round(DENOISE_FREQ_SMOOTH_HZ * n_fft / sr)))
+    smooth_frames = max(1, int(round(DENOISE_TIME_SMOOTH_SECONDS * sr / hop_length)))
+
+    def gain(spectrum: np.ndarray) -> np.ndarray:
+        speech = (np.abs(spectrum) > linear_threshold).astype(np.float32)
+        mask = uniform_filter(speech, size=(smooth_bins, smooth_frames), mode="nearest")
+        return 1.0 - DENOISE_PROP_DECREASE * (1.0 - mask)
+
+    return filter_stft(
+        audio,
+        gain,
+        n_fft,
+        hop_length,
+        block_frames=int(block_seconds * sr / hop_length),
+        # Context frames so block edges smooth like the interior
+        context_frames=smooth_frames,
+    )
+
+
+def _to_db(magnitude: np.ndarray) -> np.ndarray:
+    return 20.0 * np.log10(np.maximum(magnitude, 1e-10))
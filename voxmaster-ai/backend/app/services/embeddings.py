@@ -11,6 +11,9 @@ import numpy as np
 from typing import Tuple, List, Optional
 from dataclasses import dataclass
 
+from app.services.decoder import EMBEDDING_SAMPLE_RATE, AudioSource, decode_audio
+from app.services.spectral import SpectralContext
+
 
 @dataclass
 class EmbeddingResult:
@@ -21,8 +24,22 @@ class EmbeddingResult:
 
 
 async def extract_embedding(
-    file_path: str,
+    source: AudioSource,
+    model: str = "ecapa_tdnn",
+    suffix: str = "",
+) -> Tuple[np.ndarray, float]:
+    """
+    Extract speaker embedding from audio file.
+    
+    Async wrapper around extract_embedding_sync.
+    """
+    return extract_embedding_sync(source, model, suffix)
+
+
+def extract_embedding_sync(
+    source: AudioSource,
     model: str = "ecapa_tdnn",
+    suffix: str = "",
 ) -> Tuple[np.ndarray, float]:
     """
     Extract speaker embedding from audio file.
@@ -30,17 +47,19 @@ async def extract_embedding(
     Uses ECAPA-TDNN architecture for robust speaker representation.
     
     Args:
-        file_path: Path to audio file
+        source: Path to audio file, the encoded upload bytes, or a
+            DecodedAudio shared with the analysis pipeline
         model: Embedding model to use ('ecapa_tdnn', 'xvector', 'dvector')
+        suffix: Original file extension, used as a decoder format hint
     
     Returns:
         Tuple of (embedding vector, quality score)
     """
     try:
-        import librosa
-        
         # Load audio
-        audio, sr = librosa.load(file_path, sr=16000, mono=True)
+        audio, sr = decode_audio(source, EMBEDDING_SAMPLE_RATE, suffix)
+        
+        spectral = SpectralContext(audio, sr)
         
         # Check audio quality
         quality = calculate_embedding_quality(audio, sr)
@@ -50,7 +69,7 @@ async def extract_embedding(
         # Real implementation would use speechbrain or similar
         
         # Mock 256-dimensional embedding
-        embedding = generate_mock_embedding(audio, sr)
+        embedding = generate_mock_embedding(audio, sr, spectral=spectral)
         
         return embedding, quality
         
@@ -59,7 +78,11 @@ async def extract_embedding(
         return np.random.randn(256), 85.0
 
 
-def generate_mock_embedding(audio: np.ndarray, sr: int) -> np.ndarray:
+def generate_mock_embedding(
+    audio: np.ndarray,
+    sr: int,
+    spectral: Optional[SpectralContext] = None,
+) -> np.ndarray:
     """
     Generate a mock speaker embedding.
     
@@ -78,9 +101,13 @@ def generate_mock_embedding(audio: np.ndarray, sr: int) -> np.ndarray:
     try:
         import librosa
         
+        if spectral is None:
+            spectral = SpectralContext(audio, sr)
+        
         # Use audio features to create pseudo-embedding
-        mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=40)
-        chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
+        # (MFCC and chroma share one power spectrogram)
+        mfccs = spectral.mfcc(n_mfcc=40)
+        chroma = spectral.chroma()
         
         # Aggregate features
         mfcc_mean = np.mean(mfccs, axis=1)
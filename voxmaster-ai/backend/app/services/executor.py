@@ -0,0 +1,247 @@
+"""
+Analysis Executor
+
+Runs CPU-bound DSP jobs (librosa, parselmouth) in a pool of pre-warmed
+worker processes so they never block the uvicorn event loop. Workers are
+recycled after a fixed number of jobs to cap memory growth. With zero
+workers configured, jobs run in a thread of the API process instead.
+
+Jobs can report per-stage progress: workers push (key, stage) events to
+one queue inherited at spawn time, and a reader thread hands them back to
+the event loop, where they are dispatched to the waiting caller.
+
+Live WebSocket sessions run on a separate small LiveExecutor: each session
+is pinned to one single-process pool that holds its analyzer state, so
+streaming updates neither queue behind file analyses nor run in the API
+process.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.services import live, pipeline
+
+
+class AnalysisExecutor:
+    """Process-pool executor for analysis jobs."""
+
+    def __init__(self):
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.workers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._progress_queue = None
+        self._progress_thread: Optional[threading.Thread] = None
+        self._listeners: Dict[str, Callable[[str], None]] = {}
+
+    async def start(self):
+        """Start the worker pool (workers spawn on first use or in warm_up())."""
+        if self.pool is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self.workers = settings.analysis_worker_count
+        if self.workers == 0:
+            pipeline.set_progress_sink(self._emit_threadsafe)
+            print("⚙️  Analysis executor: in-process thread mode")
+            return
+
+        mp_context = multiprocessing.get_context("spawn")
+        self._progress_queue = mp_context.Queue()
+        self._progress_thread = threading.Thread(
+            target=self._pump_progress,
+            name="analysis-progress",
+            daemon=True,
+        )
+        self._progress_thread.start()
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=pipeline.init_worker,
+            initargs=(self._progress_queue, settings.analysis_prewarm),
+            max_tasks_per_child=settings.analysis_max_tasks_per_child or None,
+        )
+
+        print(f"⚙️  Analysis executor: {self.workers} worker processes")
+
+    async def warm_up(self):
+        """
+        Spawn every worker now (each runs the warm-up initializer) instead
+        of on the first real requests.
+        """
+        if self.pool is None or not settings.analysis_prewarm:
+            return
+        # One no-op per worker forces all processes to spawn
+        await asyncio.gather(*[
+            self._loop.run_in_executor(self.pool, pipeline.ping)
+            for _ in range(self.workers)
+        ])
+
+    async def shutdown(self):
+        """Stop the worker pool and the progress reader."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._progress_thread.join(timeout=5)
+            self._progress_queue = None
+            self._progress_thread = None
+        pipeline.set_progress_sink(None)
+        self._listeners.clear()
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """
+        Run a picklable top-level function on a worker and await its result.
+
+        If a progress callback is given, fn is called with an extra
+        progress_key keyword and every stage it reports is delivered to
+        the callback on the event loop.
+        """
+        progress_key = None
+        if progress is not None:
+            progress_key = uuid.uuid4().hex
+            self._listeners[progress_key] = progress
+            fn = functools.partial(fn, progress_key=progress_key)
+
+        try:
+            if self.pool is None:
+                return await asyncio.to_thread(fn, *args)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, fn, *args)
+        finally:
+            if progress_key is not None:
+                # Let events already queued by the worker drain first
+                await asyncio.sleep(0)
+                self._listeners.pop(progress_key, None)
+
+    def _pump_progress(self):
+        """Reader thread: forward worker progress events to the event loop."""
+        while True:
+            event = self._progress_queue.get()
+            if event is None:
+                break
+            self._emit_threadsafe(event)
+
+    def _emit_threadsafe(self, event: Any):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Any):
+        progress_key, stage = event
+        listener = self._listeners.get(progress_key)
+        if listener is not None:
+            listener(stage)
+
+    @property
+    def status(self) -> str:
+        """Short status string for health checks."""
+        if self.pool is None:
+            return "inline"
+        return f"pool:{self.workers}"
+
+
+class LiveExecutor:
+    """
+    Worker processes hosting live sessions. A session's state stays in the
+    worker it was opened on, so every call for it goes to that worker.
+    """
+
+    def __init__(self):
+        self.pools: List[ProcessPoolExecutor] = []
+        self._assigned: Dict[str, int] = {}  # session id -> pool index
+
+    async def start(self):
+        """Start the worker pools (workers spawn on first use or in warm_up())."""
+        if self.pools:
+            return
+        if settings.live_workers == 0:
+            print("🎙️  Live executor: in-process thread mode")
+            return
+
+        mp_context = multiprocessing.get_context("spawn")
+        self.pools = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=mp_context,
+                initializer=live.init_live_worker,
+                initargs=(settings.analysis_prewarm,),
+            )
+            for _ in range(settings.live_workers)
+        ]
+        print(f"🎙️  Live executor: {len(self.pools)} worker processes")
+
+    async def warm_up(self):
+        """Spawn every worker now instead of on the first live session."""
+        if not self.pools or not settings.analysis_prewarm:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(pool, pipeline.ping) for pool in self.pools])
+
+    async def shutdown(self):
+        """Stop the worker pools; open sessions are dropped."""
+        for pool in self.pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+        self.pools = []
+        self._assigned.clear()
+
+    async def open(self, *args: Any) -> str:
+        """Open a session (live.open_session arguments) on the least busy worker."""
+        session_id = uuid.uuid4().hex
+        if self.pools:
+            load = [0] * len(self.pools)
+            for index in self._assigned.values():
+                load[index] += 1
+            self._assigned[session_id] = load.index(min(load))
+        try:
+            await self._run(session_id, live.open_session, *args)
+        except BaseException:
+            self._assigned.pop(session_id, None)
+            raise
+        return session_id
+
+    async def feed(self, session_id: str, data: bytes, encoding: str) -> Optional[Dict[str, Any]]:
+        return await self._run(session_id, live.feed_session, data, encoding)
+
+    async def reset(self, session_id: str) -> None:
+        await self._run(session_id, live.reset_session)
+
+    async def close(self, session_id: str, summary: bool = False) -> Optional[Dict[str, Any]]:
+        """Drop the session, returning its final summary if requested."""
+        if self.pools and session_id not in self._assigned:
+            return None  # already closed
+        try:
+            return await self._run(session_id, live.close_session, summary)
+        finally:
+            self._assigned.pop(session_id, None)
+
+    async def _run(self, session_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self.pools:
+            return await asyncio.to_thread(fn, session_id, *args)
+        pool = self.pools[self._assigned[session_id]]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, fn, session_id, *args)
+
+    @property
+    def status(self) -> str:
+        """Short status string for health checks."""
+        if not self.pools:
+            return "inline"
+        return f"pool:{len(self.pools)} sessions:{len(self._assigned)}"
+
+
+# Global executor instances
+analysis_executor = AnalysisExecutor()
+live_executor = LiveExecutor()
@@ -8,16 +8,82 @@ DLM Feature Extraction for:
 """
 
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Optional, Set, Tuple
 
 from app.models.schemas import AudioType, AcousticFeatures
-from app.services.preprocessing import PreprocessedAudio
+from app.services.preprocessing import PreprocessedAudio, concatenate_segments
+from app.services.spectral import SpectralContext
+from app.services.praat import HARMONICITY_REACH, PraatContext
+from app.services.cepstral import DEFAULT_CPP, DEFAULT_H1_H2
+from app.services.feature_graph import FEATURES, FULL_PLAN, FeaturePlan
+from app.services.timing import StageTimings
+from app.services.tracks import PRAAT_UNDEFINED_DB, FeatureTracks, map_to_spliced, sample_tracks, track_times
+
+
+# Bump whenever extractor output changes so cached analyses are recomputed
+EXTRACTOR_VERSION = "6"
+
+# F1-F4 in Hz when Praat finds no formant track
+DEFAULT_FORMANTS = (500, 1500, 2500, 3500)
+
+# Field-level fallback names that are not "<group>.<field name>"
+FALLBACK_FIELDS = {
+    "spectral.centroid": "spectral_centroid",
+    "spectral.rolloff": "spectral_rolloff",
+    "pitch.f0_min": "f0_range",
+    "pitch.f0_max": "f0_range",
+}
+
+# Scalar values the extractors substitute, for analyses stored before
+# their fallbacks were recorded (every measured value is a non-round float)
+LEGACY_DEFAULTS = {
+    "spectral_centroid": (2450.0,),
+    "hnr": (15.0, 18.5),
+    "cpp": (DEFAULT_CPP, 12.3),
+    "h1_h2": (DEFAULT_H1_H2, 4.2),
+    "f0_mean": (150.0, 185.0),
+    "jitter": (0.5,),
+    "shimmer": (3.0, 3.2),
+    **{f"f{k}": (default, mock) for k, default, mock in zip(range(1, 5), DEFAULT_FORMANTS, (520, 1680, 2580, 3450))},
+}
 
 
 async def extract_features(
     preprocessed: PreprocessedAudio,
     audio_type: AudioType,
+    voiced_only: bool = False,
+    plan: FeaturePlan = FULL_PLAN,
+) -> AcousticFeatures:
+    """
+    Extract acoustic features from preprocessed audio.
+    
+    Async wrapper around extract_features_sync; the work itself is
+    CPU-bound and runs on the calling thread.
+    """
+    return extract_features_sync(preprocessed, audio_type, voiced_only, plan)
+
+
+def extract_features_sync(
+    preprocessed: PreprocessedAudio,
+    audio_type: AudioType,
+    voiced_only: bool = False,
+    plan: FeaturePlan = FULL_PLAN,
 ) -> AcousticFeatures:
+    """Extract acoustic features (see extract_features_and_tracks)."""
+    features, _ = extract_features_and_tracks(
+        preprocessed, audio_type, voiced_only, with_tracks=False, plan=plan
+    )
+    return features
+
+
+def extract_features_and_tracks(
+    preprocessed: PreprocessedAudio,
+    audio_type: AudioType,
+    voiced_only: bool = False,
+    with_tracks: bool = True,
+    plan: FeaturePlan = FULL_PLAN,
+    timings: Optional[StageTimings] = None,
+) -> Tuple[AcousticFeatures, Optional[FeatureTracks]]:
     """
     Extract acoustic features from preprocessed audio.
     
@@ -28,49 +94,69 @@ async def extract_features(
     - Cepstral: 13 MFCCs
     - Pitch: F0 mean, std, range, jitter, shimmer
     
+    Only the feature groups in plan are computed (see
+    app.services.feature_graph); the intermediates they read are built
+    lazily by the shared contexts, so anything outside the plan never runs.
+    
     Args:
         preprocessed: PreprocessedAudio object
         audio_type: SPOKEN or SUNG
+        voiced_only: Analyze only the VAD voiced segments, spliced together;
+            frames straddling a splice are left out of spectral and HNR
+            averages, and Praat jitter/shimmer are measured per segment
+        with_tracks: Also sample frame-level tracks (F0, centroid, RMS,
+            F1-F3, HNR) on the original timeline from the same analyses.
+            Tracks read every intermediate, so they are only sampled for
+            the full plan
+        plan: Feature groups to compute; fields of other groups are None
+        timings: Receives the time spent per feature group (and "tracks"),
+            and a fallback for every value that took a default instead of
+            a measurement ("<group>.<field>", "<group>" when a library is
+            missing, or the failing group when mock features are returned)
     
     Returns:
-        AcousticFeatures object
+        Tuple of (AcousticFeatures, FeatureTracks or None)
     """
     audio = preprocessed.audio
     sr = preprocessed.sample_rate
     
+    joins = None
+    if voiced_only:
+        audio, joins = concatenate_segments(audio, sr, preprocessed.voiced_segments)
+        context = SpectralContext(audio, sr, boundaries=joins)
+    else:
+        # Reuse the spectrogram computed during preprocessing when available
+        context = preprocessed.spectral
+        if context is None or context.audio is not audio:
+            context = SpectralContext(audio, sr)
+    
+    # One Praat Sound/Pitch shared by the harmonic, formant and pitch stages
+    praat = PraatContext(audio, sr, audio_type, boundaries=joins)
+    if timings is None:
+        timings = StageTimings()
+    
+    name = "assemble"
     try:
-        # Extract spectral features
-        spectral = extract_spectral_features(audio, sr)
-        
-        # Extract harmonic features
-        harmonic = extract_harmonic_features(audio, sr)
-        
-        # Extract formants using Praat
-        formants = extract_formants(audio, sr)
-        
-        # Extract pitch features
-        pitch = extract_pitch_features(audio, sr, audio_type)
-        
-        # Extract MFCCs
-        mfccs = extract_mfccs(audio, sr)
-        
-        return AcousticFeatures(
-            spectral_centroid=spectral["centroid"],
-            spectral_rolloff=spectral.get("rolloff"),
-            hnr=harmonic["hnr"],
-            cpp=harmonic["cpp"],
-            h1_h2=harmonic["h1_h2"],
-            f0_mean=pitch["f0_mean"],
-            f0_range=pitch["f0_range"],
-            formants=formants,
-            mfccs=mfccs,
-            jitter=pitch.get("jitter"),
-            shimmer=pitch.get("shimmer"),
-        )
+        values: Dict[str, Any] = {}
+        for name in plan.ordered_features():
+            with timings.stage(name):
+                values.update(FEATURE_EXTRACTORS[name](audio, sr, audio_type, context, praat, timings))
+        
+        tracks = None
+        if with_tracks and plan.is_full:
+            with timings.stage("tracks"):
+                tracks = extract_tracks(preprocessed, context, praat, spliced=audio is not preprocessed.audio)
+            if tracks is None:
+                timings.fallback("tracks")
+        
+        name = "assemble"
+        return AcousticFeatures(**values), tracks
         
     except Exception as e:
         # Return mock features on error
-        return AcousticFeatures(
+        print(f"Warning: feature extraction failed in {name}, returning defaults: {e}")
+        timings.fallback(name)
+        return plan.restrict(AcousticFeatures(
             spectral_centroid=2450.0,
             spectral_rolloff=4500.0,
             hnr=18.5,
@@ -82,21 +168,102 @@ async def extract_features(
             mfccs=list(np.zeros(13)),
             jitter=0.5,
             shimmer=3.2,
+        )), None
+
+
+def _spectral_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    values = extract_spectral_features(audio, sr, spectral=spectral, timings=timings)
+    return {"spectral_centroid": values["centroid"], "spectral_rolloff": values.get("rolloff")}
+
+
+def _mfcc_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    return {"mfccs": extract_mfccs(audio, sr, spectral=spectral, timings=timings)}
+
+
+def _hnr_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    return {"hnr": extract_hnr(audio, sr, praat=praat, timings=timings)}
+
+
+def _cepstral_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    values = extract_cepstral_features(audio, sr, praat=praat, timings=timings)
+    return {
+        "cpp": values["cpp"],
+        "h1_h2": values["h1_h2"],
+        "h1_a2": values.get("h1_a2"),
+        "h1_a3": values.get("h1_a3"),
+    }
+
+
+def _formants_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    return {"formants": extract_formants(audio, sr, praat=praat, timings=timings)}
+
+
+def _pitch_node(audio, sr, audio_type, spectral, praat, timings) -> Dict[str, Any]:
+    values = extract_pitch_features(audio, sr, audio_type, praat=praat, timings=timings)
+    return {
+        "f0_mean": values["f0_mean"],
+        "f0_range": values["f0_range"],
+        "jitter": values.get("jitter"),
+        "shimmer": values.get("shimmer"),
+    }
+
+
+# Feature group (see feature_graph.FEATURES) -> extractor filling its fields
+FEATURE_EXTRACTORS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "spectral": _spectral_node,
+    "mfcc": _mfcc_node,
+    "hnr": _hnr_node,
+    "cepstral": _cepstral_node,
+    "formants": _formants_node,
+    "pitch": _pitch_node,
+}
+
+
+def extract_tracks(
+    preprocessed: PreprocessedAudio,
+    spectral: SpectralContext,
+    praat: PraatContext,
+    spliced: bool = False,
+) -> Optional[FeatureTracks]:
+    """
+    Frame-level tracks on the original timeline.
+    
+    When the analyzed buffer was spliced from voiced segments, grid times
+    are mapped into it and points outside the segments are left undefined.
+    """
+    try:
+        times = track_times(preprocessed.duration)
+        if not spliced:
+            return sample_tracks(spectral, praat, times)
+        
+        spliced_times, inside = map_to_spliced(
+            times, preprocessed.voiced_segments, preprocessed.sample_rate
         )
+        return sample_tracks(spectral, praat, spliced_times, valid=inside)
+        
+    except Exception as e:
+        print(f"Warning: could not extract feature tracks: {e}")
+        return None
 
 
-def extract_spectral_features(audio: np.ndarray, sr: int) -> Dict[str, float]:
+def extract_spectral_features(
+    audio: np.ndarray,
+    sr: int,
+    spectral: Optional[SpectralContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> Dict[str, float]:
     """Extract spectral features using librosa."""
     try:
         import librosa
         
+        if spectral is None:
+            spectral = SpectralContext(audio, sr)
+        
         # Spectral centroid (brightness)
-        centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)
-        centroid_mean = float(np.mean(centroid))
+        centroid_mean = float(spectral.frame_mean(spectral.centroid()))
         
         # Spectral rolloff
-        rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)
-        rolloff_mean = float(np.mean(rolloff))
+        rolloff_mean = float(spectral.frame_mean(spectral.rolloff()))
         
         return {
             "centroid": centroid_mean,
@@ -104,118 +271,293 @@ def extract_spectral_features(audio: np.ndarray, sr: int) -> Dict[str, float]:
         }
         
     except ImportError:
-        return {"centroid": 2450.0, "rolloff": 4500.0}
+        return fell_back(timings, "spectral", {"centroid": 2450.0, "rolloff": 4500.0})
 
 
-def extract_harmonic_features(audio: np.ndarray, sr: int) -> Dict[str, float]:
+def extract_harmonic_features(
+    audio: np.ndarray,
+    sr: int,
+    praat: Optional[PraatContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> Dict[str, float]:
     """Extract harmonic features including HNR, CPP, and harmonic ratios."""
+    if praat is None:
+        praat = PraatContext(audio, sr, AudioType.SPOKEN)
+    
+    return {
+        "hnr": extract_hnr(audio, sr, praat=praat, timings=timings),
+        **extract_cepstral_features(audio, sr, praat=praat, timings=timings),
+    }
+
+
+def extract_hnr(
+    audio: np.ndarray,
+    sr: int,
+    praat: Optional[PraatContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> float:
+    """Mean Harmonics-to-Noise Ratio in dB (see spliced_hnr for spliced buffers)."""
     try:
         import parselmouth
         from parselmouth.praat import call
         
-        # Convert to Praat Sound object
-        sound = parselmouth.Sound(audio, sampling_frequency=sr)
+        if praat is None:
+            praat = PraatContext(audio, sr, AudioType.SPOKEN)
+        
+        if praat.segments() is not None:
+            hnr = spliced_hnr(praat)
+        else:
+            hnr = call(praat.harmonicity, "Get mean", 0, 0)
+        return measured_or(hnr, 15.0, timings, "hnr")
+        
+    except ImportError:
+        return fell_back(timings, "hnr", 18.5)
+
+
+def extract_cepstral_features(
+    audio: np.ndarray,
+    sr: int,
+    praat: Optional[PraatContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> Dict[str, Optional[float]]:
+    """CPP and harmonic level differences (H1-H2, H1-A2, H1-A3)."""
+    try:
+        import parselmouth
         
-        # Harmonics-to-Noise Ratio
-        harmonicity = call(sound, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0)
-        hnr = call(harmonicity, "Get mean", 0, 0)
+        if praat is None:
+            praat = PraatContext(audio, sr, AudioType.SPOKEN)
         
-        # For CPP and H1-H2, we need more complex analysis
-        # Simplified version here
-        cpp = 12.0  # Placeholder
-        h1_h2 = 4.0  # Placeholder
+        # CPPS and harmonic levels at the voiced frames of the shared pitch track
+        cepstral = praat.cepstral.means()
         
         return {
-            "hnr": float(hnr) if not np.isnan(hnr) else 15.0,
-            "cpp": cpp,
-            "h1_h2": h1_h2,
+            "cpp": measured_or(cepstral["cpp"], DEFAULT_CPP, timings, "cepstral.cpp"),
+            "h1_h2": measured_or(cepstral["h1_h2"], DEFAULT_H1_H2, timings, "cepstral.h1_h2"),
+            "h1_a2": cepstral["h1_a2"],
+            "h1_a3": cepstral["h1_a3"],
         }
         
     except ImportError:
-        return {"hnr": 18.5, "cpp": 12.3, "h1_h2": 4.2}
+        return fell_back(timings, "cepstral", {"cpp": 12.3, "h1_h2": 4.2})
 
 
-def extract_formants(audio: np.ndarray, sr: int) -> Dict[str, float]:
+def extract_formants(
+    audio: np.ndarray,
+    sr: int,
+    praat: Optional[PraatContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> Dict[str, float]:
     """Extract formant frequencies F1-F4 using Praat."""
     try:
         import parselmouth
         from parselmouth.praat import call
         
-        sound = parselmouth.Sound(audio, sampling_frequency=sr)
+        if praat is None:
+            praat = PraatContext(audio, sr, AudioType.SPOKEN)
         
         # Get formants
-        formant = call(sound, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
+        formant = praat.formant
         
         # Get mean formant values
-        f1 = call(formant, "Get mean", 1, 0, 0, "Hertz")
-        f2 = call(formant, "Get mean", 2, 0, 0, "Hertz")
-        f3 = call(formant, "Get mean", 3, 0, 0, "Hertz")
-        f4 = call(formant, "Get mean", 4, 0, 0, "Hertz")
-        
         return {
-            "f1": float(f1) if not np.isnan(f1) else 500,
-            "f2": float(f2) if not np.isnan(f2) else 1500,
-            "f3": float(f3) if not np.isnan(f3) else 2500,
-            "f4": float(f4) if not np.isnan(f4) else 3500,
+            f"f{k}": measured_or(call(formant, "Get mean", k, 0, 0, "Hertz"), default, timings, f"formants.f{k}")
+            for k, default in zip(range(1, 5), DEFAULT_FORMANTS)
         }
         
     except ImportError:
-        return {"f1": 520, "f2": 1680, "f3": 2580, "f4": 3450}
+        return fell_back(timings, "formants", {"f1": 520, "f2": 1680, "f3": 2580, "f4": 3450})
 
 
 def extract_pitch_features(
     audio: np.ndarray,
     sr: int,
     audio_type: AudioType,
+    praat: Optional[PraatContext] = None,
+    timings: Optional[StageTimings] = None,
 ) -> Dict[str, Any]:
-    """Extract pitch-related features including F0 and perturbation measures."""
+    """
+    Extract pitch-related features including F0 and perturbation measures.
+    
+    With the Praat pitch backend these are Praat's own statistics (range
+    with parabolic peaks, cycle-level jitter and shimmer); other backends
+    derive them from their frame-level pitch track.
+    """
     try:
+        if praat is None:
+            praat = PraatContext(audio, sr, audio_type)
+        
+        if praat.pitch_backend != "praat":
+            return pitch_features_from_track(praat, timings)
+        
         import parselmouth
         from parselmouth.praat import call
         
-        sound = parselmouth.Sound(audio, sampling_frequency=sr)
-        
         # Pitch tracking
-        min_pitch = 75 if audio_type == AudioType.SPOKEN else 50
-        max_pitch = 500 if audio_type == AudioType.SPOKEN else 1000
-        
-        pitch = call(sound, "To Pitch", 0.0, min_pitch, max_pitch)
+        pitch = praat.pitch
         
         f0_mean = call(pitch, "Get mean", 0, 0, "Hertz")
         f0_min = call(pitch, "Get minimum", 0, 0, "Hertz", "Parabolic")
         f0_max = call(pitch, "Get maximum", 0, 0, "Hertz", "Parabolic")
         
-        # Jitter and Shimmer from PointProcess
-        point_process = call(sound, "To PointProcess (periodic, cc)", min_pitch, max_pitch)
-        jitter = call(point_process, "Get jitter (local)", 0, 0, 0.0001, 0.02, 1.3)
-        shimmer = call([sound, point_process], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
+        # Jitter and Shimmer from the PointProcess derived from the same Pitch
+        if praat.segments() is not None:
+            jitter, shimmer = spliced_perturbation(praat)
+        else:
+            point_process = praat.point_process
+            jitter = call(point_process, "Get jitter (local)", 0, 0, 0.0001, 0.02, 1.3)
+            shimmer = call([praat.sound, point_process], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
         
         return {
-            "f0_mean": float(f0_mean) if not np.isnan(f0_mean) else 150,
+            "f0_mean": measured_or(f0_mean, 150, timings, "pitch.f0_mean"),
             "f0_range": [
-                float(f0_min) if not np.isnan(f0_min) else 100,
-                float(f0_max) if not np.isnan(f0_max) else 300,
+                measured_or(f0_min, 100, timings, "pitch.f0_min"),
+                measured_or(f0_max, 300, timings, "pitch.f0_max"),
             ],
-            "jitter": float(jitter * 100) if not np.isnan(jitter) else 0.5,
-            "shimmer": float(shimmer * 100) if not np.isnan(shimmer) else 3.0,
+            "jitter": measured_or(jitter * 100, 0.5, timings, "pitch.jitter"),
+            "shimmer": measured_or(shimmer * 100, 3.0, timings, "pitch.shimmer"),
         }
         
     except ImportError:
-        return {
+        return fell_back(timings, "pitch", {
             "f0_mean": 185.0,
             "f0_range": [145.0, 245.0],
             "jitter": 0.5,
             "shimmer": 3.2,
-        }
+        })
+
+
+def spliced_hnr(praat: PraatContext) -> float:
+    """
+    Mean HNR of a spliced buffer over the Harmonicity frames that read
+    audio from a single segment (HARMONICITY_REACH from every join); NaN
+    if there are none.
+    """
+    harmonicity = praat.harmonicity
+    times = harmonicity.xs()
+    values = harmonicity.values[0]
+    inside = np.zeros(len(times), dtype=bool)
+    for tmin, tmax in praat.segments():
+        inside |= (times - HARMONICITY_REACH >= tmin) & (times + HARMONICITY_REACH <= tmax)
+    values = values[inside & (values != PRAAT_UNDEFINED_DB)]
+    return float(values.mean()) if values.size else np.nan
+
+
+def spliced_perturbation(praat: PraatContext) -> Tuple[float, float]:
+    """
+    Praat local jitter and shimmer (ratios) of a spliced buffer.
+    
+    Queried per segment, so no period spans a join, and averaged weighted
+    by each segment's period count, as FeatureStats.add_praat does per
+    block. NaN when no segment has a measurable period.
+    """
+    from parselmouth.praat import call
+    
+    point_process = praat.point_process
+    periods, jitter, shimmer = [], [], []
+    for tmin, tmax in praat.segments():
+        count = call(point_process, "Get number of periods", tmin, tmax, 0.0001, 0.02, 1.3)
+        if count > 0:
+            periods.append(count)
+            jitter.append(call(point_process, "Get jitter (local)", tmin, tmax, 0.0001, 0.02, 1.3))
+            shimmer.append(call(
+                [praat.sound, point_process], "Get shimmer (local)", tmin, tmax, 0.0001, 0.02, 1.3, 1.6
+            ))
+    return _weighted_mean(jitter, periods), _weighted_mean(shimmer, periods)
 
 
-def extract_mfccs(audio: np.ndarray, sr: int, n_mfcc: int = 13) -> list:
+def _weighted_mean(values, weights) -> float:
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    finite = np.isfinite(values)
+    if not weights[finite].sum():
+        return np.nan
+    return float(np.average(values[finite], weights=weights[finite]))
+
+
+def pitch_features_from_track(praat: PraatContext, timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """F0 mean, range, jitter and shimmer from a non-Praat pitch track."""
+    track = praat.pitch_track
+    f0_range = track.f0_range() or (None, None)
+    jitter, _ = track.jitter()
+    shimmer, _ = track.shimmer(praat.audio, praat.sr)
+    
+    return {
+        "f0_mean": measured_or(track.f0_mean(), 150, timings, "pitch.f0_mean"),
+        "f0_range": [
+            measured_or(f0_range[0], 100, timings, "pitch.f0_min"),
+            measured_or(f0_range[1], 300, timings, "pitch.f0_max"),
+        ],
+        "jitter": measured_or(jitter * 100 if jitter is not None else None, 0.5, timings, "pitch.jitter"),
+        "shimmer": measured_or(shimmer * 100 if shimmer is not None else None, 3.0, timings, "pitch.shimmer"),
+    }
+
+
+def extract_mfccs(
+    audio: np.ndarray,
+    sr: int,
+    n_mfcc: int = 13,
+    spectral: Optional[SpectralContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> list:
     """Extract Mel-frequency cepstral coefficients."""
     try:
         import librosa
         
-        mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=n_mfcc)
-        return [float(np.mean(mfccs[i])) for i in range(n_mfcc)]
+        if spectral is None:
+            spectral = SpectralContext(audio, sr)
+        
+        mfccs = spectral.frame_mean(spectral.mfcc(n_mfcc=n_mfcc))
+        return [float(value) for value in mfccs]
         
     except ImportError:
-        return list(np.zeros(n_mfcc))
+        return fell_back(timings, "mfcc", list(np.zeros(n_mfcc)))
+
+
+def measured_or(value: Optional[float], default: Any, timings: Optional[StageTimings], name: str) -> Any:
+    """value as a float, or default (noted as a fallback) when None or NaN."""
+    if value is None or np.isnan(value):
+        return fell_back(timings, name, default)
+    return float(value)
+
+
+def defaulted_fields(features: Dict[str, Any], fallbacks: Optional[Iterable[str]]) -> Set[str]:
+    """
+    AcousticFeatures fields of a stored analysis that hold defaults rather
+    than measurements (formants as "f1".."f4"), from its stored fallbacks.
+    Without fallbacks (older analyses), values equal to a known default
+    are taken as defaulted.
+    """
+    def group_fields(group: str) -> Set[str]:
+        fields = set(FEATURES[group].fields)
+        if "formants" in fields:
+            fields = (fields - {"formants"}) | {f"f{k}" for k in range(1, 5)}
+        return fields
+
+    if fallbacks is None:
+        formants = features.get("formants") or {}
+        return {
+            name for name, defaults in LEGACY_DEFAULTS.items()
+            if (formants.get(name) if name in formants else features.get(name)) in defaults
+        }
+
+    defaulted: Set[str] = set()
+    for name in fallbacks:
+        if not name.startswith("features.") or name == "features.tracks":
+            continue
+        name = name[len("features."):]
+        group, _, field = name.partition(".")
+        if field:
+            defaulted.add(FALLBACK_FIELDS.get(name, field))
+        elif group in FEATURES:
+            defaulted |= group_fields(group)
+        else:
+            # Mock features for the whole analysis
+            return set().union(*(group_fields(group) for group in FEATURES))
+    return defaulted
+
+
+def fell_back(timings: Optional[StageTimings], name: str, default: Any) -> Any:
+    """Note that name took a default instead of a measurement; return it."""
+    if timings is not None:
+        timings.fallback(name)
+    return default
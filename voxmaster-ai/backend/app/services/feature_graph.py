@@ -0,0 +1,153 @@
+"""
+Feature Graph
+
+Declarative registry of what every feature group and score group needs,
+so an analysis can compute just the subset a caller asks for:
+
+- intermediates: analyses shared between features (STFT, mel spectrogram,
+  Praat Sound, pitch track, ...). They are built lazily by SpectralContext
+  and PraatContext, so each is computed at most once per analysis
+- features: groups of AcousticFeatures fields, each reading intermediates
+- scores: score groups, each reading feature groups and other scores
+
+resolve() turns the requested names into a FeaturePlan holding the
+requested nodes plus everything they depend on. Fields of feature groups
+outside the plan are left None, as are score groups outside it.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from app.models.schemas import AcousticFeatures
+
+
+# Intermediate -> the intermediates it is derived from
+INTERMEDIATES: Dict[str, Tuple[str, ...]] = {
+    "stft": (),
+    "mel": ("stft",),
+    "sound": (),
+    "pitch": ("sound",),  # pitch track of the configured backend
+    "point_process": ("sound", "pitch"),  # glottal pulses (Praat backend only)
+    "harmonicity": ("sound",),
+    "formant": ("sound",),
+    "cepstrum": ("sound", "pitch"),  # CPPS and harmonic levels at voiced frames
+}
+
+
+@dataclass(frozen=True)
+class FeatureNode:
+    """A feature group: the intermediates it reads and the fields it fills."""
+    inputs: Tuple[str, ...]
+    fields: Tuple[str, ...]
+
+
+FEATURES: Dict[str, FeatureNode] = {
+    "spectral": FeatureNode(("stft",), ("spectral_centroid", "spectral_rolloff")),
+    "mfcc": FeatureNode(("mel",), ("mfccs",)),
+    "hnr": FeatureNode(("harmonicity",), ("hnr",)),
+    "cepstral": FeatureNode(("cepstrum",), ("cpp", "h1_h2", "h1_a2", "h1_a3")),
+    "formants": FeatureNode(("formant",), ("formants",)),
+    "pitch": FeatureNode(("pitch", "point_process"), ("f0_mean", "f0_range", "jitter", "shimmer")),
+}
+
+# Score group -> the feature groups and score groups it reads
+SCORES: Dict[str, Tuple[str, ...]] = {
+    "timbre": ("spectral", "hnr", "pitch"),
+    "weight": ("cepstral",),
+    "placement": ("formants", "spectral"),
+    "sweet_spot": ("timbre", "placement", "hnr"),
+}
+
+
+@dataclass(frozen=True)
+class FeaturePlan:
+    """The feature groups, score groups and intermediates one analysis computes."""
+    features: FrozenSet[str]
+    scores: FrozenSet[str]
+    intermediates: FrozenSet[str]
+
+    @property
+    def is_full(self) -> bool:
+        return self.features == FULL_PLAN.features and self.scores == FULL_PLAN.scores
+
+    @property
+    def key(self) -> str:
+        """Stable name of the plan (e.g. for cache keys); "all" for the full plan."""
+        if self.is_full:
+            return "all"
+        return ",".join(sorted(self.features | self.scores))
+
+    def wants(self, feature: str) -> bool:
+        return feature in self.features
+
+    def restrict(self, features: AcousticFeatures) -> AcousticFeatures:
+        """Copy of features with the fields of groups outside the plan cleared."""
+        if self.is_full:
+            return features
+        cleared = {
+            field: None
+            for name, node in FEATURES.items() if name not in self.features
+            for field in node.fields
+        }
+        return features.model_copy(update=cleared)
+
+    def ordered_features(self) -> Tuple[str, ...]:
+        """Requested feature groups in registry order."""
+        return tuple(name for name in FEATURES if name in self.features)
+
+    def ordered_scores(self) -> Tuple[str, ...]:
+        """Requested score groups, each after the score groups it reads."""
+        return tuple(name for name in SCORES if name in self.scores)
+
+
+def resolve(names: Optional[Iterable[str]] = None) -> FeaturePlan:
+    """
+    Plan for the given feature and score group names (None = everything).
+
+    Raises ValueError for unknown names.
+    """
+    if names is None:
+        return FULL_PLAN
+    requested = [name.strip() for name in names if name and name.strip()]
+    if not requested:
+        return FULL_PLAN
+
+    unknown = sorted(set(requested) - set(FEATURES) - set(SCORES))
+    if unknown:
+        raise ValueError(
+            f"Unknown features: {', '.join(unknown)}. "
+            f"Available: {', '.join(list(FEATURES) + list(SCORES))}"
+        )
+
+    features, scores = set(), set()
+    pending = list(requested)
+    while pending:
+        name = pending.pop()
+        if name in SCORES:
+            if name not in scores:
+                scores.add(name)
+                pending.extend(SCORES[name])
+        elif name not in features:
+            features.add(name)
+
+    intermediates = set()
+    pending = [inp for name in features for inp in FEATURES[name].inputs]
+    while pending:
+        name = pending.pop()
+        if name not in intermediates:
+            intermediates.add(name)
+            pending.extend(INTERMEDIATES[name])
+
+    return FeaturePlan(frozenset(features), frozenset(scores), frozenset(intermediates))
+
+
+def parse_features(value: Optional[str]) -> FeaturePlan:
+    """Plan for a comma-separated `features` request parameter."""
+    return resolve(value.split(",") if value else None)
+
+
+FULL_PLAN = FeaturePlan(
+    features=frozenset(FEATURES),
+    scores=frozenset(SCORES),
+    intermediates=frozenset(INTERMEDIATES),
+)
@@ -0,0 +1,210 @@
+"""
+Feature Statistics
+
+Running statistics behind AcousticFeatures, for analyses that see their
+audio piece by piece: blocks of a long file (app.services.chunked) or the
+newest audio of a live stream (app.services.live). Every scalar feature
+is a RunningStats; summaries of separate pieces merge exactly (parallel
+Welford), so no piece's frames are kept once it has been folded in.
+"""
+
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from app.models.schemas import AcousticFeatures
+from app.services.cepstral import DEFAULT_CPP, DEFAULT_H1_H2
+from app.services.feature_extraction import DEFAULT_FORMANTS, fell_back
+from app.services.praat import PraatContext
+from app.services.spectral import SpectralContext
+from app.services.timing import StageTimings
+from app.services.tracks import PRAAT_UNDEFINED_DB
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, min and max (Welford / Chan et al.).
+
+    Works on scalars or, when fed 2-D batches, per column.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        """Add a batch of observations along axis 0."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] == 0:
+            return
+        mean = values.mean(axis=0)
+        self.merge(
+            values.shape[0],
+            mean,
+            ((values - mean) ** 2).sum(axis=0),
+            values.min(axis=0),
+            values.max(axis=0),
+        )
+
+    def merge(self, count, mean, m2=0.0, minimum=None, maximum=None):
+        """Fold in the summary of another sample (count may be a weight)."""
+        if count <= 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+        self.min = np.minimum(self.min, mean if minimum is None else minimum)
+        self.max = np.maximum(self.max, mean if maximum is None else maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+
+class FeatureStats:
+    """
+    Running statistics behind every scalar AcousticFeatures field.
+
+    Spectral frames and Praat measurements are folded in piece by piece
+    (blocks of a long file, or the newest audio of a live stream), and
+    summaries of separate pieces can be merged.
+    """
+
+    def __init__(self):
+        self.centroid = RunningStats()
+        self.rolloff = RunningStats()
+        self.rms = RunningStats()
+        self.mfcc = RunningStats()
+        self.f0 = RunningStats()
+        self.hnr = RunningStats()
+        self.cpp = RunningStats()
+        self.h1_h2 = RunningStats()
+        self.h1_a2 = RunningStats()
+        self.h1_a3 = RunningStats()
+        self.formants = {k: RunningStats() for k in range(1, 5)}
+        self.jitter = RunningStats()
+        self.shimmer = RunningStats()
+
+    def _all(self) -> dict:
+        named = {
+            "centroid": self.centroid, "rolloff": self.rolloff, "rms": self.rms,
+            "mfcc": self.mfcc, "f0": self.f0, "hnr": self.hnr,
+            "cpp": self.cpp, "h1_h2": self.h1_h2, "h1_a2": self.h1_a2, "h1_a3": self.h1_a3,
+            "jitter": self.jitter, "shimmer": self.shimmer,
+        }
+        named.update({f"f{k}": stats for k, stats in self.formants.items()})
+        return named
+
+    def add_spectral(
+        self,
+        spectral: SpectralContext,
+        frames: slice = slice(None),
+        voiced: Optional[np.ndarray] = None,
+    ):
+        """Add the selected STFT frames (optionally only the voiced ones)."""
+        def select(values: np.ndarray) -> np.ndarray:
+            return values if voiced is None else values[voiced]
+
+        self.centroid.update(select(spectral.centroid()[frames]))
+        self.rolloff.update(select(spectral.rolloff()[frames]))
+        self.rms.update(select(spectral.rms()[frames]))
+        self.mfcc.update(select(spectral.mfcc(13)[:, frames].T))
+
+    def add_praat(
+        self,
+        praat: PraatContext,
+        tmin: float,
+        tmax: float,
+        in_range: Callable[[np.ndarray], np.ndarray],
+    ):
+        """Add Praat measurements over [tmin, tmax) of the analyzed buffer."""
+        import parselmouth
+        from parselmouth.praat import call
+
+        pitch = praat.pitch_track
+        in_piece = in_range(pitch.times)
+        self.f0.update(pitch.f0[in_piece & pitch.voiced])
+
+        harmonicity = praat.harmonicity
+        values = harmonicity.values[0]
+        self.hnr.update(values[in_range(harmonicity.xs()) & (values != PRAAT_UNDEFINED_DB)])
+
+        cepstral = praat.cepstral
+        keep = in_range(cepstral.times)
+        for name in ("cpp", "h1_h2", "h1_a2", "h1_a3"):
+            values = getattr(cepstral, name)[keep]
+            getattr(self, name).update(values[np.isfinite(values)])
+
+        formant = praat.formant
+        n_formant_frames = int(np.count_nonzero((formant.xs() >= tmin) & (formant.xs() < tmax)))
+        for k, stats in self.formants.items():
+            value = call(formant, "Get mean", k, tmin, tmax, "Hertz")
+            if not np.isnan(value):
+                stats.merge(n_formant_frames, value)
+
+        # Perturbation measures are ratios over periods (frames for the
+        # non-Praat pitch backends): weight by their count
+        if praat.pitch_backend != "praat":
+            for stats, (value, count) in (
+                (self.jitter, pitch.jitter(in_piece)),
+                (self.shimmer, pitch.shimmer(praat.audio, praat.sr, in_piece)),
+            ):
+                if count > 0:
+                    stats.merge(count, value)
+            return
+
+        point_process = praat.point_process
+        periods = call(point_process, "Get number of periods", tmin, tmax, 0.0001, 0.02, 1.3)
+        piece_jitter = call(point_process, "Get jitter (local)", tmin, tmax, 0.0001, 0.02, 1.3)
+        piece_shimmer = call(
+            [praat.sound, point_process], "Get shimmer (local)", tmin, tmax, 0.0001, 0.02, 1.3, 1.6
+        )
+        if periods > 0 and not np.isnan(piece_jitter):
+            self.jitter.merge(periods, piece_jitter)
+        if periods > 0 and not np.isnan(piece_shimmer):
+            self.shimmer.merge(periods, piece_shimmer)
+
+    def merge(self, other: "FeatureStats"):
+        """Fold in the statistics of another piece."""
+        mine = self._all()
+        for name, stats in other._all().items():
+            mine[name].merge(stats.count, stats.mean, stats.m2, stats.min, stats.max)
+
+    def to_features(self, timings: Optional[StageTimings] = None) -> AcousticFeatures:
+        """
+        AcousticFeatures from the running means. Empty statistics take the
+        extractor defaults, each noted in timings as a fallback under the
+        same name extract_features_and_tracks uses.
+        """
+        def mean_or(stats: RunningStats, default: Any, name: str) -> Any:
+            return float(stats.mean) if stats.count else fell_back(timings, name, default)
+
+        return AcousticFeatures(
+            spectral_centroid=mean_or(self.centroid, 2450.0, "spectral.centroid"),
+            spectral_rolloff=mean_or(self.rolloff, 4500.0, "spectral.rolloff"),
+            hnr=mean_or(self.hnr, 15.0, "hnr"),
+            cpp=mean_or(self.cpp, DEFAULT_CPP, "cepstral.cpp"),
+            h1_h2=mean_or(self.h1_h2, DEFAULT_H1_H2, "cepstral.h1_h2"),
+            h1_a2=float(self.h1_a2.mean) if self.h1_a2.count else None,
+            h1_a3=float(self.h1_a3.mean) if self.h1_a3.count else None,
+            f0_mean=mean_or(self.f0, 150, "pitch.f0_mean"),
+            f0_range=[
+                float(self.f0.min) if self.f0.count else fell_back(timings, "pitch.f0_min", 100),
+                float(self.f0.max) if self.f0.count else fell_back(timings, "pitch.f0_max", 300),
+            ],
+            formants={
+                f"f{k}": mean_or(self.formants[k], default, f"formants.f{k}")
+                for k, default in zip(range(1, 5), DEFAULT_FORMANTS)
+            },
+            mfccs=(
+                [float(v) for v in self.mfcc.mean] if self.mfcc.count
+                else fell_back(timings, "mfcc", list(np.zeros(13)))
+            ),
+            jitter=mean_or(self.jitter, 0.005, "pitch.jitter") * 100,
+            shimmer=mean_or(self.shimmer, 0.03, "pitch.shimmer") * 100,
+        )
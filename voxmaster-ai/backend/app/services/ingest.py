@@ -0,0 +1,190 @@
+"""
+Upload Ingestion Service
+
+Streams an uploaded file exactly once, chunk by chunk, and tees each chunk
+to the decode buffer, the storage backend and a SHA-256 hasher at the same
+time. The decode buffer is spooled: uploads up to INGEST_SPOOL_MAX_BYTES
+stay in memory and are decoded from there, larger ones spill to a temp
+file carrying the upload's real extension. Peak memory per upload is
+bounded by the spool limit plus a few chunks queued for storage.
+
+Callers that hold many uploads at once (batch analysis) pass a spool
+limit of 0, so every upload spills and only its path travels to the
+analysis worker.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Union
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.services.metrics import pipeline_metrics
+from app.services.storage import storage
+
+
+# Chunks buffered between the reader and a slower storage upload
+STORAGE_QUEUE_DEPTH = 4
+
+# Fallback extensions when the filename has none
+CONTENT_TYPE_SUFFIXES = {
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/m4a": ".m4a",
+    "audio/x-m4a": ".m4a",
+}
+
+
+@dataclass
+class IngestedUpload:
+    """
+    A spooled upload with its digest and storage URL.
+
+    Exactly one of data (in-memory bytes) or path (spilled temp file) is set.
+    """
+    filename: str
+    suffix: str
+    size: int
+    sha256: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    audio_url: Optional[str] = None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """Decoder input: the in-memory bytes or the temp file path."""
+        return self.data if self.data is not None else self.path
+
+    def cleanup(self):
+        """Release the buffer or remove the temp file."""
+        self.data = None
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+async def ingest_upload(
+    file: UploadFile,
+    store: bool = True,
+    chunk_size: Optional[int] = None,
+    spool_max_bytes: Optional[int] = None,
+) -> IngestedUpload:
+    """
+    Stream an upload to a spooled buffer (and optionally to storage) in one pass.
+
+    Args:
+        file: Incoming upload
+        store: Also upload the audio to the storage backend
+        chunk_size: Read size in bytes (defaults to settings.ingest_chunk_size)
+        spool_max_bytes: Largest upload kept in memory (defaults to
+            settings.ingest_spool_max_bytes; 0 always spills to disk)
+
+    Returns:
+        IngestedUpload with in-memory data or temp file path, size, SHA-256
+        and storage URL. Storage failures are logged and leave audio_url as None.
+    """
+    chunk_size = chunk_size or settings.ingest_chunk_size
+    if spool_max_bytes is None:
+        spool_max_bytes = settings.ingest_spool_max_bytes
+    filename = file.filename or "audio.wav"
+    suffix = upload_suffix(filename, file.content_type)
+    hasher = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    spill = None
+
+    queue: Optional[asyncio.Queue] = None
+    upload_task: Optional[asyncio.Task] = None
+    if store:
+        queue = asyncio.Queue(maxsize=STORAGE_QUEUE_DEPTH)
+        upload_task = asyncio.create_task(
+            _store_stream(queue, filename, file.content_type or "audio/wav", file.size)
+        )
+
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            hasher.update(chunk)
+
+            if spill is None and len(buffer) + len(chunk) > spool_max_bytes:
+                spill = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                spill.write(buffer)
+                buffer = bytearray()
+            if spill is not None:
+                spill.write(chunk)
+            else:
+                buffer.extend(chunk)
+
+            if queue is not None:
+                await queue.put(chunk)
+    except BaseException:
+        if upload_task is not None:
+            upload_task.cancel()
+        if spill is not None:
+            spill.close()
+            os.unlink(spill.name)
+        raise
+
+    if spill is not None:
+        spill.close()
+
+    audio_url = None
+    if upload_task is not None:
+        await queue.put(None)
+        audio_url = await upload_task
+
+    return IngestedUpload(
+        filename=filename,
+        suffix=suffix,
+        size=size,
+        sha256=hasher.hexdigest(),
+        data=bytes(buffer) if spill is None else None,
+        path=spill.name if spill is not None else None,
+        audio_url=audio_url,
+    )
+
+
+def upload_suffix(filename: str, content_type: Optional[str]) -> str:
+    """File extension for an upload, from its name or content type."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext:
+        return ext
+    return CONTENT_TYPE_SUFFIXES.get(content_type or "", ".wav")
+
+
+async def _store_stream(
+    queue: asyncio.Queue,
+    filename: str,
+    content_type: str,
+    size: Optional[int],
+) -> Optional[str]:
+    """Consume chunks from the queue into the storage backend."""
+    finished = False
+
+    async def chunks() -> AsyncIterator[bytes]:
+        nonlocal finished
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                finished = True
+                return
+            yield chunk
+
+    try:
+        with pipeline_metrics.timed("storage_upload.audio"):
+            _, url = await storage.upload_audio_stream(chunks(), filename, content_type, size)
+        return url
+    except Exception as storage_error:
+        print(f"Warning: Could not upload to storage: {storage_error}")
+        # Keep draining so the reader never blocks on a full queue
+        while not finished and await queue.get() is not None:
+            pass
+        return None
@@ -0,0 +1,155 @@
+"""
+Analysis Job Registry
+
+In-memory registry for asynchronous analysis jobs (submit, then poll or
+subscribe to progress events). Memory is bounded: finished jobs expire
+after a TTL and the registry never holds more than a fixed number of
+jobs, evicting the oldest finished ones first.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+# Pipeline stages in the order they complete
+JOB_STAGES = ["queued", "decoded", "preprocessed", "features", "scored", "stored"]
+
+
+class JobRegistryFull(Exception):
+    """Raised when every slot in the registry is held by an unfinished job."""
+
+
+@dataclass
+class AnalysisJob:
+    """State of one asynchronous analysis job."""
+    id: str
+    filename: str
+    audio_type: str
+    prompt_type: str
+    status: str = "queued"  # queued, running, completed, failed
+    stage: str = "queued"
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[float] = None  # time.monotonic() when finished
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public snapshot of the job for polling responses."""
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "audio_type": self.audio_type,
+            "prompt_type": self.prompt_type,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(JOB_STAGES.index(self.stage) / (len(JOB_STAGES) - 1), 2),
+            "events": self.events,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class JobRegistry:
+    """Bounded, expiring registry of analysis jobs."""
+
+    def __init__(self, max_jobs: int, ttl_seconds: float):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+
+    def create(self, filename: str, audio_type: str, prompt_type: str) -> AnalysisJob:
+        """Register a new queued job, evicting expired or old finished jobs."""
+        self.expire()
+        if len(self.jobs) >= self.max_jobs:
+            for job_id, job in list(self.jobs.items()):
+                if job.is_finished:
+                    del self.jobs[job_id]
+                    break
+            else:
+                raise JobRegistryFull("Too many analysis jobs in progress")
+
+        job = AnalysisJob(
+            id=str(uuid.uuid4()),
+            filename=filename,
+            audio_type=audio_type,
+            prompt_type=prompt_type,
+        )
+        self.jobs[job.id] = job
+        self._publish(job, {"stage": "queued", "status": job.status})
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Look up a job, dropping it if it has expired."""
+        self.expire()
+        return self.jobs.get(job_id)
+
+    def advance(self, job: AnalysisJob, stage: str):
+        """Record that a pipeline stage finished. Out-of-order events are ignored."""
+        if job.is_finished or JOB_STAGES.index(stage) <= JOB_STAGES.index(job.stage):
+            return
+        job.status = "running"
+        job.stage = stage
+        self._publish(job, {"stage": stage, "status": job.status})
+
+    def complete(self, job: AnalysisJob, result: Dict[str, Any]):
+        """Mark the job completed with its analysis result."""
+        job.result = result
+        job.status = "completed"
+        job.stage = "stored"
+        job.finished_at = time.monotonic()
+        self._publish(job, {"stage": job.stage, "status": job.status})
+
+    def fail(self, job: AnalysisJob, error: str):
+        """Mark the job failed."""
+        job.error = error
+        job.status = "failed"
+        job.finished_at = time.monotonic()
+        self._publish(job, {"stage": job.stage, "status": job.status, "error": error})
+
+    def subscribe(self, job: AnalysisJob) -> asyncio.Queue:
+        """Subscribe to future events of a job."""
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, job: AnalysisJob, queue: asyncio.Queue):
+        if queue in job.subscribers:
+            job.subscribers.remove(queue)
+
+    def expire(self):
+        """Drop finished jobs older than the TTL."""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def _publish(self, job: AnalysisJob, event: Dict[str, Any]):
+        event["at"] = datetime.utcnow().isoformat()
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+
+# Global job registry instance
+job_registry = JobRegistry(
+    max_jobs=settings.analysis_jobs_max,
+    ttl_seconds=settings.analysis_jobs_ttl_seconds,
+)
@@ -0,0 +1,299 @@
+"""
+Live Analysis
+
+Incremental analysis of a microphone stream for the /api/analyze/live
+WebSocket. PCM chunks are written into a fixed-size ring buffer, and every
+update analyzes only the audio that arrived since the previous one:
+
+- STFT frames are cut from the ring as soon as a full window is available
+  and go through the same SpectralContext views as uploaded files
+- Praat (F0, HNR, formants, jitter/shimmer) runs on a short window around
+  the new audio, lagging LIVE_PRAAT_CONTEXT_SECONDS behind the stream so
+  every frame it keeps has full context on both sides
+
+Each update's measurements are merged into running FeatureStats, from which
+the running Sweet Spot is scored. Per-connection memory is the ring plus a
+constant-size set of running statistics, however long the session lasts.
+
+Sessions live in the process that analyzes them: the *_session functions
+below are the jobs LiveExecutor sends to its workers, keyed by session id,
+so only PCM bytes and update messages cross the process boundary.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.feature_stats import FeatureStats
+from app.services.praat import PraatContext
+from app.services.scoring import calculate_scores_sync
+from app.services.spectral import SpectralContext
+
+
+# Context kept on each side of the Praat window; covers the longest window
+# (3 periods at 50 Hz for pitch, 50 ms for formants) with margin.
+LIVE_PRAAT_CONTEXT_SECONDS = 0.1
+
+# Frames quieter than this (dBFS) are background, not voice
+LIVE_SILENCE_DB = -50.0
+
+PCM_ENCODINGS = {
+    "f32": np.dtype("<f4"),
+    "s16": np.dtype("<i2"),
+}
+
+
+def decode_pcm(data: bytes, encoding: str) -> np.ndarray:
+    """Little-endian mono PCM bytes to float32 in [-1, 1]."""
+    dtype = PCM_ENCODINGS[encoding]
+    if len(data) % dtype.itemsize:
+        raise ValueError(f"PCM chunk is not a whole number of {encoding} samples")
+    samples = np.frombuffer(data, dtype=dtype)
+    if dtype.kind == "i":
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32)
+
+
+class RingBuffer:
+    """Fixed-capacity sample buffer addressed by absolute sample index."""
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.total = 0  # samples written since the session started
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.total - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        if len(samples) >= self.capacity:
+            self.total += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy of samples [start, end) (absolute indices, still in the ring)."""
+        if start < self.oldest or end > self.total or start > end:
+            raise IndexError(f"Samples [{start}, {end}) are not in the ring")
+        index = np.arange(start, end) % self.capacity
+        return self.data[index]
+
+
+class LiveAnalyzer:
+    """Incremental feature extraction and scoring for one live session."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        audio_type: AudioType,
+        ring_seconds: float = 10.0,
+        update_seconds: float = 0.1,
+        n_fft: int = 2048,
+        hop_length: int = 512,
+    ):
+        self.sr = sample_rate
+        self.audio_type = audio_type
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.update_samples = max(1, int(update_seconds * sample_rate))
+        self.context_samples = int(LIVE_PRAAT_CONTEXT_SECONDS * sample_rate)
+        # The ring must hold at least one update plus the Praat context
+        capacity = max(int(ring_seconds * sample_rate), self.update_samples + 2 * self.context_samples + n_fft)
+        self.ring = RingBuffer(capacity)
+        self.reset()
+
+    def reset(self):
+        """Forget the running statistics (the stream position is kept)."""
+        self.stats = FeatureStats()
+        self._next_frame = -(-self.ring.total // self.hop_length)
+        self._praat_done = self.ring.total
+        self._last_update = self.ring.total
+
+    def push(self, samples: np.ndarray):
+        """Append a chunk of float32 samples to the ring."""
+        self.ring.write(samples)
+
+    @property
+    def ready(self) -> bool:
+        """Whether enough audio arrived since the last update."""
+        return self.ring.total - self._last_update >= self.update_samples
+
+    def update(self, final: bool = False) -> Dict[str, Any]:
+        """
+        Analyze the audio received since the previous update.
+
+        With final=True the Praat window runs up to the end of the stream
+        instead of lagging behind it.
+
+        Returns the update message: the latest values, the running means
+        and the running Sweet Spot (None until voice has been heard).
+        """
+        current = FeatureStats()
+        level = self._add_spectral(current)
+        self._add_praat(current, final)
+        self.stats.merge(current)
+        self._last_update = self.ring.total
+
+        sweet_spot = None
+        if self.stats.centroid.count:
+            features = self.stats.to_features()
+            sweet_spot = calculate_scores_sync(features, self.audio_type)["sweet_spot"].model_dump()
+
+        return {
+            "type": "update",
+            "time": round(self.ring.total / self.sr, 3),
+            "current": {
+                "f0": _mean(current.f0),
+                "centroid": _mean(current.centroid),
+                "hnr": _mean(current.hnr),
+                "level_db": _db(level),
+            },
+            "running": {
+                "f0_mean": _mean(self.stats.f0),
+                "f0_range": [_value(self.stats.f0.min), _value(self.stats.f0.max)],
+                "centroid": _mean(self.stats.centroid),
+                "hnr": _mean(self.stats.hnr),
+            },
+            "sweet_spot": sweet_spot,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Flush the stream and return the session's features and scores."""
+        self.update(final=True)
+        features = self.stats.to_features()
+        scores = calculate_scores_sync(features, self.audio_type)
+        return {
+            "type": "summary",
+            "duration": round(self.ring.total / self.sr, 3),
+            "features": features.model_dump(),
+            "scores": {name: score.model_dump() for name, score in scores.items()},
+        }
+
+    def _add_spectral(self, stats: FeatureStats) -> Optional[float]:
+        """
+        Cut every newly complete STFT frame from the ring and add its voiced
+        frames. Returns the mean RMS of all new frames (None if there were none).
+        """
+        first = max(self._next_frame, -(-self.ring.oldest // self.hop_length))
+        stop = (self.ring.total - self.n_fft) // self.hop_length + 1
+        if stop <= first:
+            return None
+        self._next_frame = stop
+
+        start = first * self.hop_length
+        audio = self.ring.read(start, (stop - 1) * self.hop_length + self.n_fft)
+        frames = np.lib.stride_tricks.sliding_window_view(audio, self.n_fft)[::self.hop_length].T
+        spectral = SpectralContext.from_frames(frames, self.sr, self.hop_length)
+        rms = spectral.rms()
+        stats.add_spectral(spectral, voiced=rms > 10 ** (LIVE_SILENCE_DB / 20))
+        return float(rms.mean())
+
+    def _add_praat(self, stats: FeatureStats, final: bool):
+        """Run Praat on the new audio plus context and add its frames."""
+        end = self.ring.total if final else self.ring.total - self.context_samples
+        region_start = self._praat_done
+        if self.ring.oldest:
+            # Audio that already left the ring is skipped
+            region_start = max(region_start, self.ring.oldest + self.context_samples)
+        if end <= region_start or (end - region_start < self.context_samples // 2 and not final):
+            return
+        self._praat_done = end
+
+        window_start = max(0, region_start - self.context_samples)
+        audio = self.ring.read(window_start, self.ring.total)
+        tmin = (region_start - window_start) / self.sr
+        tmax = (end - window_start) / self.sr
+
+        # Praat's silence threshold is relative to the window's peak, so in a
+        # short window background noise would be measured as voice; gate it
+        # on the same absolute level as the spectral frames instead.
+        half = self.hop_length // 2
+        energy = np.concatenate(([0.0], np.cumsum(audio.astype(np.float64) ** 2)))
+        floor = 10 ** (LIVE_SILENCE_DB / 10)
+
+        def loud(times: np.ndarray) -> np.ndarray:
+            centers = np.round(times * self.sr).astype(np.int64)
+            lo = np.clip(centers - half, 0, len(audio))
+            hi = np.clip(centers + half, 0, len(audio))
+            return (energy[hi] - energy[lo]) > floor * np.maximum(hi - lo, 1)
+
+        region = np.arange(region_start, end, self.hop_length) - window_start
+        if not loud(region / self.sr).any():
+            return
+
+        def in_range(times: np.ndarray) -> np.ndarray:
+            return (times >= tmin) & (times < tmax) & loud(times)
+
+        praat = PraatContext(audio, self.sr, self.audio_type)
+        stats.add_praat(praat, tmin, tmax, in_range)
+
+
+# Sessions hosted by this process, by session id
+_sessions: Dict[str, LiveAnalyzer] = {}
+
+
+def init_live_worker(prewarm: bool) -> None:
+    """Process-pool initializer: map the reference norms, optionally warm up."""
+    from app.services.norms import get_reference_norms
+    from app.services.pipeline import warm_up_worker
+
+    get_reference_norms()
+    if prewarm:
+        warm_up_worker()
+
+
+def open_session(
+    session_id: str,
+    sample_rate: int,
+    audio_type: AudioType,
+    ring_seconds: float,
+    update_seconds: float,
+) -> None:
+    _sessions[session_id] = LiveAnalyzer(
+        sample_rate,
+        audio_type,
+        ring_seconds=ring_seconds,
+        update_seconds=update_seconds,
+    )
+
+
+def feed_session(session_id: str, data: bytes, encoding: str) -> Optional[Dict[str, Any]]:
+    """
+    Append a PCM chunk to the session; returns the update message once
+    enough audio arrived, else None. Raises ValueError for malformed PCM.
+    """
+    analyzer = _sessions[session_id]
+    analyzer.push(decode_pcm(data, encoding))
+    return analyzer.update() if analyzer.ready else None
+
+
+def reset_session(session_id: str) -> None:
+    _sessions[session_id].reset()
+
+
+def close_session(session_id: str, summary: bool = False) -> Optional[Dict[str, Any]]:
+    """Drop the session, returning its final summary if requested."""
+    analyzer = _sessions.pop(session_id, None)
+    if analyzer is None or not summary:
+        return None
+    return analyzer.summary()
+
+
+def _value(value) -> Optional[float]:
+    value = float(value)
+    return round(value, 2) if np.isfinite(value) else None
+
+
+def _mean(stats) -> Optional[float]:
+    return _value(stats.mean) if stats.count else None
+
+
+def _db(rms: Optional[float]) -> Optional[float]:
+    return round(20.0 * np.log10(max(rms, 1e-10)), 1) if rms is not None else None
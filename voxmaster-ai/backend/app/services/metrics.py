@@ -0,0 +1,125 @@
+"""
+Pipeline Metrics
+
+Per-process latency histograms and error/fallback counters for the
+analysis pipeline stages (decode, preprocessing steps, each feature
+extractor, scoring, database writes, storage uploads), rendered in the
+Prometheus text exposition format at /api/metrics.
+
+Worker processes do not record anything themselves: their stage timings
+and fallbacks travel back in the AnalysisResult and are folded in here,
+so every observation happens on the API process's event loop thread and
+the counters need no locks. Buckets are fixed and each stage's counts are
+preallocated on its first observation; recording is a bisect and a few
+integer increments.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+
+# Upper bounds in seconds, from a cache-hit lookup to a long chunked analysis
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+PREFIX = "voxmaster_pipeline"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with fixed bounds."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class PipelineMetrics:
+    """Latency histograms plus error and fallback counters per stage."""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float):
+        """Record one run of a stage."""
+        histogram = self.latency.get(stage)
+        if histogram is None:
+            histogram = self.latency[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def error(self, stage: str):
+        """Count a stage that raised."""
+        self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def fallback(self, stage: str):
+        """Count a stage that returned default values instead of measurements."""
+        self.fallbacks[stage] = self.fallbacks.get(stage, 0) + 1
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block; count it as an error if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.error(stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_analysis(
+        self,
+        timings: Optional[Mapping[str, float]],
+        fallbacks: Optional[Iterable[str]] = None,
+    ):
+        """Fold in an AnalysisResult's stage timings (ms) and fallbacks."""
+        for stage, ms in (timings or {}).items():
+            self.observe(stage, ms / 1000.0)
+        for stage in fallbacks or ():
+            self.fallback(stage)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {PREFIX}_stage_seconds Time spent per analysis pipeline stage",
+            f"# TYPE {PREFIX}_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.latency.items()):
+            label = _label(stage)
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{label}"}} {histogram.sum:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{label}"}} {histogram.count}')
+
+        for name, help_text, counters in (
+            ("stage_errors_total", "Pipeline stages that raised", self.errors),
+            ("stage_fallbacks_total", "Pipeline stages that returned default values", self.fallbacks),
+        ):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            for stage, count in sorted(counters.items()):
+                lines.append(f'{PREFIX}_{name}{{stage="{_label(stage)}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Global pipeline metrics instance
+pipeline_metrics = PipelineMetrics()
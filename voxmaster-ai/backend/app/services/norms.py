@@ -0,0 +1,328 @@
+"""
+Reference Norms
+
+Reference statistics of the features the scores read, per AudioType and
+per voice class (F0 band), built offline from stored analyses:
+
+- count, mean, std and the 5/25/50/75/95th percentiles per feature
+- the running sums and fixed-bin histograms behind them, so a rebuild
+  only reads the analyses stored since the previous one
+
+The table is a single float64 array of shape (groups, features, fields)
+saved as <path>.npy, next to a small JSON header (<path>.json) with the
+build watermark (created_at and id of the newest analysis folded in)
+and version. Group and feature layout is fixed, so a row's group index
+is arithmetic on its audio type and F0 band, and a batch of any size
+looks its norms up with one gather. The API process
+and the analysis workers memory-map the table at startup.
+
+Rebuild from the backend directory (incremental unless --full); running
+servers pick the new table up when they restart:
+
+    python -m app.services.norms
+    python -m app.services.norms --full
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.schemas import AudioType
+
+
+# Normalized feature -> histogram range (values outside land in the edge bins)
+NORM_FEATURES: Dict[str, Tuple[float, float]] = {
+    "spectral_centroid": (0.0, 8000.0),
+    "hnr": (-10.0, 50.0),
+    "cpp": (0.0, 40.0),
+    "h1_h2": (-30.0, 30.0),
+    "f0_mean": (0.0, 1200.0),
+    "jitter": (0.0, 10.0),
+    "shimmer": (0.0, 30.0),
+    "f2_f1_ratio": (0.0, 10.0),
+    "ring_distance": (0.0, 3000.0),
+    "f1_f2_spacing": (-1000.0, 4000.0),
+}
+FEATURE_INDEX = {name: i for i, name in enumerate(NORM_FEATURES)}
+
+# Voice classes by mean F0 in Hz; "all" pools every class
+VOICE_CLASSES = ("all", "low", "mid", "high")
+VOICE_CLASS_EDGES = (150.0, 250.0)
+
+AUDIO_TYPES = tuple(AudioType)
+GROUPS = tuple(f"{audio_type.value}/{voice_class}" for audio_type in AUDIO_TYPES for voice_class in VOICE_CLASSES)
+
+PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 200
+
+# Field layout along the last axis of the table
+COUNT, SUM, SUM_SQUARES, MEAN, STD = range(5)
+PERCENTILE_START = 5
+HISTOGRAM_START = PERCENTILE_START + len(PERCENTILES)
+FIELDS = HISTOGRAM_START + HISTOGRAM_BINS
+
+
+class ReferenceNorms:
+    """Per-group, per-feature reference statistics (see module docstring)."""
+
+    def __init__(self, table: np.ndarray, header: Dict[str, Any]):
+        self.table = table
+        self.header = header
+
+    @classmethod
+    def empty(cls) -> "ReferenceNorms":
+        table = np.zeros((len(GROUPS), len(NORM_FEATURES), FIELDS), dtype=np.float64)
+        return cls(table, {"version": None, "built_at": None, "watermark": None, "watermark_id": None, "analyses": 0})
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ReferenceNorms"]:
+        """Memory-map a saved table; None if there is none or its layout is stale."""
+        try:
+            with open(f"{path}.json") as f:
+                header = json.load(f)
+            table = np.load(f"{path}.npy", mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        if header.get("groups") != list(GROUPS) or header.get("features") != list(NORM_FEATURES) \
+                or table.shape != (len(GROUPS), len(NORM_FEATURES), FIELDS):
+            print(f"⚠️  Ignoring reference norms at {path}: built for another layout, rebuild with --full")
+            return None
+        return cls(table, header)
+
+    def copy(self) -> "ReferenceNorms":
+        """Writable in-memory copy (e.g. of a memory-mapped table) to add to."""
+        return ReferenceNorms(np.array(self.table), dict(self.header))
+
+    def save(self, path: str):
+        """Write the table and header, replacing any previous build atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        header = {
+            **self.header,
+            "groups": list(GROUPS),
+            "features": list(NORM_FEATURES),
+            "ranges": {name: list(bounds) for name, bounds in NORM_FEATURES.items()},
+            "voice_class_edges": list(VOICE_CLASS_EDGES),
+            "percentiles": list(PERCENTILES),
+        }
+        with open(f"{path}.tmp.npy", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.table))
+        with open(f"{path}.tmp.json", "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(f"{path}.tmp.npy", f"{path}.npy")
+        os.replace(f"{path}.tmp.json", f"{path}.json")
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.header.get("version")
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """created_at of the newest analysis folded in."""
+        value = self.header.get("watermark")
+        return datetime.fromisoformat(value) if value else None
+
+    @property
+    def watermark_id(self) -> Optional[str]:
+        """id of the newest analysis folded in, breaking created_at ties."""
+        return self.header.get("watermark_id")
+
+    def add(self, audio_type: AudioType, features: Dict[str, np.ndarray]):
+        """Fold N rows of one audio type into the running sums and histograms."""
+        base = AUDIO_TYPES.index(AudioType(audio_type)) * len(VOICE_CLASSES)
+        classes = voice_classes(features["f0_mean"])
+        for name, (low, high) in NORM_FEATURES.items():
+            values = np.asarray(features[name], dtype=np.float64)
+            finite = np.isfinite(values)
+            f = FEATURE_INDEX[name]
+            for c in range(len(VOICE_CLASSES)):
+                selected = values[finite if c == 0 else finite & (classes == c)]
+                if not len(selected):
+                    continue
+                stats = self.table[base + c, f]
+                stats[COUNT] += len(selected)
+                stats[SUM] += selected.sum()
+                stats[SUM_SQUARES] += np.dot(selected, selected)
+                stats[HISTOGRAM_START:] += np.histogram(
+                    np.clip(selected, low, high), bins=HISTOGRAM_BINS, range=(low, high)
+                )[0]
+        self.header["analyses"] = self.header.get("analyses", 0) + len(classes)
+
+    def finalize(self, watermark: Optional[datetime], watermark_id: Optional[str] = None):
+        """Derive mean, std and percentiles from the sums and stamp the build."""
+        stats = self.table
+        count = stats[..., COUNT]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = stats[..., SUM] / count
+            variance = stats[..., SUM_SQUARES] / count - mean ** 2
+        stats[..., MEAN] = np.where(count > 0, mean, np.nan)
+        stats[..., STD] = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+        for name, (low, high) in NORM_FEATURES.items():
+            f = FEATURE_INDEX[name]
+            edges = np.linspace(low, high, HISTOGRAM_BINS + 1)
+            cdf = np.cumsum(stats[:, f, HISTOGRAM_START:], axis=1)
+            for g in range(len(GROUPS)):
+                total = cdf[g, -1]
+                for p, q in enumerate(PERCENTILES):
+                    if total == 0:
+                        stats[g, f, PERCENTILE_START + p] = np.nan
+                        continue
+                    # Linear interpolation inside the bin holding the target rank
+                    target = q / 100 * total
+                    i = int(np.searchsorted(cdf[g], target))
+                    below = cdf[g, i - 1] if i > 0 else 0.0
+                    fraction = (target - below) / max(cdf[g, i] - below, 1.0)
+                    stats[g, f, PERCENTILE_START + p] = edges[i] + fraction * (edges[i + 1] - edges[i])
+
+        built_at = datetime.now(timezone.utc)
+        self.header["built_at"] = built_at.isoformat()
+        if watermark is not None:
+            self.header["watermark"] = watermark.isoformat()
+            self.header["watermark_id"] = watermark_id
+        self.header["version"] = f"{built_at.strftime('%Y%m%dT%H%M%S')}-{self.header.get('analyses', 0)}"
+
+    def rows(self, audio_type: AudioType, f0_mean: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(voice-class group, audio-type-wide group) index of every row."""
+        base = AUDIO_TYPES.index(AudioType(audio_type)) * len(VOICE_CLASSES)
+        pooled = np.full(len(f0_mean), base)
+        if not settings.scoring_norms_by_voice_class:
+            return pooled, pooled
+        return base + voice_classes(f0_mean), pooled
+
+    def stats(self, name: str, rows: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reference mean and std of a feature for each row: its voice class
+        when that class has enough data, else its whole audio type; NaN
+        where neither has.
+        """
+        f = FEATURE_INDEX[name]
+        by_class, pooled = rows
+        minimum = settings.scoring_norms_min_count
+        group = np.where(self.table[by_class, f, COUNT] >= minimum, by_class, pooled)
+        stats = self.table[group, f]
+        usable = (stats[:, COUNT] >= minimum) & (stats[:, STD] > 0)
+        return np.where(usable, stats[:, MEAN], np.nan), np.where(usable, stats[:, STD], np.nan)
+
+    def describe(self) -> Dict[str, Any]:
+        """Build info and per-group summaries of the groups with data."""
+        groups = {}
+        for g, group in enumerate(GROUPS):
+            summary = {}
+            for name, f in FEATURE_INDEX.items():
+                stats = self.table[g, f]
+                if stats[COUNT] == 0:
+                    continue
+                summary[name] = {
+                    "count": int(stats[COUNT]),
+                    "mean": round(float(stats[MEAN]), 3),
+                    "std": round(float(stats[STD]), 3) if np.isfinite(stats[STD]) else None,
+                    **{
+                        f"p{q}": round(float(stats[PERCENTILE_START + p]), 3)
+                        for p, q in enumerate(PERCENTILES)
+                    },
+                }
+            if summary:
+                groups[group] = summary
+        return {
+            "version": self.version,
+            "built_at": self.header.get("built_at"),
+            "analyses": self.header.get("analyses", 0),
+            "min_count": settings.scoring_norms_min_count,
+            "by_voice_class": settings.scoring_norms_by_voice_class,
+            "groups": groups,
+        }
+
+
+def voice_classes(f0_mean: np.ndarray) -> np.ndarray:
+    """VOICE_CLASSES index per row from mean F0 (0 = "all" when F0 is unknown)."""
+    f0_mean = np.asarray(f0_mean, dtype=np.float64)
+    classes = np.digitize(f0_mean, VOICE_CLASS_EDGES) + 1
+    return np.where(np.isfinite(f0_mean), classes, 0)
+
+
+_reference_norms: Optional[ReferenceNorms] = None
+_loaded = False
+
+
+def get_reference_norms() -> Optional[ReferenceNorms]:
+    """The memory-mapped reference norms of this process (None if not built)."""
+    global _reference_norms, _loaded
+    if not _loaded:
+        _loaded = True
+        if settings.scoring_norms_path:
+            _reference_norms = ReferenceNorms.load(settings.scoring_norms_path)
+    return _reference_norms
+
+
+async def rebuild(path: str, full: bool = False, batch_size: int = 1000) -> ReferenceNorms:
+    """
+    Fold stored analyses into the norms at path: only those created since
+    the previous build, or all of them with full. Rows are streamed from
+    the database in batches, so memory stays flat. Feature values that
+    are extractor defaults (see defaulted_fields), including everything a
+    `features=` subset left out, are skipped.
+    """
+    from app.services.database import db
+    from app.services.feature_extraction import defaulted_fields
+    from app.services.scoring import feature_columns, placement_inputs
+
+    previous = None if full else ReferenceNorms.load(path)
+    norms = previous.copy() if previous is not None else ReferenceNorms.empty()
+    # Resume after the last row folded in, not just its created_at, so rows
+    # sharing that timestamp are neither skipped nor counted twice
+    watermark, watermark_id = norms.watermark, norms.watermark_id
+
+    await db.connect()
+    try:
+        async for batch in db.iter_analysis_features(
+            since=watermark, batch_size=batch_size, after_id=watermark_id
+        ):
+            for audio_type in AUDIO_TYPES:
+                rows = [
+                    row for row in batch
+                    if row.get("features") and row.get("audio_type") == audio_type.value
+                ]
+                if rows:
+                    columns = feature_columns(row["features"] for row in rows)
+                    # Defaults stand in for measurements that failed; keep
+                    # them out of the reference distributions
+                    for i, row in enumerate(rows):
+                        for name in defaulted_fields(row["features"], row.get("fallbacks")) & columns.keys():
+                            columns[name][i] = np.nan
+                    columns.update(placement_inputs(columns, fill=False))
+                    norms.add(audio_type, columns)
+            if batch[-1]["created_at"] is not None:
+                watermark, watermark_id = batch[-1]["created_at"], str(batch[-1]["id"])
+    finally:
+        await db.disconnect()
+
+    added = norms.header.get("analyses", 0) - (previous.header.get("analyses", 0) if previous else 0)
+    if previous is not None and added == 0:
+        # Nothing new to fold in: keep the current build and its version
+        print(f"📐 Reference norms {previous.version} are up to date")
+        return previous
+    norms.finalize(watermark, watermark_id)
+    norms.save(path)
+    print(f"📐 Reference norms {norms.version}: {added} new analyses, {norms.header['analyses']} total -> {path}.npy")
+    return norms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the scoring reference norms from stored analyses")
+    parser.add_argument("--full", action="store_true", help="rebuild from scratch instead of incrementally")
+    parser.add_argument("--path", default=settings.scoring_norms_path)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("no --path given and SCORING_NORMS_PATH is empty")
+    asyncio.run(rebuild(args.path, args.full, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
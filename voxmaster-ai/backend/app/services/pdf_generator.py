@@ -6,7 +6,7 @@ Generates professional PDF reports for vocal analyses using ReportLab.
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.platypus import Image, PageBreak
@@ -14,32 +14,21 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
 from typing import Dict, Any
 from datetime import datetime
+from functools import lru_cache
 
 
-async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
+@lru_cache(maxsize=1)
+def report_styles() -> StyleSheet1:
     """
-    Generate a PDF report from an analysis result.
-    
-    Args:
-        analysis: Analysis data dictionary
-    
-    Returns:
-        PDF file as bytes
+    Report stylesheet: ReportLab's sample styles plus the report's own.
+
+    Built once per process (at startup warm-up, or on the first report).
+    The custom title is 'ReportTitle' since the sample sheet already
+    defines 'Title'.
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch,
-    )
-    
-    # Styles
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(
-        name='Title',
+        name='ReportTitle',
         parent=styles['Heading1'],
         fontSize=24,
         spaceAfter=30,
@@ -68,12 +57,37 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
         fontSize=10,
         spaceAfter=6,
     ))
+    return styles
+
+
+async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
+    """
+    Generate a PDF report from an analysis result.
+    
+    Args:
+        analysis: Analysis data dictionary
+    
+    Returns:
+        PDF file as bytes
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch,
+    )
+    
+    # Styles
+    styles = report_styles()
     
     # Build content
     content = []
     
     # Title
-    content.append(Paragraph("VoxMaster AI", styles['Title']))
+    content.append(Paragraph("VoxMaster AI", styles['ReportTitle']))
     content.append(Paragraph("Vocal Analysis Report", styles['Heading2']))
     content.append(Spacer(1, 20))
     
@@ -96,7 +110,7 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
     content.append(Spacer(1, 20))
     
     # Sweet Spot Score
-    sweet_spot = analysis.get('sweet_spot', {})
+    sweet_spot = analysis.get('sweet_spot') or {}
     content.append(Paragraph("Sweet Spot Score", styles['SectionHeader']))
     
     total_score = sweet_spot.get('total', 0)
@@ -142,7 +156,7 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
     content.append(Spacer(1, 20))
     
     # Timbre Analysis
-    timbre = analysis.get('timbre', {})
+    timbre = analysis.get('timbre') or {}
     content.append(Paragraph("Timbre Analysis", styles['SectionHeader']))
     content.append(Paragraph(
         "Spectral shape and harmonic content characteristics",
@@ -170,7 +184,7 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
     content.append(Spacer(1, 20))
     
     # Vocal Weight
-    weight = analysis.get('weight', {})
+    weight = analysis.get('weight') or {}
     content.append(Paragraph("Vocal Weight", styles['SectionHeader']))
     content.append(Paragraph(
         "Source strength and glottal closure characteristics",
@@ -198,7 +212,7 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
     content.append(Spacer(1, 20))
     
     # Tone Placement
-    placement = analysis.get('placement', {})
+    placement = analysis.get('placement') or {}
     content.append(Paragraph("Tone Placement", styles['SectionHeader']))
     content.append(Paragraph(
         "Resonance patterns and energy distribution (2.5-3.5 kHz)",
@@ -225,21 +239,21 @@ async def generate_analysis_pdf(analysis: Dict[str, Any]) -> bytes:
     content.append(Spacer(1, 20))
     
     # Acoustic Features
-    features = analysis.get('features', {})
+    features = analysis.get('features') or {}
     content.append(Paragraph("Acoustic Features", styles['SectionHeader']))
     content.append(Paragraph(
         "Raw acoustic measurements extracted from the audio",
         styles['Body']
     ))
     
-    formants = features.get('formants', {})
+    formants = features.get('formants') or {}
     features_data = [
         ["Feature", "Value", "Unit"],
-        ["Spectral Centroid", f"{features.get('spectral_centroid', 0):.0f}", "Hz"],
-        ["HNR", f"{features.get('hnr', 0):.1f}", "dB"],
-        ["CPP", f"{features.get('cpp', 0):.1f}", "dB"],
-        ["H1-H2", f"{features.get('h1_h2', 0):.1f}", "dB"],
-        ["Mean F0", f"{features.get('f0_mean', 0):.0f}", "Hz"],
+        ["Spectral Centroid", f"{(features.get('spectral_centroid') or 0):.0f}", "Hz"],
+        ["HNR", f"{(features.get('hnr') or 0):.1f}", "dB"],
+        ["CPP", f"{(features.get('cpp') or 0):.1f}", "dB"],
+        ["H1-H2", f"{(features.get('h1_h2') or 0):.1f}", "dB"],
+        ["Mean F0", f"{(features.get('f0_mean') or 0):.0f}", "Hz"],
         ["F1", f"{formants.get('f1', 0):.0f}", "Hz"],
         ["F2", f"{formants.get('f2', 0):.0f}", "Hz"],
         ["F3", f"{formants.get('f3', 0):.0f}", "Hz"],
@@ -0,0 +1,235 @@
+"""
+Analysis Pipeline
+
+Synchronous decode -> preprocess -> features -> scores job. Functions in
+this module are top-level and picklable so they can run inside the
+analysis executor's worker processes. Uploads go in as a path or as the
+still-encoded bytes; only small results (features and scores) come back,
+never the decoded audio buffers.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional
+
+from app.config import settings
+from app.models.schemas import AudioType, AcousticFeatures
+from app.services.chunked import extract_features_chunked, probe_duration
+from app.services.decoder import AudioSource
+from app.services.preprocessing import load_audio, preprocess_signal
+from app.services.feature_extraction import extract_features_and_tracks
+from app.services.feature_graph import FULL_PLAN, FeaturePlan
+from app.services.scoring import calculate_scores_sync
+from app.services.timing import StageTimings
+
+
+# Where progress events go: a multiprocessing queue inside pool workers,
+# or a thread-safe callback in the API process when running inline.
+_progress_sink: Optional[Callable[[Any], None]] = None
+
+
+def set_progress_sink(sink: Optional[Callable[[Any], None]]) -> None:
+    """Route (progress_key, stage) events to the given callable."""
+    global _progress_sink
+    _progress_sink = sink
+
+
+def report_progress(progress_key: Optional[str], stage: str) -> None:
+    """Emit a pipeline stage event for the job identified by progress_key."""
+    if progress_key is not None and _progress_sink is not None:
+        _progress_sink((progress_key, stage))
+
+
+@dataclass
+class AnalysisResult:
+    """Features and scores for one analyzed file."""
+    features: AcousticFeatures
+    scores: Dict[str, Any]
+    duration: float
+    tracks: Optional[bytes] = None  # serialized FeatureTracks pyramid (.npz)
+    timings: Optional[Dict[str, float]] = None  # milliseconds per stage
+    fallbacks: Optional[List[str]] = None  # stages that returned default values
+
+
+class AnalysisStageError(Exception):
+    """
+    An analysis that failed in the named stage ("decode", "preprocess",
+    "features", "scoring"). Raised from worker processes, so it pickles
+    through its args; str() is the original error message.
+    """
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(stage, message)
+        self.stage = stage
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def run_analysis(
+    source: AudioSource,
+    audio_type: AudioType,
+    suffix: str = "",
+    progress_key: Optional[str] = None,
+    plan: FeaturePlan = FULL_PLAN,
+) -> AnalysisResult:
+    """
+    Run the full analysis pipeline for one audio file.
+
+    source is a file path or the encoded upload bytes; suffix is the
+    original file extension, used as a decoder format hint. plan selects
+    the feature and score groups to compute (see app.services.feature_graph);
+    the others are None in the result.
+
+    Recordings of ANALYSIS_CHUNK_THRESHOLD_SECONDS or longer are analyzed
+    block by block (see app.services.chunked) so memory stays bounded.
+
+    When progress_key is given, "decoded", "preprocessed", "features" and
+    "scored" events are reported as each stage finishes. The time spent in
+    each stage (preprocessing broken down by step, features by group) is
+    logged and returned in the result's timings, and stages that fell back
+    to default values in its fallbacks. Failures are raised as
+    AnalysisStageError naming the stage that failed.
+    """
+    duration = probe_duration(source)
+    if duration is not None and duration >= settings.analysis_chunk_threshold_seconds:
+        return run_chunked_analysis(source, audio_type, progress_key, plan)
+
+    timings = StageTimings()
+
+    stage = "decode"
+    try:
+        with timings.stage("decode"):
+            audio, sr = load_audio(source, suffix=suffix)
+        report_progress(progress_key, "decoded")
+
+        stage = "preprocess"
+        preprocessed = preprocess_signal(audio, sr, audio_type, settings.analysis_denoise)
+        timings.merge(preprocessed.timings, prefix="preprocess.")
+        report_progress(progress_key, "preprocessed")
+
+        stage = "features"
+        feature_timings = StageTimings()
+        features, tracks = extract_features_and_tracks(
+            preprocessed, audio_type, settings.analysis_voiced_only, plan=plan, timings=feature_timings
+        )
+        timings.merge(feature_timings, prefix="features.")
+        report_progress(progress_key, "features")
+
+        stage = "scoring"
+        with timings.stage("scoring"):
+            scores = calculate_scores_sync(features, audio_type, plan)
+        report_progress(progress_key, "scored")
+    except Exception as e:
+        raise AnalysisStageError(stage, str(e)) from e
+
+    log_timings(timings, preprocessed.duration)
+    return AnalysisResult(
+        features=features,
+        scores=scores,
+        duration=preprocessed.duration,
+        tracks=tracks.to_bytes() if tracks is not None else None,
+        timings=timings.to_dict(),
+        fallbacks=timings.fallbacks,
+    )
+
+
+def run_chunked_analysis(
+    source: AudioSource,
+    audio_type: AudioType,
+    progress_key: Optional[str] = None,
+    plan: FeaturePlan = FULL_PLAN,
+) -> AnalysisResult:
+    """
+    Bounded-memory variant of run_analysis for very long recordings.
+
+    The block statistics are merged for every feature group, so the plan
+    only trims the result (and the fallbacks) here; tracks are kept for the
+    full plan only. Failures name the innermost timed stage that raised
+    ("decode", "preprocess.<step>", "scoring"), or "features".
+    """
+    timings = StageTimings()
+    try:
+        features, duration, tracks = extract_features_chunked(
+            source,
+            audio_type,
+            settings.analysis_chunk_seconds,
+            voiced_only=settings.analysis_voiced_only,
+            denoise=settings.analysis_denoise,
+            progress=lambda stage: report_progress(progress_key, stage),
+            with_tracks=plan.is_full,
+            timings=timings,
+        )
+        features = plan.restrict(features)
+        timings.fallbacks = [
+            name for name in timings.fallbacks
+            if name.split(".")[1] in plan.features
+        ]
+        report_progress(progress_key, "features")
+
+        with timings.stage("scoring"):
+            scores = calculate_scores_sync(features, audio_type, plan)
+        report_progress(progress_key, "scored")
+    except Exception as e:
+        raise AnalysisStageError(timings.failed or "features", str(e)) from e
+
+    log_timings(timings, duration)
+    return AnalysisResult(
+        features=features,
+        scores=scores,
+        duration=duration,
+        tracks=tracks.to_bytes() if tracks is not None else None,
+        timings=timings.to_dict(),
+        fallbacks=timings.fallbacks,
+    )
+
+
+def log_timings(timings: StageTimings, duration: float) -> None:
+    """Print one line with the time spent per stage (ANALYSIS_LOG_TIMINGS)."""
+    if settings.analysis_log_timings:
+        print(f"⏱️  Analyzed {duration:.1f}s of audio in {timings.total:.2f}s: {timings.summary()}")
+
+
+def result_to_record(result: AnalysisResult) -> Dict[str, Dict[str, Any]]:
+    """Convert an AnalysisResult into the JSON columns stored per analysis."""
+    record = {
+        name: score.model_dump() if score is not None else None
+        for name, score in result.scores.items()
+    }
+    record["features"] = result.features.model_dump()
+    record["fallbacks"] = list(result.fallbacks or [])
+    return record
+
+
+def init_worker(progress_queue: Any, prewarm: bool) -> None:
+    """
+    Process-pool initializer.
+
+    Connects the worker to the executor's progress queue (inherited at
+    spawn time), maps the scoring reference norms and optionally warms up
+    the DSP stack.
+    """
+    from app.services.norms import get_reference_norms
+
+    set_progress_sink(progress_queue.put)
+    get_reference_norms()
+    if prewarm:
+        warm_up_worker()
+
+
+def warm_up_worker() -> None:
+    """
+    Import the DSP libraries and run every extractor on a short synthetic
+    take so numba kernels are compiled (or loaded from the on-disk cache)
+    before the first job.
+    """
+    import os
+
+    from app.services.warmup import warm_up
+
+    warm_up(f"Analysis worker {os.getpid()}", reports=False)
+
+
+def ping() -> bool:
+    """No-op job used to force worker processes to start."""
+    return True
@@ -0,0 +1,302 @@
+"""
+Pitch Tracking
+
+Interchangeable F0 trackers, selected per deployment with
+ANALYSIS_PITCH_BACKEND to trade accuracy for throughput:
+
+- praat: Praat's "To Pitch" (autocorrelation with a Viterbi path);
+  jitter and shimmer come from its glottal-pulse PointProcess
+- pyin: librosa's probabilistic YIN (HMM-smoothed pitch and voicing)
+- yin: vectorized numpy YIN, one batched FFT per block of frames;
+  fastest, but without path tracking octave jumps are not corrected
+
+Every backend returns a PitchTrack (frame times and F0, NaN where
+unvoiced) from which F0 mean and range are derived; the cepstral
+measures and the F0 feature track read the same frames. For the non-Praat
+backends jitter and shimmer are frame-level approximations (perturbation
+of the per-frame period and peak amplitude against their neighbours), not
+cycle-to-cycle measures, and Praat's pitch analysis is never run.
+
+pyin and yin run on a copy resampled to PITCH_SAMPLE_RATE with Praat's
+default time step (0.75 / pitch floor), so tracks from all backends have
+the same frame density.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.decoder import resample
+
+
+# Sample rate the numpy backends analyze at (covers 1 kHz F0 with margin)
+PITCH_SAMPLE_RATE = 16000
+
+# YIN: first dip of the cumulative mean normalized difference below this
+# is the period; frames without one are unvoiced
+YIN_THRESHOLD = 0.15
+
+# Frames whose peak is below this fraction of the buffer's peak are
+# unvoiced (Praat's default silence threshold)
+PITCH_SILENCE_THRESHOLD = 0.03
+
+# Frames processed per FFT batch (bounds memory on long recordings)
+YIN_BATCH_FRAMES = 2048
+
+
+@dataclass
+class PitchTrack:
+    """Frame-level F0 (Hz, NaN where unvoiced) at the given frame centers."""
+    times: np.ndarray
+    f0: np.ndarray
+    time_step: float
+
+    @property
+    def voiced(self) -> np.ndarray:
+        return np.isfinite(self.f0)
+
+    def f0_mean(self, keep: Optional[np.ndarray] = None) -> Optional[float]:
+        values = self._voiced_f0(keep)
+        return float(values.mean()) if len(values) else None
+
+    def f0_range(self, keep: Optional[np.ndarray] = None) -> Optional[Tuple[float, float]]:
+        values = self._voiced_f0(keep)
+        return (float(values.min()), float(values.max())) if len(values) else None
+
+    def jitter(self, keep: Optional[np.ndarray] = None) -> Tuple[Optional[float], int]:
+        """Frame-level period perturbation (fraction) and the frames it covers."""
+        return relative_perturbation(1.0 / self._masked_f0(keep))
+
+    def shimmer(self, audio: np.ndarray, sr: int, keep: Optional[np.ndarray] = None) -> Tuple[Optional[float], int]:
+        """Frame-level peak-amplitude perturbation (fraction) and the frames it covers."""
+        f0 = self._masked_f0(keep)
+        return relative_perturbation(frame_peaks(audio, sr, self.times, f0))
+
+    def _masked_f0(self, keep: Optional[np.ndarray]) -> np.ndarray:
+        return self.f0 if keep is None else np.where(keep, self.f0, np.nan)
+
+    def _voiced_f0(self, keep: Optional[np.ndarray]) -> np.ndarray:
+        f0 = self._masked_f0(keep)
+        return f0[np.isfinite(f0)]
+
+
+def relative_perturbation(values: np.ndarray) -> Tuple[Optional[float], int]:
+    """
+    Mean absolute deviation of each value from the average of itself and
+    its two neighbours, relative to the mean value (Praat's RAP, applied to
+    frames instead of glottal cycles). NaN breaks the sequence. Returns
+    (perturbation or None, number of frames with both neighbours defined).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 3:
+        return None, 0
+    local = (values[:-2] + values[1:-1] + values[2:]) / 3.0
+    deviation = np.abs(values[1:-1] - local)
+    defined = np.isfinite(deviation)
+    count = int(defined.sum())
+    if count == 0:
+        return None, 0
+    return float(deviation[defined].mean() / values[1:-1][defined].mean()), count
+
+
+def frame_peaks(audio: np.ndarray, sr: int, times: np.ndarray, f0: np.ndarray) -> np.ndarray:
+    """Peak absolute amplitude within one period around each voiced frame center."""
+    peaks = np.full(len(times), np.nan)
+    voiced = np.flatnonzero(np.isfinite(f0))
+    if len(voiced) == 0:
+        return peaks
+    half = np.round(0.5 * sr / f0[voiced]).astype(np.int64)
+    width = int(2 * half.max()) + 1
+    padded = np.pad(np.abs(np.asarray(audio, dtype=np.float32)), width)
+    centers = np.round(times[voiced] * sr).astype(np.int64) + width
+    offsets = np.arange(width) - width // 2
+    inside = np.abs(offsets)[None, :] <= half[:, None]
+    values = padded[np.clip(centers[:, None] + offsets, 0, len(padded) - 1)]
+    peaks[voiced] = np.where(inside, values, 0.0).max(axis=1)
+    return peaks
+
+
+def default_time_step(min_pitch: float) -> float:
+    """Praat's default pitch time step for the given floor."""
+    return 0.75 / min_pitch
+
+
+class PitchBackend(ABC):
+    """F0 tracker interface: a mono buffer in, a PitchTrack out."""
+
+    name = ""
+
+    @abstractmethod
+    def track(self, audio: np.ndarray, sr: int, min_pitch: float, max_pitch: float) -> PitchTrack:
+        """F0 of every frame of audio, searched between min_pitch and max_pitch Hz."""
+
+
+class PraatPitch(PitchBackend):
+    """Praat's autocorrelation pitch with Viterbi path finding."""
+
+    name = "praat"
+
+    def track(self, audio: np.ndarray, sr: int, min_pitch: float, max_pitch: float) -> PitchTrack:
+        import parselmouth
+        from parselmouth.praat import call
+
+        sound = parselmouth.Sound(audio, sampling_frequency=sr)
+        return praat_pitch_track(call(sound, "To Pitch", 0.0, min_pitch, max_pitch))
+
+
+class PyinPitch(PitchBackend):
+    """librosa pYIN: YIN candidates with an HMM over pitch and voicing."""
+
+    name = "pyin"
+
+    def track(self, audio: np.ndarray, sr: int, min_pitch: float, max_pitch: float) -> PitchTrack:
+        import librosa
+
+        x = _at_pitch_rate(audio, sr)
+        time_step = default_time_step(min_pitch)
+        hop_length = int(round(time_step * PITCH_SAMPLE_RATE))
+        # Two windows of two periods at the floor, rounded up to a power of two
+        frame_length = 1 << int(np.ceil(np.log2(4 * PITCH_SAMPLE_RATE / min_pitch)))
+        f0, _, _ = librosa.pyin(
+            x,
+            fmin=min_pitch,
+            fmax=max_pitch,
+            sr=PITCH_SAMPLE_RATE,
+            frame_length=frame_length,
+            hop_length=hop_length,
+        )
+        # pYIN has no level gate; apply the silence threshold the other
+        # backends use to frames of one window length
+        padded = np.pad(np.abs(x), frame_length // 2)
+        peaks = librosa.util.frame(padded, frame_length=frame_length, hop_length=hop_length).max(axis=0)
+        silent = peaks[:len(f0)] < PITCH_SILENCE_THRESHOLD * float(np.abs(x).max(initial=0.0))
+        f0 = np.where(silent, np.nan, f0)
+
+        times = np.arange(len(f0)) * hop_length / PITCH_SAMPLE_RATE
+        return PitchTrack(
+            times=times,
+            f0=np.asarray(f0, dtype=np.float64),
+            time_step=hop_length / PITCH_SAMPLE_RATE,
+        )
+
+
+class YinPitch(PitchBackend):
+    """Vectorized numpy YIN (de Cheveigne & Kawahara, 2002)."""
+
+    name = "yin"
+
+    def track(self, audio: np.ndarray, sr: int, min_pitch: float, max_pitch: float) -> PitchTrack:
+        x = _at_pitch_rate(audio, sr)
+        return yin_track(x, PITCH_SAMPLE_RATE, min_pitch, max_pitch, default_time_step(min_pitch))
+
+
+def yin_track(
+    audio: np.ndarray,
+    sr: int,
+    min_pitch: float,
+    max_pitch: float,
+    time_step: float,
+    threshold: float = YIN_THRESHOLD,
+) -> PitchTrack:
+    """
+    YIN over centered frames every time_step seconds.
+
+    The difference function of a whole batch of frames comes from one FFT
+    cross-correlation plus cumulative energy sums; the period is the first
+    local minimum of the normalized difference below `threshold`, refined
+    by parabolic interpolation.
+    """
+    from scipy import fft
+
+    x = np.asarray(audio, dtype=np.float32)
+    hop = max(1, int(round(time_step * sr)))
+    tau_min = max(2, int(np.floor(sr / max_pitch)))
+    tau_max = int(np.ceil(sr / min_pitch))
+    window = tau_max  # integration window: one period at the floor
+    frame_length = window + tau_max + 1
+    n_fft = fft.next_fast_len(frame_length + window)
+
+    n_frames = 1 + len(x) // hop
+    # The integration window is centered on the frame time; the lagged copy
+    # extends up to tau_max samples after it
+    padded = np.pad(x, (window // 2, frame_length))
+    frames_view = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop][:n_frames]
+    silence = PITCH_SILENCE_THRESHOLD * float(np.abs(x).max()) if len(x) else 0.0
+
+    taus = np.arange(tau_max + 1)
+    f0 = np.full(n_frames, np.nan)
+    for start in range(0, n_frames, YIN_BATCH_FRAMES):
+        frames = frames_view[start:start + YIN_BATCH_FRAMES]
+
+        # r(tau) = sum_{j < window} x[j] x[j + tau]
+        head = fft.rfft(frames[:, :window], n=n_fft, axis=1)
+        full = fft.rfft(frames, n=n_fft, axis=1)
+        correlation = fft.irfft(np.conj(head) * full, n=n_fft, axis=1)[:, :tau_max + 1]
+
+        energy = np.concatenate(
+            (np.zeros((len(frames), 1), dtype=np.float32), np.cumsum(frames.astype(np.float32) ** 2, axis=1)),
+            axis=1,
+        )
+        difference = energy[:, [window]] + (energy[:, taus + window] - energy[:, taus]) - 2.0 * correlation
+        difference = np.maximum(difference, 0.0)
+
+        # Cumulative mean normalized difference, 1 at tau = 0
+        running = np.cumsum(difference[:, 1:], axis=1)
+        normalized = np.ones_like(difference)
+        normalized[:, 1:] = np.where(running > 0, difference[:, 1:] * taus[1:] / np.maximum(running, 1e-12), 1.0)
+
+        # A dip is a local minimum below the threshold; at the lower edge of
+        # the search range the curve must already be falling, otherwise it
+        # is low-frequency energy rising from tau = 0
+        search = normalized[:, tau_min:tau_max]
+        dip = (
+            (search < threshold)
+            & (search <= normalized[:, tau_min + 1:tau_max + 1])
+            & (search <= normalized[:, tau_min - 1:tau_max - 1])
+        )
+        found = dip.any(axis=1) & (np.abs(frames[:, :window]).max(axis=1) >= silence)
+        tau = tau_min + np.argmax(dip, axis=1)
+
+        # Parabolic interpolation of the dip
+        rows = np.arange(len(frames))
+        left = normalized[rows, tau - 1]
+        center = normalized[rows, tau]
+        right = normalized[rows, np.minimum(tau + 1, tau_max)]
+        curvature = left - 2.0 * center + right
+        shift = np.where(curvature > 0, 0.5 * (left - right) / np.where(curvature > 0, curvature, 1.0), 0.0)
+        period = tau + np.clip(shift, -1.0, 1.0)
+
+        f0[start:start + len(frames)] = np.where(found, sr / period, np.nan)
+
+    times = np.arange(n_frames) * hop / sr
+    return PitchTrack(times=times, f0=f0, time_step=hop / sr)
+
+
+def _at_pitch_rate(audio: np.ndarray, sr: int) -> np.ndarray:
+    if sr == PITCH_SAMPLE_RATE:
+        return np.asarray(audio, dtype=np.float32)
+    return resample(audio, sr, PITCH_SAMPLE_RATE)
+
+
+def praat_pitch_track(pitch) -> PitchTrack:
+    """PitchTrack view of a Praat Pitch object."""
+    f0 = pitch.selected_array["frequency"].astype(np.float64)
+    f0[f0 <= 0] = np.nan
+    return PitchTrack(times=pitch.xs(), f0=f0, time_step=pitch.time_step)
+
+
+PITCH_BACKENDS: Dict[str, PitchBackend] = {
+    backend.name: backend for backend in (PraatPitch(), PyinPitch(), YinPitch())
+}
+
+
+def get_pitch_backend(name: str) -> PitchBackend:
+    """Pitch backend by name ("praat", "pyin" or "yin")."""
+    try:
+        return PITCH_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown pitch backend {name!r} (expected one of: {', '.join(PITCH_BACKENDS)})"
+        ) from None
@@ -0,0 +1,137 @@
+"""
+Praat Analysis Context
+
+Builds the parselmouth Sound once per request and caches the Praat
+objects derived from it (Pitch, PointProcess, Harmonicity, Formant) so
+the harmonic, formant and pitch extractors share a single analysis.
+
+The F0 track every extractor reads (pitch_track) comes from the
+configured pitch backend; with the default "praat" backend it is a view
+of the cached Pitch object.
+
+When the buffer is a concatenation of voiced segments, the join points are
+passed as boundaries (as for SpectralContext) and segments() gives the
+time span of each piece, so queries can be kept from crossing a splice.
+"""
+
+import numpy as np
+from typing import Any, Optional
+
+from app.config import settings
+from app.models.schemas import AudioType
+
+
+# "To Harmonicity (cc)": time step (s), pitch floor (Hz), silence threshold,
+# periods per window
+HARMONICITY_SETTINGS = (0.01, 75, 0.1, 1.0)
+
+# Seconds of audio on either side of its centre a Harmonicity frame reads:
+# its window plus the longest lag (one period at the pitch floor)
+HARMONICITY_REACH = (HARMONICITY_SETTINGS[3] + 1) / HARMONICITY_SETTINGS[1]
+
+
+def pitch_range(audio_type: AudioType) -> tuple:
+    """Pitch floor/ceiling in Hz for the given audio type."""
+    if audio_type == AudioType.SPOKEN:
+        return 75, 500
+    return 50, 1000
+
+
+class PraatContext:
+    """Lazily computed, cached Praat objects for one audio buffer."""
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        audio_type: AudioType,
+        pitch_backend: Optional[str] = None,
+        boundaries: Optional[np.ndarray] = None,
+    ):
+        self.audio = audio
+        self.sr = sr
+        self.audio_type = audio_type
+        self.min_pitch, self.max_pitch = pitch_range(audio_type)
+        self.pitch_backend = pitch_backend or settings.analysis_pitch_backend
+        self.boundaries = np.asarray(boundaries if boundaries is not None else [], dtype=np.int64)
+        self._sound: Optional[Any] = None
+        self._pitch: Optional[Any] = None
+        self._pitch_track: Optional[Any] = None
+        self._point_process: Optional[Any] = None
+        self._harmonicity: Optional[Any] = None
+        self._formant: Optional[Any] = None
+        self._cepstral: Optional[Any] = None
+
+    @property
+    def sound(self):
+        """parselmouth.Sound built once from the numpy buffer."""
+        if self._sound is None:
+            import parselmouth
+
+            self._sound = parselmouth.Sound(self.audio, sampling_frequency=self.sr)
+        return self._sound
+
+    @property
+    def pitch(self):
+        """Praat Pitch object (autocorrelation method)."""
+        if self._pitch is None:
+            from parselmouth.praat import call
+
+            self._pitch = call(self.sound, "To Pitch", 0.0, self.min_pitch, self.max_pitch)
+        return self._pitch
+
+    @property
+    def pitch_track(self):
+        """Frame-level F0 (PitchTrack) from the configured pitch backend."""
+        if self._pitch_track is None:
+            from app.services.pitch import get_pitch_backend, praat_pitch_track
+
+            if self.pitch_backend == "praat":
+                self._pitch_track = praat_pitch_track(self.pitch)
+            else:
+                backend = get_pitch_backend(self.pitch_backend)
+                self._pitch_track = backend.track(self.audio, self.sr, self.min_pitch, self.max_pitch)
+        return self._pitch_track
+
+    @property
+    def point_process(self):
+        """Glottal pulses derived from the cached Pitch, not a second periodicity search."""
+        if self._point_process is None:
+            from parselmouth.praat import call
+
+            self._point_process = call([self.sound, self.pitch], "To PointProcess (cc)")
+        return self._point_process
+
+    @property
+    def harmonicity(self):
+        """Praat Harmonicity object (cross-correlation method)."""
+        if self._harmonicity is None:
+            from parselmouth.praat import call
+
+            self._harmonicity = call(self.sound, "To Harmonicity (cc)", *HARMONICITY_SETTINGS)
+        return self._harmonicity
+
+    @property
+    def formant(self):
+        """Praat Formant object (Burg method, 5 formants up to 5.5 kHz)."""
+        if self._formant is None:
+            from parselmouth.praat import call
+
+            self._formant = call(self.sound, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
+        return self._formant
+
+    @property
+    def cepstral(self):
+        """CPPS and harmonic levels at the voiced frames of the cached Pitch."""
+        if self._cepstral is None:
+            from app.services.cepstral import praat_cepstral_frames
+
+            self._cepstral = praat_cepstral_frames(self)
+        return self._cepstral
+
+    def segments(self) -> Optional[np.ndarray]:
+        """(tmin, tmax) seconds of every spliced segment; None if there are no joins."""
+        if not self.boundaries.size:
+            return None
+        edges = np.concatenate(([0], self.boundaries, [len(self.audio)])) / self.sr
+        return np.stack([edges[:-1], edges[1:]], axis=1)
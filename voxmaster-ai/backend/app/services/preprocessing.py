@@ -2,18 +2,23 @@
 Audio Preprocessing Service
 
 Handles:
-- Resampling to target rate
+- Resampling to target rate (44.1 kHz for analysis)
 - Loudness normalization
 - Noise reduction
 - VAD-based silence trimming
 - Vocal isolation (for sung audio with accompaniment)
+
+Each step's wall-clock time is recorded in PreprocessedAudio.timings.
 """
 
 import numpy as np
-from typing import Dict, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, Any, Tuple, Optional
+from dataclasses import dataclass, field
 
 from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE, AudioSource, decode_audio
+from app.services.spectral import SpectralContext
+from app.services.timing import StageTimings
 
 
 @dataclass
@@ -22,14 +27,31 @@ class PreprocessedAudio:
     audio: np.ndarray
     sample_rate: int
     duration: float
-    voiced_segments: list
+    voiced_segments: np.ndarray  # (n, 2) float32 [start_time, end_time] rows
     audio_type: AudioType
+    spectral: Optional[SpectralContext] = None
+    timings: StageTimings = field(default_factory=StageTimings)
 
 
 async def preprocess_audio(
     file_path: str,
     audio_type: AudioType,
-    target_sr: int = 16000,
+    target_sr: int = ANALYSIS_SAMPLE_RATE,
+) -> PreprocessedAudio:
+    """
+    Preprocess audio file for analysis.
+    
+    Runs synchronously on the calling thread; routers should submit the
+    whole pipeline to the analysis executor instead of awaiting this.
+    See preprocess_audio_sync for the processing steps.
+    """
+    return preprocess_audio_sync(file_path, audio_type, target_sr)
+
+
+def preprocess_audio_sync(
+    file_path: str,
+    audio_type: AudioType,
+    target_sr: int = ANALYSIS_SAMPLE_RATE,
 ) -> PreprocessedAudio:
     """
     Preprocess audio file for analysis.
@@ -39,8 +61,8 @@ async def preprocess_audio(
     2. Resample to target sample rate
     3. Convert to mono
     4. Apply loudness normalization
-    5. Apply light noise reduction
-    6. Detect voiced segments via VAD
+    5. Detect voiced segments via VAD
+    6. Apply light noise reduction (profile from the non-voiced frames)
     7. For sung audio: run vocal isolation if accompaniment detected
     
     Args:
@@ -51,44 +73,70 @@ async def preprocess_audio(
     Returns:
         PreprocessedAudio object with processed audio and metadata
     """
+    # Load audio
+    audio, sr = load_audio(file_path, target_sr)
+    
+    return preprocess_signal(audio, sr, audio_type)
+
+
+def load_audio(
+    source: AudioSource,
+    target_sr: int = ANALYSIS_SAMPLE_RATE,
+    suffix: str = "",
+) -> Tuple[np.ndarray, int]:
+    """Decode a file path or in-memory upload to mono at the target sample rate."""
     try:
-        import librosa
-        
-        # Load audio
-        audio, sr = librosa.load(file_path, sr=target_sr, mono=True)
-        
-        # Loudness normalization (target -23 LUFS approximately)
-        audio = normalize_loudness(audio)
-        
-        # Light noise reduction
-        audio = reduce_noise(audio, sr)
-        
-        # Voice Activity Detection
-        voiced_segments = detect_voiced_segments(audio, sr)
-        
-        # For sung audio, check if vocal isolation is needed
-        if audio_type == AudioType.SUNG:
-            audio = isolate_vocals_if_needed(audio, sr)
-        
-        duration = len(audio) / sr
-        
-        return PreprocessedAudio(
-            audio=audio,
-            sample_rate=sr,
-            duration=duration,
-            voiced_segments=voiced_segments,
-            audio_type=audio_type,
-        )
+        return decode_audio(source, target_sr, suffix)
         
     except ImportError:
         # Fallback for when librosa is not installed
-        return PreprocessedAudio(
-            audio=np.zeros(16000),
-            sample_rate=16000,
-            duration=1.0,
-            voiced_segments=[(0.0, 1.0)],
-            audio_type=audio_type,
-        )
+        return np.zeros(target_sr), target_sr
+
+
+def preprocess_signal(
+    audio: np.ndarray,
+    sr: int,
+    audio_type: AudioType,
+    denoise: bool = True,
+) -> PreprocessedAudio:
+    """
+    Preprocess an already decoded mono signal (steps 4-7 of preprocess_audio_sync).
+    
+    The time spent in each step is recorded in the result's timings.
+    """
+    timings = StageTimings()
+    
+    # Loudness normalization (target -23 LUFS approximately)
+    with timings.stage("normalize"):
+        audio = normalize_loudness(audio)
+    
+    # Shared spectrogram context for VAD and the downstream extractors
+    spectral = SpectralContext(audio, sr)
+    
+    # Voice Activity Detection
+    with timings.stage("vad"):
+        voiced_segments = detect_voiced_segments(audio, sr, spectral=spectral)
+    
+    # Light noise reduction, profiled on the frames VAD left out
+    if denoise:
+        with timings.stage("denoise"):
+            audio, spectral = reduce_noise(audio, sr, voiced_segments, spectral)
+    
+    # For sung audio, check if vocal isolation is needed
+    if audio_type == AudioType.SUNG:
+        audio, spectral = isolate_vocals_if_needed(audio, sr, spectral, timings)
+    
+    duration = len(audio) / sr
+    
+    return PreprocessedAudio(
+        audio=audio,
+        sample_rate=sr,
+        duration=duration,
+        voiced_segments=voiced_segments,
+        audio_type=audio_type,
+        spectral=spectral,
+        timings=timings,
+    )
 
 
 def normalize_loudness(audio: np.ndarray, target_db: float = -23.0) -> np.ndarray:
@@ -101,65 +149,205 @@ def normalize_loudness(audio: np.ndarray, target_db: float = -23.0) -> np.ndarra
     return np.clip(audio, -1.0, 1.0)
 
 
-def reduce_noise(audio: np.ndarray, sr: int) -> np.ndarray:
-    """Apply light spectral gating for noise reduction."""
-    # In production, use noisereduce or similar library
-    # For now, return audio unchanged
-    return audio
+def reduce_noise(
+    audio: np.ndarray,
+    sr: int,
+    voiced_segments: np.ndarray,
+    spectral: Optional[SpectralContext] = None,
+) -> Tuple[np.ndarray, SpectralContext]:
+    """
+    Apply light spectral gating for noise reduction.
+    
+    The noise profile comes from the frames outside the voiced segments,
+    read from the spectral context's cached magnitude. Returns the
+    denoised audio and a spectral context holding its gated spectrogram.
+    When there is too little non-voiced audio for a profile (or scipy is
+    missing) the input is returned unchanged.
+    """
+    from app.services.denoise import NoiseProfile, noise_frames, spectral_gate
+    
+    if spectral is None:
+        spectral = SpectralContext(audio, sr)
+    
+    try:
+        magnitude = spectral.magnitude()
+        noise = noise_frames(magnitude.shape[1], spectral.hop_length, sr, voiced_segments)
+        profile = NoiseProfile.from_magnitude(magnitude[:, noise])
+        if profile is None:
+            return audio, spectral
+        
+        denoised, gated = spectral_gate(audio, sr, profile, spectral.n_fft, spectral.hop_length)
+        
+    except ImportError:
+        return audio, spectral
+    
+    return denoised, SpectralContext(
+        denoised, sr, spectral.n_fft, spectral.hop_length, magnitude=gated
+    )
 
 
 def detect_voiced_segments(
     audio: np.ndarray,
     sr: int,
-    threshold: float = 0.02,
-) -> list:
+    margin_db: float = 10.0,
+    min_threshold_db: float = -60.0,
+    hangover: float = 0.2,
+    min_duration: float = 0.1,
+    spectral: Optional[SpectralContext] = None,
+    threshold_db: Optional[float] = None,
+) -> np.ndarray:
     """
     Detect voiced segments using energy-based VAD.
     
-    Returns list of (start_time, end_time) tuples.
+    The threshold adapts to the recording: it sits margin_db above the
+    noise floor (10th percentile of frame energy) and never below
+    min_threshold_db. When the speech level (95th percentile) is within
+    margin_db of the floor there is no silence to separate and the
+    whole take counts as voiced. Segments are found by run-length encoding the
+    voiced mask, then smoothed: runs shorter than `min_duration` seconds
+    are dropped, and each remaining segment is held open for `hangover`
+    seconds (bridging short dips).
+    
+    Frame energy is read from the shared spectral context when one is
+    given, so the STFT is not recomputed for VAD. threshold_db overrides
+    the adaptive estimate (chunked analysis passes a file-wide one).
+    
+    Returns an (n, 2) float32 array of [start_time, end_time] rows.
     """
+    duration = len(audio) / sr
+    whole = np.array([[0.0, duration]], dtype=np.float32)
+    
     try:
-        import librosa
-        
-        # Compute RMS energy
-        rms = librosa.feature.rms(y=audio, frame_length=2048, hop_length=512)[0]
-        
-        # Find segments above threshold
-        voiced = rms > threshold
-        
-        # Convert frames to time
-        segments = []
-        in_voiced = False
-        start_frame = 0
-        
-        for i, is_voiced in enumerate(voiced):
-            if is_voiced and not in_voiced:
-                start_frame = i
-                in_voiced = True
-            elif not is_voiced and in_voiced:
-                start_time = librosa.frames_to_time(start_frame, sr=sr, hop_length=512)
-                end_time = librosa.frames_to_time(i, sr=sr, hop_length=512)
-                segments.append((start_time, end_time))
-                in_voiced = False
-        
-        # Handle final segment
-        if in_voiced:
-            start_time = librosa.frames_to_time(start_frame, sr=sr, hop_length=512)
-            end_time = len(audio) / sr
-            segments.append((start_time, end_time))
-        
-        return segments if segments else [(0.0, len(audio) / sr)]
-        
+        if spectral is None:
+            spectral = SpectralContext(audio, sr, n_fft=2048, hop_length=512)
+        rms = spectral.rms()
     except ImportError:
-        return [(0.0, len(audio) / sr)]
+        return whole
+    
+    if rms.size == 0:
+        return whole
+    
+    # Adaptive threshold from the frame energy distribution
+    rms_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    if threshold_db is None:
+        floor_db, speech_db = np.percentile(rms_db, [10, 95])
+        threshold_db = vad_threshold_db(floor_db, speech_db, margin_db, min_threshold_db)
+    voiced = rms_db > threshold_db
+    
+    # Run-length encode the mask: +1 marks a run start, -1 a run end
+    edges = np.diff(voiced.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size == 0:
+        return whole
+    
+    # Drop micro-segments (clicks, short bursts) before the hangover
+    # stretches every run past min_duration
+    frames_per_second = sr / spectral.hop_length
+    keep = (ends - starts) >= min_duration * frames_per_second
+    if not keep.any():
+        return whole
+    starts, ends = starts[keep], ends[keep]
+    
+    # Hangover: hold each segment open, merging any that now touch
+    ends = np.minimum(ends + int(round(hangover * frames_per_second)), voiced.size)
+    new_run = np.concatenate(([True], starts[1:] > ends[:-1]))
+    last_of_run = np.concatenate((new_run[1:], [True]))
+    starts, ends = starts[new_run], ends[last_of_run]
+    
+    segments = spectral.frames_to_time(np.stack([starts, ends], axis=1))
+    np.minimum(segments, duration, out=segments)
+    return segments.astype(np.float32)
 
 
-def isolate_vocals_if_needed(audio: np.ndarray, sr: int) -> np.ndarray:
+def vad_threshold_db(
+    floor_db: float,
+    speech_db: float,
+    margin_db: float = 10.0,
+    min_threshold_db: float = -60.0,
+) -> float:
+    """Frame-energy threshold (dB) from the noise floor and speech level."""
+    if speech_db - floor_db < margin_db:
+        # No distinguishable noise floor: the take is voiced throughout
+        threshold_db = floor_db - margin_db
+    else:
+        threshold_db = floor_db + margin_db
+    return max(threshold_db, min_threshold_db)
+
+
+def concatenate_segments(
+    audio: np.ndarray,
+    sr: int,
+    segments: np.ndarray,
+    fade: float = 0.005,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splice the given (start, end) segments into one contiguous buffer.
+    
+    Each segment gets a short raised-cosine fade in and out so the joins
+    do not click. Returns the spliced audio and the sample offsets of the
+    joins (for SpectralContext boundaries). If the segments already cover
+    the whole buffer it is returned unchanged.
+    """
+    bounds = np.round(np.asarray(segments, dtype=np.float64).reshape(-1, 2) * sr).astype(np.int64)
+    bounds = np.clip(bounds, 0, len(audio))
+    bounds = bounds[bounds[:, 1] > bounds[:, 0]]
+    if len(bounds) == 0 or (len(bounds) == 1 and bounds[0, 0] == 0 and bounds[0, 1] == len(audio)):
+        return audio, np.empty(0, dtype=np.int64)
+    
+    lengths = bounds[:, 1] - bounds[:, 0]
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    
+    # Gather every segment sample with a single fancy index
+    index = np.repeat(bounds[:, 0] - offsets[:-1], lengths) + np.arange(offsets[-1])
+    spliced = audio[index]
+    
+    # Raised-cosine fades at every segment edge
+    n_fade = int(fade * sr)
+    if n_fade > 0:
+        ramp = 0.5 - 0.5 * np.cos(np.pi * (np.arange(n_fade) + 0.5) / n_fade)
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            n = min(n_fade, (end - start) // 2)
+            spliced[start:start + n] *= ramp[:n]
+            spliced[end - n:end] *= ramp[:n][::-1]
+    
+    return spliced, offsets[1:-1]
+
+
+def isolate_vocals_if_needed(
+    audio: np.ndarray,
+    sr: int,
+    spectral: Optional[SpectralContext] = None,
+    timings: Optional[StageTimings] = None,
+) -> Tuple[np.ndarray, SpectralContext]:
     """
     Run vocal isolation if accompaniment is detected.
     
-    In production, use Spleeter or Demucs for source separation.
+    A cheap detector on a decimated copy of the signal decides first, so
+    a cappella takes skip the separation entirely (see
+    app.services.separation). Returns the (possibly separated) audio and
+    a spectral context holding its spectrogram. Detection and separation
+    are timed as the "accompaniment" and "separation" stages.
     """
-    # For now, return audio unchanged
-    # TODO: Integrate Spleeter or Demucs
-    return audio
+    from app.services.separation import detect_accompaniment, separate_vocals
+    
+    if spectral is None:
+        spectral = SpectralContext(audio, sr)
+    if timings is None:
+        timings = StageTimings()
+    
+    try:
+        with timings.stage("accompaniment"):
+            accompaniment = detect_accompaniment(audio, sr)
+        if not accompaniment.detected:
+            return audio, spectral
+        
+        with timings.stage("separation"):
+            separated, magnitude = separate_vocals(audio, sr, spectral.n_fft, spectral.hop_length)
+        
+    except ImportError:
+        return audio, spectral
+    
+    return separated, SpectralContext(
+        separated, sr, spectral.n_fft, spectral.hop_length, magnitude=magnitude
+    )
@@ -0,0 +1,159 @@
+"""
+Bulk Re-scoring
+
+Recomputes the stored scores (timbre, weight, placement, sweet_spot) of
+every analysis from its stored features, e.g. after the scoring weights
+change or the reference norms are rebuilt. Audio is never decoded:
+
+- features stream out of the analyses table through a server-side
+  cursor, oldest first, in batches
+- each batch is scored in one vectorized pass per audio type
+- the new scores go back with one COPY + UPDATE per batch
+
+Only the score groups an analysis already has are rewritten, so analyses
+made with a `features=` subset keep their empty groups. After each
+committed batch the (created_at, id) of its last row is written to a
+checkpoint file, and an interrupted run resumes after it; the checkpoint
+is removed once the pass completes.
+
+Cache hits are re-scored on the fly, so running servers need no restart
+for stored analyses; run from the backend directory:
+
+    python -m app.services.rescoring
+    python -m app.services.rescoring --restart   # ignore the checkpoint
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.database import db
+from app.services.norms import get_reference_norms
+from app.services.scoring import feature_columns, row, score_batch
+
+
+DEFAULT_CHECKPOINT = "storage/rescoring/checkpoint.json"
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Write the checkpoint atomically, so a crash never leaves half of one."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def rescore_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    New scores for one batch of iter_analysis_features rows, as
+    update_analysis_scores updates. Rows without features, stored scores
+    or a known audio type are left out.
+    """
+    updates = []
+    for audio_type in AudioType:
+        rows = [
+            r for r in batch
+            if r.get("features") and r.get("scores") and r.get("audio_type") == audio_type.value
+        ]
+        if not rows:
+            continue
+        scores = score_batch(feature_columns(r["features"] for r in rows), audio_type)
+        # A group whose inputs are missing scores NaN; keep its stored value
+        finite = {
+            group: np.logical_and.reduce([np.isfinite(values) for values in columns.values()])
+            for group, columns in scores.items()
+        }
+        for i, r in enumerate(rows):
+            updates.append({
+                "id": r["id"],
+                **{group: row(scores[group], i) for group in r["scores"] if group in scores and finite[group][i]},
+            })
+    return updates
+
+
+async def rescore(
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    batch_size: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Re-score every stored analysis (see module docstring), resuming from
+    checkpoint_path unless restart. Returns the run's totals.
+    """
+    norms = get_reference_norms()
+    norms_version = norms.version if norms is not None else None
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+    if checkpoint is not None and checkpoint.get("norms") != norms_version:
+        raise SystemExit(
+            f"Checkpoint {checkpoint_path} was scored against norms {checkpoint.get('norms')}, "
+            f"now {norms_version}; rerun with --restart"
+        )
+    if checkpoint is None:
+        checkpoint = {"created_at": None, "id": None, "rows": 0, "norms": norms_version}
+    else:
+        print(f"↪️  Resuming after {checkpoint['created_at']} ({checkpoint['rows']} rows already re-scored)")
+    since = datetime.fromisoformat(checkpoint["created_at"]) if checkpoint["created_at"] else None
+
+    print(f"📐 Reference norms: {norms_version or 'not built (fixed ranges)'}")
+    read = updated = 0
+    start = time.perf_counter()
+    await db.connect()
+    try:
+        async for batch in db.iter_analysis_features(
+            since=since, batch_size=batch_size, after_id=checkpoint["id"]
+        ):
+            updated += await db.update_analysis_scores(rescore_batch(batch))
+            read += len(batch)
+
+            last = batch[-1]
+            checkpoint.update(
+                created_at=last["created_at"].isoformat() if last["created_at"] else checkpoint["created_at"],
+                id=str(last["id"]),
+                rows=checkpoint["rows"] + len(batch),
+            )
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.perf_counter() - start
+            print(f"   {read} rows read, {updated} updated, {read / elapsed:.0f} rows/s")
+    finally:
+        await db.disconnect()
+
+    elapsed = time.perf_counter() - start
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    totals = {
+        "rows_read": read,
+        "rows_updated": updated,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(read / elapsed, 1) if elapsed > 0 else None,
+    }
+    print(f"✅ Re-scored {updated} of {read} analyses in {elapsed:.1f}s ({totals['rows_per_second']} rows/s)")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored analyses from their stored features")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="resume file")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the oldest analysis")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(rescore(args.checkpoint, args.restart, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
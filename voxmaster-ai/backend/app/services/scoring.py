@@ -9,7 +9,7 @@ DLM Perceptual Scoring:
 """
 
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Mapping, Optional, Union
 
 from app.models.schemas import (
     AudioType,
@@ -19,11 +19,45 @@ from app.models.schemas import (
     PlacementScores,
     SweetSpotScore,
 )
+from app.services.feature_graph import FULL_PLAN, FeaturePlan
+from app.services.norms import ReferenceNorms, get_reference_norms
+
+
+# Features the scores read, as flat float columns (NaN = missing)
+FEATURE_COLUMNS = ("spectral_centroid", "hnr", "cpp", "h1_h2", "jitter", "shimmer", "f0_mean", "f1", "f2", "f3")
+FORMANT_COLUMNS = ("f1", "f2", "f3")
+
+# Score group -> model holding one row of its columns
+SCORE_MODELS = {
+    "timbre": TimbreScores,
+    "weight": WeightScores,
+    "placement": PlacementScores,
+    "sweet_spot": SweetSpotScore,
+}
+
+Columns = Dict[str, np.ndarray]
+
+# Score points per reference standard deviation (z = +/-2 spans 0-100)
+Z_SCALE = 25.0
 
 
 async def calculate_scores(
     features: AcousticFeatures,
     audio_type: AudioType,
+    plan: FeaturePlan = FULL_PLAN,
+) -> Dict[str, Any]:
+    """
+    Calculate perceptual scores from acoustic features.
+    
+    Async wrapper around calculate_scores_sync.
+    """
+    return calculate_scores_sync(features, audio_type, plan)
+
+
+def calculate_scores_sync(
+    features: AcousticFeatures,
+    audio_type: AudioType,
+    plan: FeaturePlan = FULL_PLAN,
 ) -> Dict[str, Any]:
     """
     Calculate perceptual scores from acoustic features.
@@ -34,29 +68,187 @@ async def calculate_scores(
     3. Apply ISO 226 equal-loudness weighting
     4. Output scores (0-100) with confidence metrics
     
+    Features are z-scored against the reference norms of their audio type
+    and voice class (see app.services.norms) where those have enough
+    data, and scaled by fixed ranges otherwise. A batch of one through
+    score_batch, so single and bulk scoring agree.
+    
     Args:
         features: Extracted acoustic features
         audio_type: SPOKEN or SUNG
+        plan: Score groups to compute (the features they read must be
+            present); groups outside the plan are None
     
     Returns:
         Dictionary with timbre, weight, placement, and sweet_spot scores
     """
+    scores = score_batch(single_columns(features), audio_type, plan)
+    return score_models(scores, 0)
+
+
+def score_batch(
+    features: Union[Mapping[str, Any], np.ndarray],
+    audio_type: AudioType,
+    plan: FeaturePlan = FULL_PLAN,
+    norms: Optional[ReferenceNorms] = None,
+) -> Dict[str, Columns]:
+    """
+    Score N feature rows in one vectorized pass.
     
-    # Calculate individual score components
-    timbre = calculate_timbre_scores(features)
-    weight = calculate_weight_scores(features)
-    placement = calculate_placement_scores(features, audio_type)
-    sweet_spot = calculate_sweet_spot(timbre, weight, placement, features)
+    Args:
+        features: Column dict or structured array with the FEATURE_COLUMNS
+            fields (NaN or missing jitter/shimmer/formants take the same
+            defaults as single scoring), e.g. from feature_columns()
+        audio_type: SPOKEN or SUNG, shared by every row
+        plan: Score groups to compute
+        norms: Reference norms to z-score against (default: the ones
+            loaded at startup, if any)
     
+    Returns:
+        {group: {score name: float64 array of N}} for the groups in plan
+    """
+    columns = as_columns(features)
+    scale = Normalizer(columns, audio_type, norms)
+    scores: Dict[str, Columns] = {}
+    
+    timbre = placement = None
+    if "timbre" in plan.scores or "sweet_spot" in plan.scores:
+        timbre = timbre_columns(columns, scale)
+    if "placement" in plan.scores or "sweet_spot" in plan.scores:
+        placement = placement_columns(columns, audio_type, scale)
+    
+    if "timbre" in plan.scores:
+        scores["timbre"] = timbre
+    if "weight" in plan.scores:
+        scores["weight"] = weight_columns(columns, scale)
+    if "placement" in plan.scores:
+        scores["placement"] = placement
+    if "sweet_spot" in plan.scores:
+        scores["sweet_spot"] = sweet_spot_columns(timbre, placement, columns, scale)
+    
+    return scores
+
+
+def score_models(scores: Dict[str, Columns], index: int) -> Dict[str, Any]:
+    """Row `index` of score_batch output as score models (None for absent groups)."""
+    return {
+        group: model(**row(scores[group], index)) if group in scores else None
+        for group, model in SCORE_MODELS.items()
+    }
+
+
+def feature_columns(rows: Iterable[Union[AcousticFeatures, Mapping[str, Any]]]) -> Columns:
+    """FEATURE_COLUMNS from feature models or their stored JSON dicts."""
+    rows = list(rows)
+    columns = {name: np.full(len(rows), np.nan) for name in FEATURE_COLUMNS}
+    for i, features in enumerate(rows):
+        if isinstance(features, AcousticFeatures):
+            features = features.model_dump()
+        formants = features.get("formants") or {}
+        for name in FEATURE_COLUMNS:
+            value = formants.get(name) if name in FORMANT_COLUMNS else features.get(name)
+            if value is not None:
+                columns[name][i] = value
+    return columns
+
+
+def single_columns(features: AcousticFeatures) -> Columns:
+    """FEATURE_COLUMNS of one feature model, as length-1 columns."""
+    formants = features.formants or {}
+    return {
+        name: np.array([_or_nan(formants.get(name) if name in FORMANT_COLUMNS else getattr(features, name))])
+        for name in FEATURE_COLUMNS
+    }
+
+
+def as_columns(features: Union[Mapping[str, Any], np.ndarray]) -> Columns:
+    """Float64 columns from a column dict or a structured array."""
+    if isinstance(features, np.ndarray):
+        names = features.dtype.names or ()
+        source = {name: features[name] for name in names}
+    else:
+        source = features
+    length = len(next(iter(source.values()))) if source else 0
     return {
-        "timbre": timbre,
-        "weight": weight,
-        "placement": placement,
-        "sweet_spot": sweet_spot,
+        name: np.asarray(source[name], dtype=np.float64) if name in source else np.full(length, np.nan)
+        for name in FEATURE_COLUMNS
     }
 
 
-def calculate_timbre_scores(features: AcousticFeatures) -> TimbreScores:
+def row(columns: Columns, index: int) -> Dict[str, float]:
+    return {name: float(values[index]) for name, values in columns.items()}
+
+
+class Normalizer:
+    """
+    Feature -> 0-100 scaling for one batch.
+    
+    Each value is z-scored against the reference norms of its row's group
+    (Z_SCALE points per standard deviation around 50); features the norms
+    have too little data for fall back to the fixed reference range.
+    """
+    
+    def __init__(self, features: Columns, audio_type: AudioType, norms: Optional[ReferenceNorms] = None):
+        self.norms = norms if norms is not None else get_reference_norms()
+        self.rows = None
+        if self.norms is not None:
+            self.rows = self.norms.rows(audio_type, features["f0_mean"])
+    
+    def __call__(self, name: str, values: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+        fixed = normalize_columns(values, min_val, max_val)
+        if self.rows is None:
+            return fixed
+        mean, std = self.norms.stats(name, self.rows)
+        scaled = np.clip(50.0 + Z_SCALE * (values - mean) / std, 0, 100)
+        return np.where(np.isnan(mean), fixed, scaled)
+
+
+def calculate_timbre_scores(
+    features: AcousticFeatures,
+    audio_type: AudioType,
+) -> TimbreScores:
+    """Timbre scores of one feature set (see timbre_columns)."""
+    columns = single_columns(features)
+    return TimbreScores(**row(timbre_columns(columns, Normalizer(columns, audio_type)), 0))
+
+
+def calculate_weight_scores(
+    features: AcousticFeatures,
+    audio_type: AudioType,
+) -> WeightScores:
+    """Weight scores of one feature set (see weight_columns)."""
+    columns = single_columns(features)
+    return WeightScores(**row(weight_columns(columns, Normalizer(columns, audio_type)), 0))
+
+
+def calculate_placement_scores(
+    features: AcousticFeatures,
+    audio_type: AudioType,
+) -> PlacementScores:
+    """Placement scores of one feature set (see placement_columns)."""
+    columns = single_columns(features)
+    return PlacementScores(**row(placement_columns(columns, audio_type, Normalizer(columns, audio_type)), 0))
+
+
+def calculate_sweet_spot(
+    timbre: TimbreScores,
+    weight: Optional[WeightScores],
+    placement: PlacementScores,
+    features: AcousticFeatures,
+    audio_type: AudioType,
+) -> SweetSpotScore:
+    """Sweet Spot Score of one feature set (see sweet_spot_columns)."""
+    columns = single_columns(features)
+    sweet_spot = sweet_spot_columns(
+        {name: np.array([value]) for name, value in timbre.model_dump().items()},
+        {name: np.array([value]) for name, value in placement.model_dump().items()},
+        columns,
+        Normalizer(columns, audio_type),
+    )
+    return SweetSpotScore(**row(sweet_spot, 0))
+
+
+def timbre_columns(features: Columns, scale: Normalizer) -> Columns:
     """
     Calculate timbre scores from spectral features.
     
@@ -71,15 +263,17 @@ def calculate_timbre_scores(features: AcousticFeatures) -> TimbreScores:
     hnr_ref = {"min": 5, "max": 30}
     
     # Brightness: higher centroid = brighter
-    brightness = normalize_to_100(
-        features.spectral_centroid,
+    brightness = scale(
+        "spectral_centroid",
+        features["spectral_centroid"],
         centroid_ref["min"],
         centroid_ref["max"],
     )
     
     # Breathiness: inverse of HNR (lower HNR = more breathy)
-    breathiness = 100 - normalize_to_100(
-        features.hnr,
+    breathiness = 100 - scale(
+        "hnr",
+        features["hnr"],
         hnr_ref["min"],
         hnr_ref["max"],
     )
@@ -90,19 +284,19 @@ def calculate_timbre_scores(features: AcousticFeatures) -> TimbreScores:
     warmth = np.clip(warmth, 0, 100)
     
     # Roughness: from jitter and shimmer
-    jitter_contrib = (features.jitter or 0.5) * 10
-    shimmer_contrib = (features.shimmer or 3.0) * 3
+    jitter_contrib = _or_default(features["jitter"], 0.5) * 10
+    shimmer_contrib = _or_default(features["shimmer"], 3.0) * 3
     roughness = np.clip(jitter_contrib + shimmer_contrib, 0, 100)
     
-    return TimbreScores(
-        brightness=float(brightness),
-        breathiness=float(breathiness),
-        warmth=float(warmth),
-        roughness=float(roughness),
-    )
+    return {
+        "brightness": brightness,
+        "breathiness": breathiness,
+        "warmth": warmth,
+        "roughness": roughness,
+    }
 
 
-def calculate_weight_scores(features: AcousticFeatures) -> WeightScores:
+def weight_columns(features: Columns, scale: Normalizer) -> Columns:
     """
     Calculate vocal weight scores.
     
@@ -119,25 +313,26 @@ def calculate_weight_scores(features: AcousticFeatures) -> WeightScores:
     h1_h2_ref = {"min": -5, "max": 15}
     
     # Weight: higher CPP and lower H1-H2 = heavier
-    cpp_score = normalize_to_100(features.cpp, cpp_ref["min"], cpp_ref["max"])
-    h1_h2_score = 100 - normalize_to_100(features.h1_h2, h1_h2_ref["min"], h1_h2_ref["max"])
+    cpp_score = scale("cpp", features["cpp"], cpp_ref["min"], cpp_ref["max"])
+    h1_h2_score = 100 - scale("h1_h2", features["h1_h2"], h1_h2_ref["min"], h1_h2_ref["max"])
     
     weight = (cpp_score * 0.6 + h1_h2_score * 0.4)
     
     # Pressed/Breathy: based on H1-H2 and HNR
     # Lower H1-H2 = more pressed, higher = more breathy
-    pressed = 100 - normalize_to_100(features.h1_h2, h1_h2_ref["min"], h1_h2_ref["max"])
+    pressed = 100 - scale("h1_h2", features["h1_h2"], h1_h2_ref["min"], h1_h2_ref["max"])
     
-    return WeightScores(
-        weight=float(np.clip(weight, 0, 100)),
-        pressed=float(np.clip(pressed, 0, 100)),
-    )
+    return {
+        "weight": np.clip(weight, 0, 100),
+        "pressed": np.clip(pressed, 0, 100),
+    }
 
 
-def calculate_placement_scores(
-    features: AcousticFeatures,
+def placement_columns(
+    features: Columns,
     audio_type: AudioType,
-) -> PlacementScores:
+    scale: Normalizer,
+) -> Columns:
     """
     Calculate tone placement scores.
     
@@ -149,38 +344,53 @@ def calculate_placement_scores(
     Nasality: Anti-resonance detection
     """
     
+    inputs = placement_inputs(features)
+    
     # Forwardness: approximated from formant ratios and spectral centroid
     # Higher F2/F1 ratio and higher centroid = more forward
-    f1 = features.formants.get("f1", 500)
-    f2 = features.formants.get("f2", 1500)
-    f3 = features.formants.get("f3", 2500)
-    
-    f2_f1_ratio = f2 / f1 if f1 > 0 else 3.0
-    forwardness = normalize_to_100(f2_f1_ratio, 2.0, 4.0) * 0.5
-    forwardness += normalize_to_100(features.spectral_centroid, 1500, 3500) * 0.5
+    forwardness = scale("f2_f1_ratio", inputs["f2_f1_ratio"], 2.0, 4.0) * 0.5
+    forwardness += scale("spectral_centroid", features["spectral_centroid"], 1500, 3500) * 0.5
     
     # Ring Index: based on F3 proximity to 2.5-3.5 kHz range (singer's formant)
-    singer_formant_center = 3000
-    ring_distance = abs(f3 - singer_formant_center)
-    ring_index = 100 - normalize_to_100(ring_distance, 0, 1500)
+    ring_index = 100 - scale("ring_distance", inputs["ring_distance"], 0, 1500)
     
     # Nasality: approximated from F1-F2 spacing (narrower = more nasal)
-    f1_f2_spacing = f2 - f1
-    nasality = 100 - normalize_to_100(f1_f2_spacing, 500, 1500)
+    nasality = 100 - scale("f1_f2_spacing", inputs["f1_f2_spacing"], 500, 1500)
     
-    return PlacementScores(
-        forwardness=float(np.clip(forwardness, 0, 100)),
-        ring_index=float(np.clip(ring_index, 0, 100)),
-        nasality=float(np.clip(nasality, 0, 100)),
-    )
+    return {
+        "forwardness": np.clip(forwardness, 0, 100),
+        "ring_index": np.clip(ring_index, 0, 100),
+        "nasality": np.clip(nasality, 0, 100),
+    }
 
 
-def calculate_sweet_spot(
-    timbre: TimbreScores,
-    weight: WeightScores,
-    placement: PlacementScores,
-    features: AcousticFeatures,
-) -> SweetSpotScore:
+def placement_inputs(features: Columns, fill: bool = True) -> Columns:
+    """
+    Formant-derived quantities placement scores (and their norms) use.
+    
+    Missing formants take the extractor defaults, unless fill is False
+    (building reference norms), where the quantities stay NaN.
+    """
+    f1, f2, f3 = features["f1"], features["f2"], features["f3"]
+    if fill:
+        f1 = _fill(f1, 500)
+        f2 = _fill(f2, 1500)
+        f3 = _fill(f3, 2500)
+    
+    singer_formant_center = 3000
+    return {
+        "f2_f1_ratio": np.divide(f2, f1, out=np.full_like(f2, 3.0 if fill else np.nan), where=f1 > 0),
+        "ring_distance": np.abs(f3 - singer_formant_center),
+        "f1_f2_spacing": f2 - f1,
+    }
+
+
+def sweet_spot_columns(
+    timbre: Columns,
+    placement: Columns,
+    features: Columns,
+    scale: Normalizer,
+) -> Columns:
     """
     Calculate Sweet Spot Score with ISO 226 equal-loudness weighting.
     
@@ -191,24 +401,23 @@ def calculate_sweet_spot(
     
     # Clarity: derived from HNR and spectral clarity
     # Higher HNR = clearer
-    clarity = normalize_to_100(features.hnr, 10, 25) * 0.7
-    clarity += (100 - timbre.breathiness) * 0.3
+    clarity = scale("hnr", features["hnr"], 10, 25) * 0.7
+    clarity += (100 - timbre["breathiness"]) * 0.3
     clarity = np.clip(clarity, 0, 100)
     
     # Warmth: from timbre warmth
-    warmth = timbre.warmth
+    warmth = timbre["warmth"]
     
     # Presence: from placement forwardness and ring index
-    presence = placement.forwardness * 0.6 + placement.ring_index * 0.4
+    presence = placement["forwardness"] * 0.6 + placement["ring_index"] * 0.4
     
     # Smoothness: inverse of roughness
-    smoothness = 100 - timbre.roughness
+    smoothness = 100 - timbre["roughness"]
     
     # Harshness penalty: from excessive brightness or roughness
-    harshness = 0
-    if timbre.brightness > 80:
-        harshness += (timbre.brightness - 80) * 0.5
-    harshness += timbre.roughness * 0.3
+    brightness = timbre["brightness"]
+    harshness = np.where(brightness > 80, (brightness - 80) * 0.5, 0.0)
+    harshness = harshness + timbre["roughness"] * 0.3
     harshness = np.clip(harshness, 0, 100)
     
     # Calculate total
@@ -220,19 +429,38 @@ def calculate_sweet_spot(
         0.20 * (100 - harshness)
     )
     
-    return SweetSpotScore(
-        clarity=float(clarity),
-        warmth=float(warmth),
-        presence=float(presence),
-        smoothness=float(smoothness),
-        harshness_penalty=float(harshness),
-        total=float(np.clip(total, 0, 100)),
-    )
+    return {
+        "clarity": clarity,
+        "warmth": warmth,
+        "presence": presence,
+        "smoothness": smoothness,
+        "harshness_penalty": harshness,
+        "total": np.clip(total, 0, 100),
+    }
+
+
+def normalize_columns(values: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """Normalize values to the 0-100 range, elementwise."""
+    values = np.asarray(values, dtype=np.float64)
+    if max_val == min_val:
+        return np.full_like(values, 50.0)
+    return np.clip((values - min_val) / (max_val - min_val) * 100, 0, 100)
 
 
 def normalize_to_100(value: float, min_val: float, max_val: float) -> float:
     """Normalize a value to 0-100 range."""
-    if max_val == min_val:
-        return 50.0
-    normalized = (value - min_val) / (max_val - min_val) * 100
-    return float(np.clip(normalized, 0, 100))
+    return float(normalize_columns(value, min_val, max_val))
+
+
+def _or_nan(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+def _fill(values: np.ndarray, default: float) -> np.ndarray:
+    """Missing (NaN) values replaced by default, as dict.get(name, default)."""
+    return np.where(np.isnan(values), default, values)
+
+
+def _or_default(values: np.ndarray, default: float) -> np.ndarray:
+    """Missing or zero values replaced by default, as `value or default`."""
+    return np.where(np.isnan(values) | (values == 0), default, values)
@@ -0,0 +1,210 @@
+"""
+Vocal Isolation
+
+CPU-only separation of a sung voice from its accompaniment:
+
+1. Detection (cheap, always run for sung audio): the signal is decimated to
+   ACCOMPANIMENT_DETECT_RATE and split with a strict-margin HPSS. Drums show
+   up as percussive energy, chords and backing parts as harmonic energy
+   that no single harmonic comb explains; a cappella takes have neither
+   and skip the separation entirely.
+2. Separation (only when accompaniment is detected): median-filter HPSS
+   soft mask for the harmonic part, times a soft vocal-band mask that
+   removes sub-bass and the air band above the voice. Runs block by block
+   through filter_stft, so long tracks keep bounded memory.
+
+This removes percussion and out-of-band instruments; sustained harmonic
+instruments inside the vocal band are attenuated only where they are
+weaker than the voice.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.decoder import resample
+from app.services.spectral import filter_stft
+
+
+# Detection runs on a decimated signal (a quarter of 44.1 kHz)
+ACCOMPANIMENT_DETECT_RATE = 11025
+ACCOMPANIMENT_DETECT_N_FFT = 1024
+ACCOMPANIMENT_DETECT_HOP = 512
+
+# Strict HPSS margin: energy that is clearly one or the other, noise falls
+# into the residual and does not count as percussion
+ACCOMPANIMENT_HPSS_MARGIN = 2.0
+ACCOMPANIMENT_HPSS_KERNEL = 9  # ~0.4 s by ~100 Hz on the decimated grid
+
+# Single-pitch harmonic combs: F0 candidates (quarter tones), partials up
+# to COMB_MAX_HZ, each matched within COMB_TOLERANCE of its frequency
+COMB_F0_RANGE = (80.0, 1000.0)
+COMB_MAX_HZ = 4000.0
+COMB_TOLERANCE = 0.03
+
+# A loud frame is polyphonic when the best single comb explains less than
+# this share of its harmonic energy
+POLYPHONIC_EXPLAINED = 0.7
+
+# Frames more than this far below the loud frames are not judged
+LOUD_FRAME_RANGE_DB = 30.0
+
+# Decision thresholds
+ACCOMPANIMENT_PERCUSSIVE_RATIO = 0.08
+ACCOMPANIMENT_POLYPHONIC_FRAMES = 0.12
+
+# Separation masks
+SEPARATION_HARMONIC_KERNEL = 31  # frames (~0.36 s) along time
+SEPARATION_PERCUSSIVE_KERNEL = 17  # bins (~370 Hz) along frequency
+VOCAL_BAND_HZ = (40.0, 70.0, 8000.0, 12000.0)  # ramp up, pass, ramp down
+SEPARATION_BLOCK_SECONDS = 30.0
+
+
+class AccompanimentStats:
+    """
+    Accompaniment evidence accumulated over one or more pieces of a take
+    (the whole buffer, or the blocks of a chunked analysis).
+
+    - percussive_ratio: share of the energy HPSS assigns to percussion
+    - polyphonic_fraction: share of loud frames whose harmonic energy is
+      not explained by one harmonic comb, i.e. where a second pitched
+      source (chords, bass, backing vocals) sounds with the voice
+    """
+
+    def __init__(self):
+        self.total_energy = 0.0
+        self.percussive_energy = 0.0
+        self.loud_frames = 0
+        self.polyphonic_frames = 0
+
+    def update(self, audio: np.ndarray, sr: int):
+        """Add a piece of the take."""
+        import librosa
+
+        if len(audio) < sr // 10:
+            return
+        decimated = resample(audio, sr, ACCOMPANIMENT_DETECT_RATE)
+        magnitude = np.abs(librosa.stft(
+            decimated, n_fft=ACCOMPANIMENT_DETECT_N_FFT, hop_length=ACCOMPANIMENT_DETECT_HOP
+        ))
+        harmonic, percussive = librosa.decompose.hpss(
+            magnitude, kernel_size=ACCOMPANIMENT_HPSS_KERNEL, margin=ACCOMPANIMENT_HPSS_MARGIN
+        )
+
+        self.total_energy += float(np.sum(magnitude ** 2))
+        self.percussive_energy += float(np.sum(percussive ** 2))
+
+        power = harmonic ** 2
+        frame_energy = power.sum(axis=0)
+        if not frame_energy.any():
+            return
+        loud = frame_energy > np.percentile(frame_energy, 95) * 10 ** (-LOUD_FRAME_RANGE_DB / 10)
+        explained = (_harmonic_combs() @ power[:, loud]).max(axis=0) / frame_energy[loud]
+        self.loud_frames += int(loud.sum())
+        self.polyphonic_frames += int(np.sum(explained < POLYPHONIC_EXPLAINED))
+
+    def merge(self, other: "AccompanimentStats"):
+        self.total_energy += other.total_energy
+        self.percussive_energy += other.percussive_energy
+        self.loud_frames += other.loud_frames
+        self.polyphonic_frames += other.polyphonic_frames
+
+    @property
+    def percussive_ratio(self) -> float:
+        return self.percussive_energy / self.total_energy if self.total_energy > 0 else 0.0
+
+    @property
+    def polyphonic_fraction(self) -> float:
+        return self.polyphonic_frames / self.loud_frames if self.loud_frames else 0.0
+
+    @property
+    def detected(self) -> bool:
+        return (
+            self.percussive_ratio > ACCOMPANIMENT_PERCUSSIVE_RATIO
+            or self.polyphonic_fraction > ACCOMPANIMENT_POLYPHONIC_FRAMES
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "detected": self.detected,
+            "percussive_ratio": round(self.percussive_ratio, 3),
+            "polyphonic_fraction": round(self.polyphonic_fraction, 3),
+        }
+
+
+_COMBS: Optional[np.ndarray] = None
+
+
+def _harmonic_combs() -> np.ndarray:
+    """(candidates, bins) 0/1 matrix selecting the partials of each F0 candidate."""
+    global _COMBS
+    if _COMBS is None:
+        freqs = np.arange(ACCOMPANIMENT_DETECT_N_FFT // 2 + 1) * ACCOMPANIMENT_DETECT_RATE / ACCOMPANIMENT_DETECT_N_FFT
+        low, high = COMB_F0_RANGE
+        candidates = low * 2 ** (np.arange(int(np.log2(high / low) * 24) + 1) / 24)
+        partials = candidates[:, None] * np.arange(1, int(COMB_MAX_HZ / low) + 1)
+        partials[partials > COMB_MAX_HZ] = np.nan
+        tolerance = np.maximum(COMB_TOLERANCE * partials, freqs[1])
+        # A bin belongs to a comb if it lies near any of its partials
+        near = np.abs(freqs[None, None, :] - partials[:, :, None]) <= tolerance[:, :, None]
+        _COMBS = near.any(axis=1).astype(np.float32)
+    return _COMBS
+
+
+def detect_accompaniment(audio: np.ndarray, sr: int) -> AccompanimentStats:
+    """Accompaniment evidence for a whole buffer."""
+    stats = AccompanimentStats()
+    stats.update(audio, sr)
+    return stats
+
+
+def vocal_band_mask(n_fft: int, sr: int) -> np.ndarray:
+    """Soft (raised-cosine) band-pass gain per STFT bin."""
+    freqs = np.arange(n_fft // 2 + 1) * sr / n_fft
+    low_start, low_end, high_start, high_end = VOCAL_BAND_HZ
+    rise = np.clip((freqs - low_start) / (low_end - low_start), 0.0, 1.0)
+    fall = np.clip((high_end - freqs) / (high_end - high_start), 0.0, 1.0)
+    return (0.5 - 0.5 * np.cos(np.pi * rise)) * (0.5 - 0.5 * np.cos(np.pi * fall))
+
+
+def separate_vocals(
+    audio: np.ndarray,
+    sr: int,
+    n_fft: int = 2048,
+    hop_length: int = 512,
+    block_seconds: float = SEPARATION_BLOCK_SECONDS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the harmonic, in-band part of the signal.
+
+    Returns (separated audio, its magnitude spectrogram), the latter aligned
+    with a SpectralContext over the same buffer.
+    """
+    import librosa
+
+    band = vocal_band_mask(n_fft, sr)[:, None].astype(np.float32)
+    # Bins outside the band are zeroed anyway; the median filters only need
+    # the in-band bins plus half a kernel of neighbours
+    in_band = np.flatnonzero(band[:, 0] > 0)
+    lo = max(0, in_band[0] - SEPARATION_PERCUSSIVE_KERNEL // 2)
+    hi = min(len(band), in_band[-1] + SEPARATION_PERCUSSIVE_KERNEL // 2 + 1)
+
+    def gain(spectrum: np.ndarray) -> np.ndarray:
+        harmonic_mask, _ = librosa.decompose.hpss(
+            np.abs(spectrum[lo:hi]),
+            kernel_size=(SEPARATION_HARMONIC_KERNEL, SEPARATION_PERCUSSIVE_KERNEL),
+            mask=True,
+        )
+        mask = np.zeros(spectrum.shape, dtype=np.float32)
+        mask[lo:hi] = harmonic_mask * band[lo:hi]
+        return mask
+
+    return filter_stft(
+        audio,
+        gain,
+        n_fft,
+        hop_length,
+        block_frames=int(block_seconds * sr / hop_length),
+        # Median filters reach half a kernel into the neighbouring blocks
+        context_frames=SEPARATION_HARMONIC_KERNEL // 2,
+    )
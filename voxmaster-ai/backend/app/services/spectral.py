@@ -0,0 +1,244 @@
+"""
+Spectral Analysis Context
+
+Per-request cache of STFT-derived views over a single audio buffer.
+The magnitude spectrogram is computed once per (n_fft, hop_length) and
+every librosa-based extractor (spectral shape, MFCCs, VAD energy,
+embedding chroma) reads its view from here instead of re-running the FFT.
+
+When the buffer is a concatenation of voiced segments, the join points are
+passed as boundaries and frame_mean() leaves out every frame whose window
+straddles a join, so the splices never leak into aggregated features.
+"""
+
+import numpy as np
+from typing import Callable, Dict, Tuple, Optional
+
+
+class SpectralContext:
+    """Lazily computed, cached spectrogram views for one audio buffer."""
+
+    def __init__(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        n_fft: int = 2048,
+        hop_length: int = 512,
+        boundaries: Optional[np.ndarray] = None,
+        magnitude: Optional[np.ndarray] = None,
+    ):
+        """
+        magnitude: precomputed |STFT| of the buffer on the default framing
+        (e.g. the denoiser's gated spectrogram), used instead of an STFT.
+        """
+        self.audio = audio
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.boundaries = np.asarray(boundaries if boundaries is not None else [], dtype=np.int64)
+        self._frame_mask: Optional[np.ndarray] = None
+        self._magnitude: Dict[Tuple[int, int], np.ndarray] = {}
+        self._power: Dict[Tuple[int, int], np.ndarray] = {}
+        self._views: Dict[tuple, np.ndarray] = {}
+        if magnitude is not None:
+            self._magnitude[(n_fft, hop_length)] = magnitude
+
+    @classmethod
+    def from_frames(cls, frames: np.ndarray, sr: int, hop_length: int = 512) -> "SpectralContext":
+        """
+        Context over pre-cut (n_fft, n_frames) analysis frames instead of a
+        buffer, e.g. the newest frames of a live stream. The views match
+        those of the same frames inside a full-buffer STFT.
+        """
+        import librosa
+
+        n_fft = frames.shape[0]
+        context = cls(np.zeros(0, dtype=np.float32), sr, n_fft, hop_length)
+        window = librosa.filters.get_window("hann", n_fft, fftbins=True)
+        context._magnitude[(n_fft, hop_length)] = np.abs(
+            np.fft.rfft(frames * window[:, None], axis=0)
+        ).astype(np.float32)
+        return context
+
+    def _key(self, n_fft: Optional[int], hop_length: Optional[int]) -> Tuple[int, int]:
+        return (n_fft or self.n_fft, hop_length or self.hop_length)
+
+    def magnitude(
+        self,
+        n_fft: Optional[int] = None,
+        hop_length: Optional[int] = None,
+    ) -> np.ndarray:
+        """Magnitude spectrogram |STFT|, computed once per framing."""
+        key = self._key(n_fft, hop_length)
+        if key not in self._magnitude:
+            import librosa
+
+            self._magnitude[key] = np.abs(
+                librosa.stft(self.audio, n_fft=key[0], hop_length=key[1])
+            )
+        return self._magnitude[key]
+
+    def power(
+        self,
+        n_fft: Optional[int] = None,
+        hop_length: Optional[int] = None,
+    ) -> np.ndarray:
+        """Power spectrogram |STFT|^2."""
+        key = self._key(n_fft, hop_length)
+        if key not in self._power:
+            self._power[key] = self.magnitude(*key) ** 2
+        return self._power[key]
+
+    def mel(self, n_mels: int = 128) -> np.ndarray:
+        """Mel power spectrogram on the default framing."""
+        view_key = ("mel", n_mels)
+        if view_key not in self._views:
+            import librosa
+
+            self._views[view_key] = librosa.feature.melspectrogram(
+                S=self.power(), sr=self.sr, n_mels=n_mels
+            )
+        return self._views[view_key]
+
+    def centroid(self) -> np.ndarray:
+        """Frame-wise spectral centroid in Hz."""
+        if "centroid" not in self._views:
+            import librosa
+
+            self._views["centroid"] = librosa.feature.spectral_centroid(
+                S=self.magnitude(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+            )[0]
+        return self._views["centroid"]
+
+    def rolloff(self) -> np.ndarray:
+        """Frame-wise spectral rolloff (85%) in Hz."""
+        if "rolloff" not in self._views:
+            import librosa
+
+            self._views["rolloff"] = librosa.feature.spectral_rolloff(
+                S=self.magnitude(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+            )[0]
+        return self._views["rolloff"]
+
+    def rms(self) -> np.ndarray:
+        """Frame-wise RMS energy derived from the magnitude spectrogram."""
+        if "rms" not in self._views:
+            import librosa
+
+            self._views["rms"] = librosa.feature.rms(
+                S=self.magnitude(), frame_length=self.n_fft, hop_length=self.hop_length
+            )[0]
+        return self._views["rms"]
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        """MFCC matrix (n_mfcc, frames) from the cached mel spectrogram."""
+        view_key = ("mfcc", n_mfcc)
+        if view_key not in self._views:
+            import librosa
+
+            self._views[view_key] = librosa.feature.mfcc(
+                S=librosa.power_to_db(self.mel()), sr=self.sr, n_mfcc=n_mfcc
+            )
+        return self._views[view_key]
+
+    def chroma(self) -> np.ndarray:
+        """Chromagram (12, frames) from the cached power spectrogram."""
+        if "chroma" not in self._views:
+            import librosa
+
+            self._views["chroma"] = librosa.feature.chroma_stft(
+                S=self.power(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+            )
+        return self._views["chroma"]
+
+    def frame_mask(self) -> np.ndarray:
+        """Boolean mask of default-framing frames that do not straddle a boundary."""
+        if self._frame_mask is None:
+            n_frames = 1 + len(self.audio) // self.hop_length
+            mask = np.ones(n_frames, dtype=bool)
+            if self.boundaries.size:
+                # Centered frame i spans [i*hop - n_fft/2, i*hop + n_fft/2)
+                half = self.n_fft // 2
+                first = np.clip(-(-(self.boundaries - half) // self.hop_length), 0, n_frames)
+                last = np.clip((self.boundaries + half) // self.hop_length + 1, 0, n_frames)
+                coverage = np.zeros(n_frames + 1, dtype=np.int64)
+                np.add.at(coverage, first, 1)
+                np.add.at(coverage, last, -1)
+                mask = np.cumsum(coverage[:-1]) == 0
+                if not mask.any():
+                    mask[:] = True
+            self._frame_mask = mask
+        return self._frame_mask
+
+    def frame_mean(self, values: np.ndarray) -> np.ndarray:
+        """Mean over the frame (last) axis, skipping boundary frames."""
+        mask = self.frame_mask()
+        if values.shape[-1] != mask.size:
+            return np.mean(values, axis=-1)
+        return np.mean(values[..., mask], axis=-1)
+
+    def frames_to_time(self, frames: np.ndarray) -> np.ndarray:
+        """Convert frame indices on the default framing to seconds."""
+        return np.asarray(frames) * self.hop_length / self.sr
+
+
+def filter_stft(
+    audio: np.ndarray,
+    gain: Callable[[np.ndarray], np.ndarray],
+    n_fft: int = 2048,
+    hop_length: int = 512,
+    block_frames: int = 2584,
+    context_frames: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply a time-frequency gain to a signal, one block of frames at a time.
+
+    Framing matches librosa.stft (centered, zero-padded, periodic Hann).
+    gain() receives the complex STFT of a block plus context_frames on each
+    side and returns a real gain of the same shape; the block's frames are
+    scaled by it and resynthesized by weighted overlap-add. Only one block's
+    STFT is in memory at a time.
+
+    Returns (filtered audio, magnitude of the filtered STFT), the latter
+    aligned with a SpectralContext over the same buffer.
+    """
+    from scipy import fft
+
+    if n_fft % hop_length:
+        raise ValueError("n_fft must be a multiple of hop_length")
+
+    audio = np.asarray(audio, dtype=np.float32)
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+    padded = np.pad(audio, n_fft // 2)
+    n_frames = 1 + len(audio) // hop_length
+    frame_view = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+
+    # Overlap-add in hop-sized chunks: chunk j of frame f lands on chunk f + j
+    chunks_per_frame = n_fft // hop_length
+    output = np.zeros((n_frames + chunks_per_frame - 1, hop_length), dtype=np.float32)
+    magnitude = np.empty((n_fft // 2 + 1, n_frames), dtype=np.float32)
+
+    for start in range(0, n_frames, max(1, block_frames)):
+        stop = min(start + max(1, block_frames), n_frames)
+        lo, hi = max(0, start - context_frames), min(n_frames, stop + context_frames)
+
+        spectrum = fft.rfft(frame_view[lo:hi] * window, axis=1).T
+        core = slice(start - lo, stop - lo)
+        filtered = spectrum[:, core] * gain(spectrum)[:, core]
+        magnitude[:, start:stop] = np.abs(filtered)
+
+        frames = fft.irfft(filtered.T, n=n_fft, axis=1) * window
+        frames = frames.reshape(stop - start, chunks_per_frame, hop_length)
+        for j in range(chunks_per_frame):
+            output[start + j:stop + j] += frames[:, j]
+
+    # Normalize by the summed squared synthesis windows
+    norm = np.zeros_like(output)
+    squared = (window ** 2).reshape(chunks_per_frame, hop_length)
+    for j in range(chunks_per_frame):
+        norm[j:n_frames + j] += squared[j]
+    output /= np.maximum(norm, 1e-8)
+
+    filtered_audio = output.reshape(-1)[n_fft // 2:n_fft // 2 + len(audio)]
+    return np.ascontiguousarray(filtered_audio), magnitude
+
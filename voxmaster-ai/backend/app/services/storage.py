@@ -8,7 +8,7 @@ For development without Railway, falls back to local file storage.
 import os
 import httpx
 import base64
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Tuple
 from pathlib import Path
 import uuid
 from datetime import datetime
@@ -34,7 +34,7 @@ class StorageService:
     
     def _init_local_storage(self):
         """Initialize local storage directories."""
-        directories = ["audio", "reports", "temp"]
+        directories = ["audio", "reports", "tracks", "temp"]
         for dir_name in directories:
             dir_path = self.local_storage_path / dir_name
             dir_path.mkdir(parents=True, exist_ok=True)
@@ -60,6 +60,30 @@ class StorageService:
         
         return file_id, url
     
+    async def upload_audio_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: str = "audio/wav",
+        size: Optional[int] = None,
+    ) -> Tuple[str, str]:
+        """
+        Upload audio file to storage from an async stream of chunks.
+        
+        Only one chunk is held in memory at a time.
+        
+        Returns:
+            Tuple of (file_id, file_url)
+        """
+        file_id = f"audio_{uuid.uuid4().hex[:12]}_{filename}"
+        
+        if self.use_railway:
+            url = await self._upload_stream_to_railway(chunks, file_id, content_type, size)
+        else:
+            url = await self._save_stream_to_local(chunks, "audio", file_id)
+        
+        return file_id, url
+    
     async def upload_report(
         self,
         file_data: bytes,
@@ -81,6 +105,25 @@ class StorageService:
         
         return file_id, url
     
+    async def upload_tracks(self, file_data: bytes, name: str) -> Tuple[str, str]:
+        """
+        Upload a feature-track archive (.npz).
+        
+        Tracks are content-addressed by the analysis cache key, so the same
+        name always holds the same data and cache hits share one file.
+        
+        Returns:
+            Tuple of (file_id, file_url)
+        """
+        file_id = f"tracks_{name}.npz"
+        
+        if self.use_railway:
+            url = await self._upload_to_railway(file_data, file_id, "application/octet-stream")
+        else:
+            url = await self._save_to_local(file_data, "tracks", file_id)
+        
+        return file_id, url
+    
     async def get_file(self, file_url: str) -> Optional[bytes]:
         """
         Retrieve file from storage.
@@ -137,6 +180,32 @@ class StorageService:
             
             return f"{self.railway_url}/{file_id}"
     
+    async def _upload_stream_to_railway(
+        self,
+        chunks: AsyncIterator[bytes],
+        file_id: str,
+        content_type: str,
+        size: Optional[int] = None,
+    ) -> str:
+        """Stream a file to Railway Blob Storage."""
+        async with httpx.AsyncClient() as client:
+            headers = {
+                "Authorization": f"Bearer {self.railway_token}",
+                "Content-Type": content_type,
+            }
+            if size is not None:
+                headers["Content-Length"] = str(size)
+            
+            response = await client.put(
+                f"{self.railway_url}/{file_id}",
+                content=chunks,
+                headers=headers,
+                timeout=60.0,
+            )
+            response.raise_for_status()
+            
+            return f"{self.railway_url}/{file_id}"
+    
     async def _get_from_railway(self, file_url: str) -> Optional[bytes]:
         """Get file from Railway Blob Storage."""
         async with httpx.AsyncClient() as client:
@@ -186,6 +255,21 @@ class StorageService:
         # Return a local URL that can be served by the API
         return f"/api/storage/{category}/{file_id}"
     
+    async def _save_stream_to_local(
+        self,
+        chunks: AsyncIterator[bytes],
+        category: str,
+        file_id: str
+    ) -> str:
+        """Save a stream of chunks to local storage."""
+        file_path = self.local_storage_path / category / file_id
+        
+        with open(file_path, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+        
+        return f"/api/storage/{category}/{file_id}"
+    
     async def _get_from_local(self, file_url: str) -> Optional[bytes]:
         """Get file from local storage."""
         # Parse the local URL to get the file path
@@ -0,0 +1,58 @@
+"""
+Stage Timings
+
+Wall-clock time spent in each pipeline stage (decode, preprocessing steps,
+features, scoring), collected per analysis so slow stages can be spotted
+in logs and metrics, along with the stages that fell back to default
+values instead of measuring anything.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class StageTimings:
+    """Seconds spent per named stage, in the order the stages first ran."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.fallbacks: List[str] = []
+        self.failed: Optional[str] = None  # innermost stage that raised
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if self.failed is None:
+                self.failed = name
+            raise
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def fallback(self, name: str):
+        """Note that the named stage returned default values."""
+        self.fallbacks.append(name)
+
+    def merge(self, other: "StageTimings", prefix: str = ""):
+        """Fold in another set of timings, optionally namespacing its stages."""
+        for name, seconds in other.stages.items():
+            self.add(prefix + name, seconds)
+        self.fallbacks.extend(prefix + name for name in other.fallbacks)
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_dict(self) -> Dict[str, float]:
+        """Milliseconds per stage, rounded for logs and JSON."""
+        return {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={ms:.0f}ms" for name, ms in self.to_dict().items())
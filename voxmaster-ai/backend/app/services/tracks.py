@@ -0,0 +1,224 @@
+"""
+Feature Tracks
+
+Frame-level contours (F0, spectral centroid, RMS, F1-F3, HNR) sampled on a
+common 10 ms grid for the UI's charts. Tracks are stored as float16 with a
+min/max pyramid: every level decimates the one below by TRACK_DECIMATION,
+keeping the min and max of each group so peaks survive downsampling. A
+chart asks for at most N points and gets the finest level that fits,
+without the full-rate data being shipped or recomputed.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+TRACK_NAMES = ("f0", "centroid", "rms", "f1", "f2", "f3", "hnr")
+
+# Seconds between points of the full-rate (level 0) tracks
+TRACK_FRAME_PERIOD = 0.01
+
+# Each pyramid level holds 1/TRACK_DECIMATION of the points of the one below
+TRACK_DECIMATION = 4
+
+# Pyramid building stops once a level is this short
+TRACK_MIN_LEVEL_POINTS = 16
+
+# Praat marks frames without a harmonicity estimate with -200 dB
+PRAAT_UNDEFINED_DB = -200.0
+
+
+@dataclass
+class FeatureTracks:
+    """Full-rate tracks on a uniform grid starting at t=0 (NaN = undefined)."""
+    frame_period: float
+    tracks: Dict[str, np.ndarray]
+
+    @property
+    def duration(self) -> float:
+        lengths = [len(values) for values in self.tracks.values()]
+        return (max(lengths) if lengths else 0) * self.frame_period
+
+    @classmethod
+    def concatenate(cls, parts: List["FeatureTracks"]) -> "FeatureTracks":
+        """Join consecutive pieces (e.g. the blocks of a chunked analysis)."""
+        frame_period = parts[0].frame_period if parts else TRACK_FRAME_PERIOD
+        return cls(
+            frame_period=frame_period,
+            tracks={
+                name: np.concatenate([part.tracks[name] for part in parts])
+                for name in TRACK_NAMES
+            },
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize as an .npz holding level 0 and the min/max pyramid."""
+        arrays = {"frame_period": np.array(self.frame_period)}
+        for name, values in self.tracks.items():
+            arrays[f"{name}_0"] = values.astype(np.float16)
+            for level, (low, high) in enumerate(build_pyramid(values), start=1):
+                arrays[f"{name}_{level}_min"] = low.astype(np.float16)
+                arrays[f"{name}_{level}_max"] = high.astype(np.float16)
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+
+def build_pyramid(values: np.ndarray) -> List[tuple]:
+    """Successive (min, max) decimations of a track, NaN-aware."""
+    levels = []
+    low = high = np.asarray(values, dtype=np.float32)
+    while len(low) > TRACK_MIN_LEVEL_POINTS:
+        low = _reduce_groups(low, np.fmin)
+        high = _reduce_groups(high, np.fmax)
+        levels.append((low, high))
+    return levels
+
+
+def _reduce_groups(values: np.ndarray, reducer) -> np.ndarray:
+    padded_length = -(-len(values) // TRACK_DECIMATION) * TRACK_DECIMATION
+    padded = np.full(padded_length, np.nan, dtype=np.float32)
+    padded[:len(values)] = values
+    # fmin/fmax skip NaN, so a group is NaN only if all of it is undefined
+    return reducer.reduce(padded.reshape(-1, TRACK_DECIMATION), axis=1)
+
+
+def load_tracks(
+    data: bytes,
+    resolution: int,
+    start: float = 0.0,
+    end: Optional[float] = None,
+    names: Optional[List[str]] = None,
+) -> Dict[str, object]:
+    """
+    Read a chart-sized slice of stored tracks.
+
+    Picks the finest pyramid level with at most `resolution` points in
+    [start, end) and returns its min/max envelopes (identical at level 0).
+    Undefined points are returned as None.
+    """
+    with np.load(io.BytesIO(data)) as archive:
+        base_period = float(archive["frame_period"])
+        available = [name for name in TRACK_NAMES if f"{name}_0" in archive.files]
+        names = [name for name in (names or available) if name in available]
+
+        n_points = len(archive[f"{available[0]}_0"]) if available else 0
+        duration = n_points * base_period
+        end = duration if end is None else min(end, duration)
+        start = max(0.0, min(start, end))
+
+        # Finest level whose slice fits in the requested resolution
+        level = 0
+        while (
+            (end - start) / (base_period * TRACK_DECIMATION ** level) > resolution
+            and f"{available[0]}_{level + 1}_min" in archive.files
+        ):
+            level += 1
+
+        period = base_period * TRACK_DECIMATION ** level
+        # Small epsilon: 1.0 // 0.01 is 99 in floating point
+        first = int(np.floor(start / period + 1e-9))
+        last = int(np.ceil(end / period - 1e-9))
+
+        tracks = {}
+        for name in names:
+            if level == 0:
+                low = high = archive[f"{name}_0"][first:last]
+            else:
+                low = archive[f"{name}_{level}_min"][first:last]
+                high = archive[f"{name}_{level}_max"][first:last]
+            tracks[name] = {"min": _to_json(low), "max": _to_json(high)}
+
+    return {
+        "duration": duration,
+        "level": level,
+        "frame_period": period,
+        "start": first * period,
+        "points": max(0, last - first),
+        "tracks": tracks,
+    }
+
+
+def _to_json(values: np.ndarray) -> list:
+    values = values.astype(np.float64)
+    return [None if np.isnan(v) else round(float(v), 3) for v in values]
+
+
+def sample_tracks(
+    spectral,
+    praat,
+    times: np.ndarray,
+    valid: Optional[np.ndarray] = None,
+) -> FeatureTracks:
+    """
+    Sample every track at the given times (seconds on the analyzed buffer).
+
+    Reads the spectrogram and Praat objects the scalar extractors already
+    computed; nearest-frame lookup, NaN where a frame is undefined, too far
+    from the requested time, or where `valid` is False.
+    """
+    from parselmouth.praat import call
+
+    frame_times = spectral.frames_to_time(np.arange(len(spectral.rms())))
+    frame_step = spectral.hop_length / spectral.sr
+
+    pitch = praat.pitch_track
+
+    harmonicity = praat.harmonicity
+    hnr = harmonicity.values[0].astype(np.float32)
+    hnr[hnr == PRAAT_UNDEFINED_DB] = np.nan
+
+    tracks = {
+        "f0": nearest_frames(pitch.times, pitch.f0.astype(np.float32), times, pitch.time_step),
+        "centroid": nearest_frames(frame_times, spectral.centroid(), times, frame_step),
+        "rms": nearest_frames(frame_times, spectral.rms(), times, frame_step),
+        "hnr": nearest_frames(harmonicity.xs(), hnr, times, harmonicity.time_step),
+    }
+    formant = praat.formant
+    for k in (1, 2, 3):
+        matrix = call(formant, "To Matrix", k)
+        values = matrix.values[0].astype(np.float32)
+        values[values <= 0] = np.nan
+        tracks[f"f{k}"] = nearest_frames(matrix.xs(), values, times, formant.time_step)
+
+    if valid is not None:
+        for values in tracks.values():
+            values[~valid] = np.nan
+
+    return FeatureTracks(frame_period=TRACK_FRAME_PERIOD, tracks=tracks)
+
+
+def nearest_frames(xs: np.ndarray, values: np.ndarray, times: np.ndarray, step: float) -> np.ndarray:
+    """Nearest-frame lookup; NaN more than one frame step away from any frame."""
+    out = np.full(len(times), np.nan, dtype=np.float32)
+    if len(xs) == 0:
+        return out
+    right = np.clip(np.searchsorted(xs, times), 0, len(xs) - 1)
+    left = np.maximum(right - 1, 0)
+    index = np.where(np.abs(times - xs[left]) < np.abs(xs[right] - times), left, right)
+    close = np.abs(xs[index] - times) <= step
+    out[close] = values[index[close]]
+    return out
+
+
+def track_times(duration: float) -> np.ndarray:
+    """Grid times for a recording of the given length."""
+    return np.arange(int(duration / TRACK_FRAME_PERIOD) + 1) * TRACK_FRAME_PERIOD
+
+
+def map_to_spliced(times: np.ndarray, segments: np.ndarray, sr: int):
+    """
+    Map original-timeline times onto a buffer spliced from `segments`
+    (see concatenate_segments). Returns (spliced_times, inside_segment).
+    """
+    bounds = np.round(np.asarray(segments, dtype=np.float64).reshape(-1, 2) * sr) / sr
+    bounds = bounds[bounds[:, 1] > bounds[:, 0]]
+    lengths = bounds[:, 1] - bounds[:, 0]
+    offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+    index = np.clip(np.searchsorted(bounds[:, 0], times, side="right") - 1, 0, len(bounds) - 1)
+    inside = (times >= bounds[index, 0]) & (times < bounds[index, 1])
+    return times - bounds[index, 0] + offsets[index], inside
@@ -0,0 +1,269 @@
+"""
+Startup Warm-up
+
+The services import the DSP stack (librosa, numba, parselmouth, scipy)
+and reportlab lazily, inside the functions that need them, so modules
+that serve non-DSP endpoints stay light. Warm-up pays the deferred cost
+once per process, at startup, instead of on the first request:
+
+1. imports: every heavy module, timed one by one
+2. extractors: each DSP stage on a short synthetic take, run twice; the
+   first run includes numba JIT compilation and other first-use setup,
+   so first minus second is logged as the per-stage compile overhead
+3. reports: the PDF stylesheet, built once and cached
+
+numba's on-disk cache (NUMBA_CACHE_DIR) lets a restarted or recycled
+process load the kernels an earlier one compiled instead of compiling
+them again.
+"""
+
+import asyncio
+import importlib
+import os
+import sys
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE
+from app.services.timing import StageTimings
+
+
+# Heavy modules imported up front, in order (later ones reuse earlier ones).
+# librosa loads its submodules on attribute access, so they are listed
+DSP_MODULES = (
+    "scipy.fft",
+    "scipy.signal",
+    "scipy.ndimage",
+    "numba",
+    "librosa",
+    "librosa.core",
+    "librosa.feature",
+    "librosa.decompose",
+    "librosa.sequence",
+    "parselmouth",
+    "soundfile",
+)
+REPORT_MODULES = ("reportlab.platypus",)
+
+# Length of the synthetic take the extractors are run on
+WARMUP_SECONDS = 1.5
+
+
+def configure_numba_cache(cache_dir: Optional[str]) -> Optional[str]:
+    """
+    Point numba's on-disk kernel cache at cache_dir.
+
+    Must run before numba is imported to take effect in this process;
+    worker processes spawned afterwards inherit the setting. An explicit
+    NUMBA_CACHE_DIR in the environment wins. Returns the directory in use.
+    """
+    if cache_dir and "NUMBA_CACHE_DIR" not in os.environ:
+        path = os.path.abspath(cache_dir)
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: numba cache directory {path} is not writable: {e}")
+            return None
+        os.environ["NUMBA_CACHE_DIR"] = path
+        if "numba" in sys.modules:
+            sys.modules["numba"].config.CACHE_DIR = path
+    return os.environ.get("NUMBA_CACHE_DIR")
+
+
+def import_modules(modules: Tuple[str, ...], timings: StageTimings):
+    """Import each module, timing it (modules already loaded cost nothing)."""
+    for name in modules:
+        with timings.stage(name):
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Warning: warm-up could not import {name}: {e}")
+
+
+def synthetic_take(seconds: float = WARMUP_SECONDS, sr: int = ANALYSIS_SAMPLE_RATE) -> np.ndarray:
+    """Harmonic vibrato tone with a pause, over light noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 220.0 * (1 + 0.02 * np.sin(2 * np.pi * 5.5 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 20))
+    # Silence in the middle gives VAD and the noise profile something to find
+    voice *= np.abs(t - seconds / 2) > 0.25
+    audio = 0.1 * voice / np.sqrt(np.mean(voice ** 2)) + 0.001 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def extractor_stages(audio: np.ndarray, sr: int, audio_type: AudioType) -> List[Tuple[str, Callable[[], object]]]:
+    """
+    (name, run) for every DSP stage of the analysis, biometrics and live
+    paths, in pipeline order. Each run builds fresh contexts so nothing is
+    served from a cache left by the previous run.
+    """
+    from app.services.decoder import DecodedAudio
+    from app.services.embeddings import extract_embedding_sync
+    from app.services.feature_extraction import (
+        extract_features_sync,
+        extract_formants,
+        extract_harmonic_features,
+        extract_mfccs,
+        extract_pitch_features,
+        extract_spectral_features,
+        extract_tracks,
+    )
+    from app.services.praat import PraatContext
+    from app.services.preprocessing import preprocess_signal
+    from app.services.scoring import calculate_scores_sync
+    from app.services.separation import separate_vocals
+    from app.services.spectral import SpectralContext
+
+    # Outputs of earlier stages that later ones consume
+    state = {}
+
+    def preprocess():
+        state["preprocessed"] = preprocess_signal(audio, sr, audio_type)
+
+    def spectral():
+        context = SpectralContext(audio, sr)
+        extract_spectral_features(audio, sr, spectral=context)
+        extract_mfccs(audio, sr, spectral=context)
+
+    def features():
+        state["features"] = extract_features_sync(state["preprocessed"], audio_type)
+
+    return [
+        ("preprocess", preprocess),
+        ("separation", lambda: separate_vocals(audio, sr)),
+        ("spectral", spectral),
+        ("harmonic", lambda: extract_harmonic_features(audio, sr, praat=PraatContext(audio, sr, audio_type))),
+        ("formants", lambda: extract_formants(audio, sr, praat=PraatContext(audio, sr, audio_type))),
+        ("pitch", lambda: extract_pitch_features(audio, sr, audio_type, praat=PraatContext(audio, sr, audio_type))),
+        ("tracks", lambda: extract_tracks(
+            state["preprocessed"], SpectralContext(audio, sr), PraatContext(audio, sr, audio_type)
+        )),
+        ("features", features),
+        ("scoring", lambda: calculate_scores_sync(state["features"], audio_type)),
+        ("embedding", lambda: extract_embedding_sync(DecodedAudio(audio, sr))),
+    ]
+
+
+def warm_up_extractors(first: StageTimings, steady: StageTimings, audio_type: AudioType = AudioType.SUNG):
+    """Run every extractor twice, timing the first and the second run."""
+    sr = ANALYSIS_SAMPLE_RATE
+    audio = synthetic_take(sr=sr)
+    for name, run in extractor_stages(audio, sr, audio_type):
+        try:
+            with first.stage(name):
+                run()
+            with steady.stage(name):
+                run()
+        except Exception as e:
+            print(f"Warning: warm-up of {name} failed: {e}")
+
+
+def build_report_styles(timings: StageTimings):
+    """Build and cache the PDF report stylesheet."""
+    with timings.stage("styles"):
+        try:
+            from app.services.pdf_generator import report_styles
+
+            report_styles()
+        except Exception as e:
+            print(f"Warning: report stylesheet warm-up failed: {e}")
+
+
+def warm_up(label: str, extractors: bool = True, reports: bool = True) -> StageTimings:
+    """
+    Warm up this process and log the breakdown.
+
+    Returns the timings, with stages prefixed by "import.", "first." (first
+    extractor run), "jit." (first minus second run) and "reports.".
+    """
+    imports = StageTimings()
+    first = StageTimings()
+    steady = StageTimings()
+    report_timings = StageTimings()
+
+    import_modules(DSP_MODULES if extractors else (), imports)
+    if reports:
+        import_modules(REPORT_MODULES, imports)
+    if extractors:
+        warm_up_extractors(first, steady)
+    if reports:
+        build_report_styles(report_timings)
+
+    jit = StageTimings()
+    for name, seconds in first.stages.items():
+        jit.add(name, max(0.0, seconds - steady.stages.get(name, 0.0)))
+
+    timings = StageTimings()
+    timings.merge(imports, prefix="import.")
+    timings.merge(first, prefix="first.")
+    timings.merge(report_timings, prefix="reports.")
+
+    cache = os.environ.get("NUMBA_CACHE_DIR", "disabled")
+    print(f"🔥 {label} warm-up in {timings.total:.2f}s (numba cache: {cache})")
+    if imports.stages:
+        print(f"   imports: {imports.summary()}")
+    if first.stages:
+        print(f"   first run: {first.summary()}")
+        print(f"   JIT/first-use overhead: {jit.summary()}")
+    if report_timings.stages:
+        print(f"   reports: {report_timings.summary()}")
+
+    timings.merge(jit, prefix="jit.")
+    return timings
+
+
+class StartupWarmup:
+    """
+    Background warm-up of the API process (STARTUP_WARMUP) and the analysis
+    workers (ANALYSIS_PREWARM). Runs after the server starts accepting
+    requests, so non-DSP endpoints are served right away.
+    """
+
+    def __init__(self):
+        self.status = "disabled"
+        self.seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, executor, live_executor=None) -> None:
+        """Schedule the warm-up on the running event loop."""
+        jobs = []
+        if settings.startup_warmup:
+            jobs.append(asyncio.to_thread(warm_up, "API"))
+        if executor.pool is not None and settings.analysis_prewarm:
+            jobs.append(executor.warm_up())
+        if live_executor is not None and live_executor.pools and settings.analysis_prewarm:
+            jobs.append(live_executor.warm_up())
+        if not jobs:
+            return
+        self.status = "running"
+        self._task = asyncio.create_task(self._run(jobs))
+
+    async def _run(self, jobs):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await asyncio.gather(*jobs)
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            print(f"Warning: startup warm-up failed: {e}")
+        self.seconds = round(loop.time() - start, 2)
+
+    async def stop(self):
+        """Cancel a warm-up still in progress (at shutdown)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+# Global startup warm-up instance
+startup_warmup = StartupWarmup()
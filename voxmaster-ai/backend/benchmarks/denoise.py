@@ -0,0 +1,64 @@
+"""
+Noise Reduction Benchmark
+
+Measures the latency the spectral-gating stage adds to preprocessing, per
+minute of audio, on a synthetic take (harmonic voice with pauses over
+white noise). Run from the backend directory:
+
+    python -m benchmarks.denoise --minutes 1 5 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE
+from app.services.preprocessing import preprocess_signal
+
+
+def synthetic_take(minutes: float, sr: int = ANALYSIS_SAMPLE_RATE, snr_db: float = 20.0, seed: int = 0) -> np.ndarray:
+    """Vibrato tone with 1.5 s phrases and 0.5 s pauses, plus white noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(minutes * 60 * sr)) / sr
+    f0 = 180.0 * (1 + 0.02 * np.sin(2 * np.pi * 5.5 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 20))
+    voice *= (t % 2.0) < 1.5
+    voice = 0.1 * voice / np.sqrt(np.mean(voice ** 2))
+    noise = rng.standard_normal(len(t)) * 0.1 * 10 ** (-snr_db / 20)
+    return (voice + noise).astype(np.float32)
+
+
+def time_preprocess(audio: np.ndarray, sr: int, denoise: bool, repeats: int) -> float:
+    """Best-of-N preprocess_signal wall time in seconds."""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        preprocess_signal(audio, sr, AudioType.SUNG, denoise=denoise)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 5.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    sr = ANALYSIS_SAMPLE_RATE
+    # Warm up imports and FFT plans
+    time_preprocess(synthetic_take(0.1, sr), sr, True, 1)
+
+    print(f"{'minutes':>8} {'baseline s':>11} {'denoise s':>10} {'added s':>8} {'added s/min':>12}")
+    for minutes in args.minutes:
+        audio = synthetic_take(minutes, sr)
+        baseline = time_preprocess(audio, sr, False, args.repeats)
+        denoised = time_preprocess(audio, sr, True, args.repeats)
+        added = denoised - baseline
+        print(f"{minutes:>8.1f} {baseline:>11.3f} {denoised:>10.3f} {added:>8.3f} {added / minutes:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
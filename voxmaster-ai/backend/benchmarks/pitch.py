@@ -0,0 +1,137 @@
+"""
+Pitch Backend Benchmark
+
+Runtime and F0 accuracy of every pitch backend on synthetic signals with
+a known F0 contour: a vibrato tone and an exponential glide across the
+sung range, each with silence before and after and light white noise.
+Run from the backend directory:
+
+    python -m benchmarks.pitch --seconds 10
+
+Columns: real-time factor (analysis time / audio duration), voicing
+recall on the tone, false voicing in the silence, median absolute F0
+error in cents and the share of frames off by more than 50 cents.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE
+from app.services.pitch import PITCH_BACKENDS, PitchTrack
+from app.services.praat import pitch_range
+
+
+# Silence before and after each tone (seconds)
+PAD_SECONDS = 0.5
+
+# Frames this close to an onset or offset are not scored (covers half of
+# the longest analysis window, pYIN's)
+EDGE_SECONDS = 0.1
+
+
+def vibrato(t: np.ndarray, seconds: float) -> np.ndarray:
+    """220 Hz with +/-3% vibrato at 5.5 Hz."""
+    return 220.0 * (1 + 0.03 * np.sin(2 * np.pi * 5.5 * t))
+
+
+def glide(t: np.ndarray, seconds: float) -> np.ndarray:
+    """Exponential sweep from 110 to 880 Hz over the tone."""
+    return 110.0 * 8.0 ** (t / seconds)
+
+
+# F0 in Hz as a function of (time into the tone, tone length)
+CONTOURS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "vibrato": vibrato,
+    "glide": glide,
+}
+
+
+def synthetic_tone(
+    contour: Callable[[np.ndarray, float], np.ndarray],
+    seconds: float,
+    sr: int = ANALYSIS_SAMPLE_RATE,
+    snr_db: float = 30.0,
+    seed: int = 0,
+) -> Tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]:
+    """
+    Harmonic tone (1/k partials below Nyquist) following the contour.
+
+    Returns the padded signal and a function giving the true F0 at any
+    time (NaN in the silence).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = contour(t, seconds)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    tone = np.zeros_like(t)
+    for k in range(1, 40):
+        tone += np.where(k * f0 < sr / 2 - 1000, np.sin(k * phase) / k, 0.0)
+    tone = 0.1 * tone / np.sqrt(np.mean(tone ** 2))
+
+    pad = np.zeros(int(PAD_SECONDS * sr))
+    audio = np.concatenate((pad, tone, pad))
+    audio += rng.standard_normal(len(audio)) * 0.1 * 10 ** (-snr_db / 20)
+
+    def truth(times: np.ndarray) -> np.ndarray:
+        inside = (times >= PAD_SECONDS) & (times < PAD_SECONDS + seconds)
+        return np.where(inside, contour(np.clip(times - PAD_SECONDS, 0, seconds), seconds), np.nan)
+
+    return audio.astype(np.float32), truth
+
+
+def score(track: PitchTrack, truth: Callable[[np.ndarray], np.ndarray], seconds: float) -> Dict[str, float]:
+    """Voicing and F0 accuracy of a track against the true contour."""
+    times = track.times
+    expected = truth(times)
+    tone = np.isfinite(expected)
+    inner = (times >= PAD_SECONDS + EDGE_SECONDS) & (times < PAD_SECONDS + seconds - EDGE_SECONDS)
+    silence = (times < PAD_SECONDS - EDGE_SECONDS) | (times >= PAD_SECONDS + seconds + EDGE_SECONDS)
+
+    both = inner & tone & track.voiced
+    cents = 1200 * np.abs(np.log2(track.f0[both] / expected[both]))
+    return {
+        "recall": float(track.voiced[inner].mean()),
+        "false": float(track.voiced[silence].mean()) if silence.any() else 0.0,
+        "median_cents": float(np.median(cents)) if len(cents) else np.nan,
+        "gross": float(np.mean(cents > 50)) if len(cents) else np.nan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="tone length per signal")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=list(PITCH_BACKENDS), choices=list(PITCH_BACKENDS))
+    args = parser.parse_args()
+
+    sr = ANALYSIS_SAMPLE_RATE
+    min_pitch, max_pitch = pitch_range(AudioType.SUNG)
+    duration = args.seconds + 2 * PAD_SECONDS
+
+    print(f"{'signal':>8} {'backend':>7} {'x realtime':>11} {'recall':>7} {'false':>6} {'cents':>6} {'gross':>6}")
+    for signal, contour in CONTOURS.items():
+        audio, truth = synthetic_tone(contour, args.seconds, sr)
+        for name in args.backends:
+            backend = PITCH_BACKENDS[name]
+            # Warm up imports and numba kernels
+            backend.track(audio[:sr], sr, min_pitch, max_pitch)
+
+            best = np.inf
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                track = backend.track(audio, sr, min_pitch, max_pitch)
+                best = min(best, time.perf_counter() - start)
+
+            result = score(track, truth, args.seconds)
+            print(
+                f"{signal:>8} {name:>7} {best / duration:>11.4f} {result['recall']:>7.3f} "
+                f"{result['false']:>6.3f} {result['median_cents']:>6.1f} {result['gross']:>6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
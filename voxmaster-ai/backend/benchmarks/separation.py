@@ -0,0 +1,72 @@
+"""
+Vocal Isolation Benchmark
+
+Per-stage preprocessing time for sung takes with and without
+accompaniment: the a cappella take should only pay for the accompaniment
+detector, the accompanied one for detection plus separation. Run from the
+backend directory:
+
+    python -m benchmarks.separation --minutes 1 5
+"""
+
+import argparse
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE
+from app.services.preprocessing import preprocess_signal
+from app.services.timing import StageTimings
+from benchmarks.denoise import synthetic_take
+
+
+def accompaniment(minutes: float, sr: int = ANALYSIS_SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Kick and hi-hat on every beat at 120 BPM over sustained triads."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(minutes * 60 * sr)) / sr
+    beat = t % 0.5
+    kick = np.sin(2 * np.pi * 60 * t) * np.exp(-beat / 0.08)
+    hat = rng.standard_normal(len(t)) * np.exp(-((t + 0.25) % 0.5) / 0.02)
+    # One triad per 2 s bar, cycling through four chords
+    roots = np.array([130.8, 174.6, 196.0, 220.0])[(t // 2.0).astype(int) % 4]
+    chords = sum(np.sin(2 * np.pi * roots * ratio * t) for ratio in (1.0, 1.26, 1.5))
+    mix = 0.6 * kick + 0.15 * hat + 0.3 * chords
+    return (0.05 * mix / np.sqrt(np.mean(mix ** 2))).astype(np.float32)
+
+
+def time_stages(audio: np.ndarray, sr: int, repeats: int) -> StageTimings:
+    """Per-stage timings of the fastest of N preprocess_signal runs."""
+    best = None
+    for _ in range(repeats):
+        timings = preprocess_signal(audio, sr, AudioType.SUNG).timings
+        if best is None or timings.total < best.total:
+            best = timings
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 5.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    sr = ANALYSIS_SAMPLE_RATE
+    # Warm up imports and numba kernels
+    time_stages(synthetic_take(0.1, sr) + accompaniment(0.1, sr), sr, 1)
+
+    stages = ["normalize", "vad", "denoise", "accompaniment", "separation"]
+    print(f"{'take':>14} {'minutes':>8} " + " ".join(f"{name:>13}" for name in stages) + f" {'total s/min':>12}")
+    for minutes in args.minutes:
+        voice = synthetic_take(minutes, sr)
+        for name, audio in (("a cappella", voice), ("accompanied", voice + accompaniment(minutes, sr))):
+            timings = time_stages(audio, sr, args.repeats)
+            seconds = [timings.stages.get(stage, 0.0) for stage in stages]
+            print(
+                f"{name:>14} {minutes:>8.1f} "
+                + " ".join(f"{value:>13.3f}" for value in seconds)
+                + f" {timings.total / minutes:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Service Microbenchmark Suite
+
+Times every service entry point of the analysis and biometrics paths on
+synthetic voice takes (benchmarks.signals) of several lengths and writes
+the results to JSON, so a run after a librosa / parselmouth upgrade can
+be compared with one from before. Run from the backend directory:
+
+    python -m benchmarks.suite --durations 1 10 60 --output before.json
+    python -m benchmarks.suite --durations 1 10 60 --compare before.json
+
+Durations are in seconds (up to 3600). Each benchmark builds fresh
+analysis contexts, so the intermediates it reads (STFT, Praat Sound,
+pitch track) are part of its time; inputs of later stages (preprocessed
+take, features, embedding) are computed on first use outside the timings,
+so --only skips the ones no selected benchmark reads. Timings are
+timeit-style: the loop count is calibrated so fast functions run for at
+least --min-time per repeat, and the best and median per-call times are
+reported with the real-time factor (RTF: best seconds per second of audio).
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.models.schemas import AudioType
+from app.services.decoder import ANALYSIS_SAMPLE_RATE, DecodedAudio
+from benchmarks.signals import VoiceParams, synthetic_voice, write_synthetic_voice
+
+
+# Libraries whose upgrades these benchmarks are meant to catch
+LIBRARIES = ("numpy", "scipy", "librosa", "parselmouth", "soundfile", "numba")
+
+
+def run_coroutine(coroutine) -> Any:
+    """Drive a coroutine that never suspends, without event-loop overhead."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("coroutine suspended; benchmark it with asyncio.run instead")
+
+
+def benchmarks(
+    audio: np.ndarray,
+    sr: int,
+    audio_type: AudioType,
+    path: str,
+) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, run) for every benchmarked function on one take."""
+    from app.services.embeddings import compute_similarity, extract_embedding_sync
+    from app.services.feature_extraction import (
+        extract_cepstral_features,
+        extract_features_sync,
+        extract_formants,
+        extract_harmonic_features,
+        extract_hnr,
+        extract_mfccs,
+        extract_pitch_features,
+        extract_spectral_features,
+        extract_tracks,
+    )
+    from app.services.praat import PraatContext
+    from app.services.preprocessing import preprocess_audio_sync, preprocess_signal
+    from app.services.scoring import calculate_scores_sync
+    from app.services.spectral import SpectralContext
+
+    # Inputs of the later stages, computed on first use (see measure)
+    @functools.lru_cache(maxsize=None)
+    def preprocessed():
+        return preprocess_signal(audio, sr, audio_type)
+
+    @functools.lru_cache(maxsize=None)
+    def features():
+        return extract_features_sync(preprocessed(), audio_type)
+
+    @functools.lru_cache(maxsize=None)
+    def embeddings():
+        embedding, _ = extract_embedding_sync(DecodedAudio(audio, sr))
+        other = embedding + np.random.default_rng(1).standard_normal(len(embedding)) * 0.1
+        return embedding, other
+
+    def praat() -> PraatContext:
+        return PraatContext(audio, sr, audio_type)
+
+    return [
+        ("preprocess_audio", lambda: preprocess_audio_sync(path, audio_type)),
+        ("extract_spectral_features", lambda: extract_spectral_features(audio, sr, spectral=SpectralContext(audio, sr))),
+        ("extract_mfccs", lambda: extract_mfccs(audio, sr, spectral=SpectralContext(audio, sr))),
+        ("extract_hnr", lambda: extract_hnr(audio, sr, praat=praat())),
+        ("extract_cepstral_features", lambda: extract_cepstral_features(audio, sr, praat=praat())),
+        ("extract_harmonic_features", lambda: extract_harmonic_features(audio, sr, praat=praat())),
+        ("extract_formants", lambda: extract_formants(audio, sr, praat=praat())),
+        ("extract_pitch_features", lambda: extract_pitch_features(audio, sr, audio_type, praat=praat())),
+        ("extract_tracks", lambda: extract_tracks(preprocessed(), SpectralContext(audio, sr), praat())),
+        ("extract_features", lambda: extract_features_sync(preprocessed(), audio_type)),
+        ("calculate_scores", lambda: calculate_scores_sync(features(), audio_type)),
+        ("extract_embedding", lambda: extract_embedding_sync(DecodedAudio(audio, sr))),
+        ("compute_similarity.cosine", lambda: run_coroutine(compute_similarity(*embeddings(), "cosine"))),
+        ("compute_similarity.euclidean", lambda: run_coroutine(compute_similarity(*embeddings(), "euclidean"))),
+    ]
+
+
+def measure(run: Callable[[], object], repeats: int, min_time: float) -> Dict[str, float]:
+    """Best, median and mean seconds per call over `repeats` calibrated loops."""
+    # Warm-up run, untimed: imports, numba, FFT plans and the lazily
+    # computed inputs of the benchmark
+    run()
+    timer = timeit.Timer(run)
+    number, elapsed = timer.autorange()
+    number = max(1, int(np.ceil(number * min_time / max(elapsed, 1e-9)))) if elapsed < min_time else number
+    per_call = np.array(timer.repeat(repeats, number)) / number
+    return {
+        "loops": number,
+        "best_s": float(per_call.min()),
+        "median_s": float(np.median(per_call)),
+        "mean_s": float(per_call.mean()),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, platform, library versions and git revision of the run."""
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = getattr(__import__(name), "__version__", "unknown")
+        except ImportError:
+            versions[name] = None
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        revision = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "git": revision,
+        "libraries": versions,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str):
+    """Print best-time ratios against a previous run (>1 means slower now)."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["benchmark"], r["seconds"]): r for r in baseline["results"]}
+
+    print(f"\nvs {baseline_path} ({baseline.get('created_at', '?')}, git {baseline['environment'].get('git')})")
+    print(f"{'benchmark':>30} {'seconds':>8} {'before ms':>10} {'now ms':>10} {'ratio':>6}")
+    for result in results:
+        old = before.get((result["benchmark"], result["seconds"]))
+        if old is None:
+            continue
+        ratio = result["best_s"] / old["best_s"] if old["best_s"] > 0 else np.inf
+        flag = "  <-- slower" if ratio > 1.1 else ""
+        print(
+            f"{result['benchmark']:>30} {result['seconds']:>8g} {old['best_s'] * 1000:>10.2f} "
+            f"{result['best_s'] * 1000:>10.2f} {ratio:>6.2f}{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0, 60.0], help="take lengths in seconds")
+    parser.add_argument("--audio-type", choices=[t.value for t in AudioType], default=AudioType.SUNG.value)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat")
+    parser.add_argument("--only", nargs="+", help="run only benchmarks whose name starts with one of these")
+    parser.add_argument("--output", help="JSON file for the results (default: benchmark-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    sr = ANALYSIS_SAMPLE_RATE
+    audio_type = AudioType(args.audio_type)
+    params = VoiceParams()
+    created_at = datetime.now(timezone.utc)
+    results = []
+
+    print(f"{'benchmark':>30} {'seconds':>8} {'loops':>6} {'best ms':>10} {'median ms':>10} {'RTF':>8}")
+    for seconds in args.durations:
+        audio = synthetic_voice(seconds, sr, params)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_synthetic_voice(os.path.join(tmp, "take.wav"), seconds, sr, params)
+            for name, run in benchmarks(audio, sr, audio_type, path):
+                if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                    continue
+                timing = measure(run, args.repeats, args.min_time)
+                results.append({"benchmark": name, "seconds": seconds, **timing})
+                print(
+                    f"{name:>30} {seconds:>8g} {timing['loops']:>6} {timing['best_s'] * 1000:>10.2f} "
+                    f"{timing['median_s'] * 1000:>10.2f} {timing['best_s'] / seconds:>8.4f}"
+                )
+        sys.stdout.flush()
+
+    output = args.output or f"benchmark-{created_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    with open(output, "w") as f:
+        json.dump({
+            "created_at": created_at.isoformat(),
+            "environment": environment(),
+            "sample_rate": sr,
+            "audio_type": audio_type.value,
+            "signal": asdict(params),
+            "repeats": args.repeats,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """Async tests (@pytest.mark.anyio) run on asyncio, like the server."""
+    return "asyncio"
@@ -0,0 +1,25 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.feature_graph import FEATURES, SCORES
+
+
+@pytest.fixture
+def client():
+    # Without the context manager the lifespan (database, worker pools) never starts
+    return TestClient(app)
+
+
+def test_features_lists_the_accepted_groups(client):
+    response = client.get("/api/analyze/features")
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert groups["features"] == {name: list(node.fields) for name, node in FEATURES.items()}
+    assert groups["scores"] == {name: list(inputs) for name, inputs in SCORES.items()}
+
+
+def test_scoring_info_describes_normalization(client):
+    response = client.get("/api/analyze/scoring-info")
+    assert response.status_code == 200
+    assert "method" in response.json()["normalization"]
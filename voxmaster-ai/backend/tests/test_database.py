@@ -0,0 +1,263 @@
+"""
+Bulk analysis reads and writes against a real PostgreSQL.
+
+Skipped unless TEST_DATABASE_URL points at a database the tests may create
+schemas in; each test works in a throwaway schema that is dropped after it.
+"""
+
+import os
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import asyncpg
+import pytest
+
+from app.config import settings
+from app.models.schemas import AcousticFeatures, AudioType
+from app.services import norms, rescoring
+from app.services.database import SCORE_GROUPS, db
+from app.services.scoring import feature_columns, row, score_batch
+
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set"),
+]
+
+# The initial analyses schema; DatabaseService._ensure_schema adds the rest
+ANALYSES_TABLE = """
+CREATE TABLE {schema}.analyses (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    filename TEXT,
+    audio_url TEXT,
+    audio_type TEXT,
+    prompt_type TEXT,
+    timbre JSONB,
+    weight JSONB,
+    placement JSONB,
+    sweet_spot JSONB,
+    features JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+)
+"""
+
+# Stored score of every group before re-scoring
+STALE = {"stale": True}
+
+
+def with_search_path(dsn: str, schema: str) -> str:
+    """dsn whose connections use schema (asyncpg passes unknown query keys as server settings)."""
+    parts = urlsplit(dsn)
+    query = dict(parse_qsl(parts.query))
+    query["search_path"] = schema
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+@pytest.fixture
+async def database(monkeypatch):
+    """The global db service connected to a fresh schema with an analyses table."""
+    schema = f"voxmaster_test_{uuid.uuid4().hex[:12]}"
+    admin = await asyncpg.connect(TEST_DATABASE_URL)
+    await admin.execute(f"CREATE SCHEMA {schema}")
+    await admin.execute(ANALYSES_TABLE.format(schema=schema))
+
+    monkeypatch.setattr(settings, "database_url", with_search_path(TEST_DATABASE_URL, schema))
+    monkeypatch.setattr(db, "pool", None)
+    monkeypatch.setattr(db, "demo_mode", False)
+    monkeypatch.setattr(db, "demo_store", None)
+    await db.connect()
+    assert not db.demo_mode, "could not connect to TEST_DATABASE_URL"
+    try:
+        yield db
+    finally:
+        await db.disconnect()
+        await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+        await admin.close()
+
+
+def make_features(f0: float = 220.0) -> dict:
+    return AcousticFeatures(
+        spectral_centroid=1800.0 + f0,
+        spectral_rolloff=3500.0,
+        hnr=18.0,
+        cpp=12.0,
+        h1_h2=4.0,
+        h1_a2=8.0,
+        h1_a3=14.0,
+        f0_mean=f0,
+        f0_range=[0.8 * f0, 1.2 * f0],
+        formants={"f1": 600.0, "f2": 1700.0, "f3": 2600.0, "f4": 3600.0},
+        mfccs=[0.0] * 13,
+        jitter=0.8,
+        shimmer=3.5,
+    ).model_dump()
+
+
+def make_analysis(features: dict, groups=SCORE_GROUPS, **fields) -> dict:
+    return {
+        "filename": "take.wav",
+        "audio_type": "sung",
+        "prompt_type": "sustained",
+        "features": features,
+        **{group: STALE if group in groups else None for group in SCORE_GROUPS},
+        **fields,
+    }
+
+
+async def create(count: int, **kwargs) -> list:
+    """count analyses in one bulk write (so they share one created_at)."""
+    return await db.create_analyses([
+        make_analysis(make_features(f0=200.0 + i), **kwargs) for i in range(count)
+    ])
+
+
+def expected(features: dict, group: str) -> dict:
+    return row(score_batch(feature_columns([features]), AudioType.SUNG)[group], 0)
+
+
+async def read_all() -> list:
+    rows = []
+    async for batch in db.iter_analysis_features(batch_size=1000):
+        rows.extend(batch)
+    return rows
+
+
+async def test_update_analysis_scores_coalesces_missing_groups(database):
+    first, second = await create(2)
+    new = {group: {"score": i} for i, group in enumerate(SCORE_GROUPS)}
+
+    updated = await db.update_analysis_scores([
+        {"id": first["id"], **new},
+        {"id": second["id"], "timbre": new["timbre"], "weight": None},
+        {"id": str(uuid.uuid4()), **new},  # not stored: ignored
+    ])
+    assert updated == 2
+
+    stored = await db.get_analysis(first["id"])
+    assert {group: stored[group] for group in SCORE_GROUPS} == new
+    stored = await db.get_analysis(second["id"])
+    assert stored["timbre"] == new["timbre"]
+    assert stored["weight"] == stored["placement"] == stored["sweet_spot"] == STALE
+
+    # The temporary table is dropped at commit, so the next batch can create it again
+    assert await db.update_analysis_scores([{"id": second["id"], "weight": new["weight"]}]) == 1
+    assert (await db.get_analysis(second["id"]))["weight"] == new["weight"]
+
+
+async def test_iter_analysis_features_keyset(database):
+    # Seven rows with one created_at (ordered by id among themselves), then three newer
+    await create(7)
+    await create(3, fallbacks=["features.cepstral.cpp"])
+
+    batches = [batch async for batch in db.iter_analysis_features(batch_size=3)]
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+    rows = [a for batch in batches for a in batch]
+    keys = [(a["created_at"], a["id"]) for a in rows]
+    assert keys == sorted(keys)
+    assert isinstance(rows[0]["features"], dict)
+    assert rows[0]["scores"] == list(SCORE_GROUPS)
+    assert rows[0]["fallbacks"] is None
+    assert rows[-1]["fallbacks"] == ["features.cepstral.cpp"]
+
+    # Resuming after a row inside the tied group yields exactly the rows after it
+    for k in (0, 3, 6, 8):
+        resumed = [
+            a
+            async for batch in db.iter_analysis_features(
+                since=rows[k]["created_at"], batch_size=4, after_id=rows[k]["id"]
+            )
+            for a in batch
+        ]
+        assert [a["id"] for a in resumed] == [a["id"] for a in rows[k + 1:]]
+
+    # Without an id only strictly newer rows qualify
+    newer = [a async for batch in db.iter_analysis_features(since=rows[0]["created_at"]) for a in batch]
+    assert [a["id"] for a in newer] == [a["id"] for a in rows[7:]]
+
+
+async def test_rescore_resumes_after_interruption(database, monkeypatch, tmp_path):
+    await create(10)
+    checkpoint = str(tmp_path / "checkpoint.json")
+
+    update = db.update_analysis_scores
+    calls = []
+
+    async def interrupted(updates):
+        calls.append(len(updates))
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return await update(updates)
+
+    monkeypatch.setattr(db, "update_analysis_scores", interrupted)
+
+    with pytest.raises(RuntimeError):
+        await rescoring.rescore(checkpoint, batch_size=4)
+    saved = rescoring.load_checkpoint(checkpoint)
+    assert saved["rows"] == 4
+
+    # rescore disconnects when it stops
+    await db.connect()
+    rows = await read_all()
+    stale = [a["id"] for a in rows if (await db.get_analysis(a["id"]))["timbre"] == STALE]
+    assert stale == [a["id"] for a in rows[4:]]
+    assert saved["id"] == str(rows[3]["id"])
+
+    totals = await rescoring.rescore(checkpoint, batch_size=4)
+    assert totals["rows_read"] == totals["rows_updated"] == 6
+    assert rescoring.load_checkpoint(checkpoint) is None
+
+    await db.connect()
+    for a in rows:
+        stored = await db.get_analysis(a["id"])
+        for group in SCORE_GROUPS:
+            assert stored[group] == pytest.approx(expected(a["features"], group))
+
+
+async def test_rescore_preserves_partial_groups(database, tmp_path):
+    (partial,) = await create(1, groups=("timbre", "weight"))
+    features = make_features()
+    features["cpp"] = None
+    (no_cpp,) = await db.create_analyses([make_analysis(features)])
+
+    totals = await rescoring.rescore(str(tmp_path / "checkpoint.json"))
+    assert totals["rows_updated"] == 2
+
+    await db.connect()
+    stored = await db.get_analysis(partial["id"])
+    assert stored["timbre"] == pytest.approx(expected(partial["features"], "timbre"))
+    assert stored["weight"] == pytest.approx(expected(partial["features"], "weight"))
+    # Groups left out of the features= subset stay empty
+    assert stored["placement"] is None and stored["sweet_spot"] is None
+
+    stored = await db.get_analysis(no_cpp["id"])
+    assert stored["timbre"] == pytest.approx(expected(no_cpp["features"], "timbre"))
+    # Weight reads CPP; without it the stored weight is kept
+    assert stored["weight"] == STALE
+
+
+async def test_norms_rebuild_picks_up_rows_tied_with_the_watermark(database, tmp_path):
+    path = str(tmp_path / "norms")
+    await create(3)
+    built = await norms.rebuild(path)
+    assert built.header["analyses"] == 3
+
+    # A row committed after the build with the watermark's created_at (and a
+    # larger id) is still newer than the last row folded in
+    await db.connect()
+    async with db.connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO analyses (id, filename, audio_type, prompt_type, features, created_at)
+            SELECT 'ffffffff-ffff-ffff-ffff-ffffffffffff', filename, audio_type, prompt_type, features, created_at
+            FROM analyses LIMIT 1
+            """
+        )
+    rebuilt = await norms.rebuild(path)
+    assert rebuilt.header["analyses"] == 4
+    assert rebuilt.watermark_id == "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+    # and is folded in only once
+    await db.connect()
+    assert (await norms.rebuild(path)).version == rebuilt.version
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import AudioType
+from app.services.feature_extraction import extract_hnr, extract_pitch_features
+from app.services.praat import HARMONICITY_REACH, PraatContext
+from benchmarks.signals import VoiceParams, synthetic_voice
+
+
+SR = 16000
+
+
+@pytest.fixture
+def spliced():
+    """Voiced pieces at different pitches spliced end to end, and their joins."""
+    pieces = [synthetic_voice(0.5, SR, VoiceParams(f0=f0)) for f0 in (150.0, 230.0, 170.0, 260.0)]
+    joins = np.cumsum([len(piece) for piece in pieces])[:-1]
+    return np.concatenate(pieces).astype(np.float32), joins
+
+
+def test_segments_from_boundaries():
+    audio = np.zeros(3 * SR // 2, dtype=np.float32)
+    assert PraatContext(audio, SR, AudioType.SUNG).segments() is None
+
+    segments = PraatContext(audio, SR, AudioType.SUNG, boundaries=[SR // 2, SR]).segments()
+    np.testing.assert_allclose(segments, [[0.0, 0.5], [0.5, 1.0], [1.0, 1.5]])
+
+
+def test_perturbation_is_measured_within_segments(spliced):
+    audio, joins = spliced
+    across = extract_pitch_features(audio, SR, AudioType.SUNG, praat=PraatContext(audio, SR, AudioType.SUNG, "praat"))
+    within = extract_pitch_features(
+        audio, SR, AudioType.SUNG, praat=PraatContext(audio, SR, AudioType.SUNG, "praat", boundaries=joins)
+    )
+    # The period jumps at the joins no longer count as jitter
+    assert 0 < within["jitter"] < across["jitter"]
+    assert within["shimmer"] > 0
+    assert within["f0_mean"] == across["f0_mean"]
+
+
+def test_hnr_skips_frames_reading_across_joins(spliced):
+    audio, joins = spliced
+    praat = PraatContext(audio, SR, AudioType.SUNG, boundaries=joins)
+    harmonicity = praat.harmonicity
+    times = harmonicity.xs()
+    values = harmonicity.values[0]
+
+    far = np.min(np.abs(times[:, None] - joins[None, :] / SR), axis=1) >= HARMONICITY_REACH
+    inside = (times - HARMONICITY_REACH >= 0) & (times + HARMONICITY_REACH <= len(audio) / SR)
+    expected = values[far & inside & (values != -200.0)].mean()
+    assert extract_hnr(audio, SR, praat=praat) == pytest.approx(expected)
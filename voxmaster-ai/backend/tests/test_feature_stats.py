@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from app.services.chunked import StreamingQuantiles
+from app.services.feature_extraction import defaulted_fields
+from app.services.feature_stats import FeatureStats, RunningStats
+from app.services.timing import StageTimings
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    # Blocks of very different size, offset and spread, as chunked analysis sees
+    return [
+        rng.normal(200.0, 5.0, 3),
+        rng.normal(150.0, 40.0, 1000),
+        rng.normal(1e4, 1.0, 1),
+        rng.normal(-20.0, 0.1, 257),
+    ]
+
+
+def test_update_matches_numpy(samples):
+    stats = RunningStats()
+    for block in samples:
+        stats.update(block)
+    stats.update(np.array([]))
+
+    everything = np.concatenate(samples)
+    assert stats.count == len(everything)
+    assert stats.mean == pytest.approx(np.mean(everything), rel=1e-12)
+    assert stats.variance == pytest.approx(np.var(everything), rel=1e-10)
+    assert (stats.min, stats.max) == (everything.min(), everything.max())
+
+
+def test_merge_matches_numpy(samples):
+    """Merging per-block summaries equals the moments of the concatenation."""
+    parts = []
+    for block in samples:
+        part = RunningStats()
+        part.update(block)
+        parts.append(part)
+
+    merged = RunningStats()
+    for part in parts:
+        merged.merge(part.count, part.mean, part.m2, part.min, part.max)
+    merged.merge(0, 1e9)  # empty summaries change nothing
+
+    everything = np.concatenate(samples)
+    assert merged.count == len(everything)
+    assert merged.mean == pytest.approx(np.mean(everything), rel=1e-12)
+    assert merged.variance == pytest.approx(np.var(everything), rel=1e-10)
+    assert (merged.min, merged.max) == (everything.min(), everything.max())
+
+
+def test_merge_per_column():
+    rng = np.random.default_rng(1)
+    blocks = [rng.normal(np.arange(13), 1.0 + np.arange(13), (n, 13)) for n in (5, 60, 1)]
+    stats = RunningStats()
+    for block in blocks:
+        stats.update(block)
+
+    everything = np.concatenate(blocks)
+    np.testing.assert_allclose(stats.mean, everything.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.variance, everything.var(axis=0), rtol=1e-10)
+    np.testing.assert_array_equal(stats.min, everything.min(axis=0))
+    np.testing.assert_array_equal(stats.max, everything.max(axis=0))
+
+
+def test_merge_of_means_only():
+    """Summaries without spread (e.g. one value per Praat block) track min and max by mean."""
+    stats = RunningStats()
+    stats.merge(2, 10.0)
+    stats.merge(6, 2.0)
+    assert stats.count == 8
+    assert stats.mean == pytest.approx(4.0)
+    assert (stats.min, stats.max) == (2.0, 10.0)
+
+
+def test_empty_stats_have_no_variance():
+    assert np.isnan(RunningStats().variance)
+
+
+def test_empty_feature_stats_note_every_default():
+    timings = StageTimings()
+    features = FeatureStats().to_features(timings)
+    assert features.f0_range == [100, 300]
+    assert {"pitch.f0_min", "pitch.f0_max"} <= set(timings.fallbacks)
+
+    fallbacks = [f"features.{name}" for name in timings.fallbacks]
+    defaulted = defaulted_fields(features.model_dump(), fallbacks)
+    assert {"f0_mean", "f0_range", "spectral_centroid", "cpp", "f1"} <= defaulted
+
+
+def test_streaming_quantiles_within_a_bin(samples):
+    quantiles = StreamingQuantiles(-100.0, 400.0, 500)
+    inside = np.concatenate([block for block in samples if np.all(np.abs(block) < 400)])
+    for block in np.array_split(inside, 7):
+        quantiles.update(block)
+
+    bin_width = 1.0
+    for q in (0.05, 0.1, 0.5, 0.9, 0.95):
+        assert quantiles.quantile(q) == pytest.approx(np.quantile(inside, q), abs=bin_width)
+
+
+def test_streaming_quantiles_clip_to_range():
+    quantiles = StreamingQuantiles(0.0, 10.0, 10)
+    quantiles.update(np.array([-50.0, -1.0, 5.5, 99.0]))
+    assert quantiles.counts.sum() == 4
+    assert quantiles.counts[0] == 2 and quantiles.counts[-1] == 1
+    assert 0.0 <= quantiles.quantile(0.0) <= quantiles.quantile(1.0) <= 10.0
+
+
+def test_streaming_quantiles_empty():
+    assert np.isnan(StreamingQuantiles(0.0, 1.0, 4).quantile(0.5))
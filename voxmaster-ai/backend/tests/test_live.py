@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import AudioType
+from app.services.live import LIVE_PRAAT_CONTEXT_SECONDS, LiveAnalyzer, RingBuffer
+from benchmarks.signals import VoiceParams, synthetic_voice
+
+
+SR = 16000
+
+
+def voice(seconds: float, f0: float) -> np.ndarray:
+    """A steady synthetic note without pauses or vibrato."""
+    params = VoiceParams(f0=f0, vibrato_depth=0.0, phrase_seconds=60.0, pause_seconds=0.0)
+    return synthetic_voice(seconds, SR, params).astype(np.float32)
+
+
+def stream(analyzer: LiveAnalyzer, audio: np.ndarray, chunks: int = 37) -> dict:
+    """Push audio in uneven chunks, updating whenever ready; the last update message."""
+    message = None
+    for chunk in np.array_split(audio, chunks):
+        analyzer.push(chunk)
+        if analyzer.ready:
+            message = analyzer.update()
+    return message
+
+
+def test_ring_wraps_around():
+    ring = RingBuffer(8)
+    ring.write(np.arange(5, dtype=np.float32))
+    ring.write(np.arange(5, 11, dtype=np.float32))
+    assert (ring.total, ring.oldest) == (11, 3)
+    np.testing.assert_array_equal(ring.read(3, 11), np.arange(3, 11))
+    np.testing.assert_array_equal(ring.read(6, 9), [6, 7, 8])
+    assert ring.read(11, 11).size == 0
+
+
+def test_ring_keeps_the_end_of_an_oversize_write():
+    ring = RingBuffer(8)
+    ring.write(np.arange(3, dtype=np.float32))
+    ring.write(np.arange(3, 23, dtype=np.float32))
+    assert (ring.total, ring.oldest) == (23, 15)
+    np.testing.assert_array_equal(ring.read(15, 23), np.arange(15, 23))
+
+
+@pytest.mark.parametrize("start, end", [(2, 10), (5, 12), (9, 8)], ids=["overwritten", "not yet written", "reversed"])
+def test_ring_rejects_reads_outside_it(start, end):
+    ring = RingBuffer(8)
+    ring.write(np.arange(11, dtype=np.float32))
+    with pytest.raises(IndexError):
+        ring.read(start, end)
+
+
+def test_praat_lags_until_the_final_flush():
+    analyzer = LiveAnalyzer(SR, AudioType.SUNG, ring_seconds=2.0)
+    # Voice shorter than the Praat context at the very end of the stream
+    analyzer.push(np.zeros(SR // 2, dtype=np.float32))
+    analyzer.push(voice(0.6 * LIVE_PRAAT_CONTEXT_SECONDS, 200.0))
+
+    message = analyzer.update()
+    assert message["current"]["f0"] is None
+    assert analyzer.stats.f0.count == 0
+
+    summary = analyzer.summary()
+    assert summary["duration"] == pytest.approx(0.5 + 0.6 * LIVE_PRAAT_CONTEXT_SECONDS)
+    assert summary["features"]["f0_mean"] == pytest.approx(200.0, abs=1.0)
+
+
+def test_reset_mid_stream_forgets_the_earlier_take():
+    analyzer = LiveAnalyzer(SR, AudioType.SUNG, ring_seconds=2.0)
+    message = stream(analyzer, voice(3.0, 200.0))
+    assert message["running"]["f0_mean"] == pytest.approx(200.0, abs=1.0)
+
+    analyzer.reset()
+    message = stream(analyzer, voice(3.0, 140.0))
+    # Nothing of the first note, not even the audio Praat still lagged behind on
+    low, high = message["running"]["f0_range"]
+    assert 135.0 < low <= high < 145.0
+    assert message["running"]["f0_mean"] == pytest.approx(140.0, abs=1.0)
+    # The stream position carries on
+    assert message["time"] > 5.5
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from app.services.pitch import PITCH_BACKENDS, get_pitch_backend
+from benchmarks.signals import VoiceParams, synthetic_voice
+
+
+SR = 16000
+
+
+@pytest.fixture(scope="module")
+def two_step():
+    """One second at 200 Hz, then one at 140 Hz, without vibrato or pauses."""
+    notes = [
+        synthetic_voice(1.0, SR, VoiceParams(f0=f0, vibrato_depth=0.0, phrase_seconds=60.0, pause_seconds=0.0))
+        for f0 in (200.0, 140.0)
+    ]
+    return np.concatenate(notes).astype(np.float32)
+
+
+@pytest.mark.parametrize("name", list(PITCH_BACKENDS))
+def test_backends_track_a_two_step_f0(two_step, name):
+    track = get_pitch_backend(name).track(two_step, SR, 75.0, 600.0)
+    assert track.times.shape == track.f0.shape
+
+    # Medians of each note, away from the step and the edges
+    for start, end, f0 in ((0.1, 0.9, 200.0), (1.1, 1.9, 140.0)):
+        inside = track.voiced & (track.times > start) & (track.times < end)
+        assert inside.sum() > 0.5 * (end - start) / track.time_step
+        assert np.median(track.f0[inside]) == pytest.approx(f0, abs=1.0)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown pitch backend"):
+        get_pitch_backend("crepe")
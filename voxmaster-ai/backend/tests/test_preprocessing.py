@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.preprocessing import detect_voiced_segments
+
+
+SR = 16000
+
+# Frame energy comes from a centered 2048-sample window, so detected
+# boundaries may sit up to half a window (plus a hop) from the true ones
+TOLERANCE = (1024 + 512) / SR
+
+
+def take(bursts, duration: float = 5.0) -> np.ndarray:
+    """Faint noise with a 220 Hz tone during each (start, end) burst."""
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0.0, 1e-4, int(duration * SR)).astype(np.float32)
+    t = np.arange(len(audio)) / SR
+    for start, end in bursts:
+        inside = (t >= start) & (t < end)
+        audio[inside] += 0.3 * np.sin(2 * np.pi * 220.0 * t[inside])
+    return audio
+
+
+def test_segment_boundaries():
+    bursts = [(0.5, 1.5), (3.0, 4.0)]
+    segments = detect_voiced_segments(take(bursts), SR, hangover=0.0)
+    assert segments.dtype == np.float32
+    assert segments.shape == (2, 2)
+    np.testing.assert_allclose(segments, bursts, atol=TOLERANCE)
+
+
+def test_hangover_merges_short_gaps():
+    bursts = [(0.5, 1.5), (1.65, 2.5)]
+
+    separate = detect_voiced_segments(take(bursts), SR, hangover=0.0)
+    np.testing.assert_allclose(separate, bursts, atol=TOLERANCE)
+
+    merged = detect_voiced_segments(take(bursts), SR, hangover=0.2)
+    assert merged.shape == (1, 2)
+    # Held open for the hangover past the last burst
+    np.testing.assert_allclose(merged, [(0.5, 2.5 + 0.2)], atol=TOLERANCE)
+
+
+def test_hangover_is_clamped_to_the_take():
+    segments = detect_voiced_segments(take([(4.5, 5.0)]), SR, hangover=0.2)
+    np.testing.assert_allclose(segments, [(4.5, 5.0)], atol=TOLERANCE)
+    assert segments[-1, 1] == pytest.approx(5.0)
+
+
+def test_short_segments_are_dropped():
+    segments = detect_voiced_segments(take([(0.5, 1.5), (3.0, 3.04)]), SR, hangover=0.0, min_duration=0.2)
+    np.testing.assert_allclose(segments, [(0.5, 1.5)], atol=TOLERANCE)
+
+
+def test_clicks_are_dropped_with_the_default_hangover():
+    # 20 ms clicks 0.6 s apart after a sustained note; the hangover must not
+    # stretch them past min_duration
+    clicks = [(2.0 + 0.6 * i, 2.02 + 0.6 * i) for i in range(5)]
+    segments = detect_voiced_segments(take([(0.3, 1.3)] + clicks), SR, min_duration=0.25)
+    np.testing.assert_allclose(segments, [(0.3, 1.3 + 0.2)], atol=TOLERANCE)
+
+
+@pytest.mark.parametrize("bursts", [[], [(0.0, 5.0)]], ids=["silence", "voiced throughout"])
+def test_without_silence_the_whole_take_is_one_segment(bursts):
+    segments = detect_voiced_segments(take(bursts), SR)
+    np.testing.assert_array_equal(segments, [[0.0, 5.0]])
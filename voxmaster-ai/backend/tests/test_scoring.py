@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from app.models.schemas import AcousticFeatures, AudioType
+from app.services import scoring
+from app.services.norms import NORM_FEATURES, ReferenceNorms
+from app.services.scoring import (
+    calculate_placement_scores,
+    calculate_scores_sync,
+    calculate_sweet_spot,
+    calculate_timbre_scores,
+    calculate_weight_scores,
+    feature_columns,
+    placement_inputs,
+    score_batch,
+    score_models,
+)
+
+
+def make_features(**overrides) -> AcousticFeatures:
+    values = dict(
+        spectral_centroid=2200.0,
+        spectral_rolloff=4200.0,
+        hnr=17.0,
+        cpp=11.0,
+        h1_h2=3.0,
+        h1_a2=9.0,
+        h1_a3=15.0,
+        f0_mean=220.0,
+        f0_range=[180.0, 260.0],
+        formants={"f1": 650.0, "f2": 1750.0, "f3": 2700.0, "f4": 3700.0},
+        mfccs=[0.0] * 13,
+        jitter=0.9,
+        shimmer=4.2,
+    )
+    values.update(overrides)
+    return AcousticFeatures(**values)
+
+
+# One row per edge case the vectorized scoring must treat like single scoring
+VARIANTS = [
+    make_features(),
+    make_features(f0_mean=110.0, spectral_centroid=1400.0, hnr=25.0),
+    make_features(f0_mean=400.0, spectral_centroid=3900.0, hnr=6.0, h1_h2=12.0),
+    make_features(jitter=None, shimmer=None),
+    make_features(jitter=float("nan"), shimmer=float("nan")),
+    make_features(jitter=0.0, shimmer=0.0),
+    make_features(formants=None),
+    make_features(formants={"f1": 700.0}),
+    make_features(formants={"f1": 0.0, "f2": 1500.0, "f3": 2500.0}),
+]
+
+
+def reference_norms() -> ReferenceNorms:
+    """Norms built from random takes of both audio types."""
+    rng = np.random.default_rng(0)
+    norms = ReferenceNorms.empty()
+    for audio_type in AudioType:
+        columns = {
+            name: rng.uniform(low + 0.2 * (high - low), low + 0.6 * (high - low), 200)
+            for name, (low, high) in NORM_FEATURES.items()
+        }
+        columns["f0_mean"] = rng.uniform(90.0, 450.0, 200)
+        norms.add(audio_type, columns)
+    norms.finalize(None)
+    return norms
+
+
+@pytest.fixture(params=["fixed ranges", "reference norms"])
+def norms(request, monkeypatch):
+    """Score against the fixed ranges, or against reference norms."""
+    norms = reference_norms() if request.param == "reference norms" else None
+    monkeypatch.setattr(scoring, "get_reference_norms", lambda: norms)
+    return norms
+
+
+@pytest.mark.parametrize("audio_type", list(AudioType))
+def test_batch_matches_single(norms, audio_type):
+    batch = score_batch(feature_columns(VARIANTS), audio_type)
+
+    for i, features in enumerate(VARIANTS):
+        single = calculate_scores_sync(features, audio_type)
+        assert score_models(batch, i) == single
+
+        timbre = calculate_timbre_scores(features, audio_type)
+        weight = calculate_weight_scores(features, audio_type)
+        placement = calculate_placement_scores(features, audio_type)
+        assert (timbre, weight, placement) == (single["timbre"], single["weight"], single["placement"])
+        assert calculate_sweet_spot(timbre, weight, placement, features, audio_type) == single["sweet_spot"]
+
+
+def test_batch_matches_stored_json(norms):
+    """Scoring stored feature dicts (bulk re-scoring) matches the models."""
+    stored = [features.model_dump() for features in VARIANTS]
+    from_json = score_batch(feature_columns(stored), AudioType.SUNG)
+    from_models = score_batch(feature_columns(VARIANTS), AudioType.SUNG)
+    for group, columns in from_models.items():
+        for name, values in columns.items():
+            np.testing.assert_array_equal(from_json[group][name], values)
+
+
+@pytest.mark.parametrize("jitter", [None, float("nan"), 0.0])
+@pytest.mark.parametrize("shimmer", [None, float("nan"), 0.0])
+def test_missing_or_zero_perturbation_takes_defaults(norms, jitter, shimmer):
+    scores = calculate_scores_sync(make_features(jitter=jitter, shimmer=shimmer), AudioType.SUNG)
+    defaults = calculate_scores_sync(make_features(jitter=0.5, shimmer=3.0), AudioType.SUNG)
+    assert scores["timbre"].roughness == defaults["timbre"].roughness == 0.5 * 10 + 3.0 * 3
+    assert scores == defaults
+
+
+def test_missing_formants_take_extractor_defaults(norms):
+    defaults = {"f1": 500.0, "f2": 1500.0, "f3": 2500.0}
+    missing = calculate_scores_sync(make_features(formants=None), AudioType.SUNG)
+    assert missing == calculate_scores_sync(make_features(formants=defaults), AudioType.SUNG)
+
+    partial = calculate_scores_sync(make_features(formants={"f1": 700.0}), AudioType.SUNG)
+    filled = calculate_scores_sync(make_features(formants={**defaults, "f1": 700.0}), AudioType.SUNG)
+    assert partial == filled
+
+
+def test_placement_inputs_without_fill_stay_missing():
+    columns = feature_columns([make_features(formants=None), make_features(formants={"f1": 0.0, "f2": 1500.0})])
+    filled = placement_inputs(columns)
+    assert filled["f2_f1_ratio"].tolist() == [3.0, 3.0]
+    assert filled["ring_distance"].tolist() == [500.0, 500.0]
+
+    unfilled = placement_inputs(columns, fill=False)
+    assert np.isnan(unfilled["f2_f1_ratio"]).all()
+    assert np.isnan(unfilled["ring_distance"]).all()
+    assert np.isnan(unfilled["f1_f2_spacing"][0]) and unfilled["f1_f2_spacing"][1] == 1500.0
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from app.services.tracks import (
+    TRACK_DECIMATION,
+    TRACK_MIN_LEVEL_POINTS,
+    TRACK_NAMES,
+    FeatureTracks,
+    build_pyramid,
+    load_tracks,
+)
+
+
+@pytest.fixture
+def track():
+    """A noisy contour with undefined stretches, one longer than a level-2 group."""
+    rng = np.random.default_rng(0)
+    values = (200.0 + 30.0 * np.sin(np.arange(5003) / 40.0) + rng.normal(0.0, 5.0, 5003)).astype(np.float32)
+    values[100:103] = np.nan
+    values[2000:2100] = np.nan
+    values[-1] = np.nan
+    return values
+
+
+def groups(values: np.ndarray, level: int) -> list:
+    """The raw points each level-`level` pyramid point summarizes."""
+    size = TRACK_DECIMATION ** level
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def test_pyramid_bounds_the_raw_track(track):
+    levels = build_pyramid(track)
+    assert len(levels[-1][0]) <= TRACK_MIN_LEVEL_POINTS < len(levels[-2][0])
+
+    for level, (low, high) in enumerate(levels, start=1):
+        raw = groups(track, level)
+        assert len(low) == len(high) == len(raw)
+        for i, values in enumerate(raw):
+            defined = values[~np.isnan(values)]
+            if defined.size == 0:
+                # A group is undefined only if every raw point in it is
+                assert np.isnan(low[i]) and np.isnan(high[i])
+            else:
+                assert low[i] == defined.min() and high[i] == defined.max()
+
+
+def test_loaded_envelopes_bound_the_raw_track(track):
+    data = FeatureTracks(0.01, {name: track for name in TRACK_NAMES}).to_bytes()
+    stored = track.astype(np.float16).astype(np.float64)
+
+    for resolution in (5000, 1000, 100, 20):
+        sliced = load_tracks(data, resolution, start=3.0, end=41.0, names=["f0"])
+        assert sliced["points"] <= resolution
+        level = sliced["level"]
+        low = np.array([np.nan if v is None else v for v in sliced["tracks"]["f0"]["min"]])
+        high = np.array([np.nan if v is None else v for v in sliced["tracks"]["f0"]["max"]])
+
+        first = int(round(sliced["start"] / sliced["frame_period"]))
+        raw = groups(stored, level)[first:first + sliced["points"]]
+        for i, values in enumerate(raw):
+            defined = values[~np.isnan(values)]
+            if defined.size:
+                # Envelopes are rounded to 3 decimals for JSON
+                assert low[i] <= defined.min() + 1e-3 and high[i] >= defined.max() - 1e-3
+            else:
+                assert np.isnan(low[i]) and np.isnan(high[i])